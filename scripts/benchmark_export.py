@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Script pour comparer les formats d'export (CSV, JSON, colonnaire)
+
+Pour chaque format : taille du fichier, temps d'export, temps de lecture
+seule et temps de rechargement complet dans une base neuve.
+
+Usage: python -m scripts.benchmark_export [nombre_de_transactions]
+"""
+
+import csv
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from src.database.db_manager import DatabaseManager
+from src.services.export_service import ExportService
+from src.services.transaction_service import TransactionService
+from src.utils.columnar import ColumnarReader
+
+
+def generate_rows(count: int):
+    """Génère des transactions aléatoires (amount, description, type, category_id, date ISO)"""
+    rng = random.Random(42)
+    start = date(2020, 1, 1)
+    for i in range(count):
+        is_income = rng.random() < 0.1
+        yield (
+            round(rng.uniform(1, 3000 if is_income else 200), 2),
+            f"Transaction {i}",
+            'revenu' if is_income else 'dépense',
+            rng.randint(1, 8),
+            (start + timedelta(days=rng.randrange(5 * 365))).isoformat()
+        )
+
+
+def load_csv(filepath: str):
+    with open(filepath, encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            yield (float(row['amount']), row['description'], row['type'],
+                   int(row['category_id']), row['date'])
+
+
+def load_json(filepath: str):
+    with open(filepath, encoding='utf-8') as f:
+        for row in json.load(f)['transactions']:
+            yield (row['amount'], row['description'], row['type'],
+                   row['category_id'], row['date'])
+
+
+def read_columnar(filepath: str):
+    with ColumnarReader(filepath) as reader:
+        return reader.read_columns()
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def benchmark(count: int):
+    """Exécute le benchmark sur `count` transactions"""
+
+    print(f"🏁 Benchmark des exports sur {count} transactions...\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = DatabaseManager(str(Path(tmp) / "source.db"))
+        source_transactions = TransactionService(source)
+        source_transactions.add_transactions_bulk(generate_rows(count))
+        export_service = ExportService(source, source_transactions)
+
+        formats = [
+            ('CSV', 'export.csv', export_service.export_transactions_to_csv, load_csv),
+            ('JSON', 'export.json', export_service.export_transactions_to_json, load_json),
+            ('Colonnaire', 'export.mbcol', export_service.export_transactions_to_columnar,
+             read_columnar),
+        ]
+
+        results = []
+        for index, (name, filename, export, loader) in enumerate(formats):
+            filepath = str(Path(tmp) / filename)
+            _, export_time = timed(export, filepath)
+            _, read_time = timed(lambda: list(loader(filepath)))
+
+            target = DatabaseManager(str(Path(tmp) / f"reload_{index}.db"))
+            target_transactions = TransactionService(target)
+            if loader is read_columnar:
+                _, reload_time = timed(
+                    ExportService(target, target_transactions).load_transactions_from_columnar,
+                    filepath
+                )
+            else:
+                _, reload_time = timed(target_transactions.add_transactions_bulk, loader(filepath))
+            target.close()
+
+            size = Path(filepath).stat().st_size
+            results.append((name, size, export_time, read_time, reload_time))
+
+        source.close()
+
+    print(f"{'Format':<12} {'Taille':>12} {'Export':>10} {'Lecture':>10} {'Rechargement':>14}")
+    for name, size, export_time, read_time, reload_time in results:
+        print(
+            f"{name:<12} {size / 1024:>9.0f} Ko {export_time:>9.2f}s "
+            f"{read_time:>9.2f}s {reload_time:>13.2f}s"
+        )
+
+    print("\n✅ Benchmark terminé")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -1,12 +1,17 @@
 # src/cli/main.py
 
 import click
+import json
 from datetime import datetime, date
 from tabulate import tabulate
 from src.database.db_manager import DatabaseManager
 from src.services.transaction_service import TransactionService
 from src.services.budget_service import BudgetService
-from src.services.export_service import ExportService
+from src.services.export_service import ExportService, ExportProgress
+from src.services.import_service import ImportService
+from src.services.ingestion_service import IngestionService
+from src.utils.statements import load_csv_profiles
+from src.services.report_builder import ReportBuilder
 from src.models.transaction import Transaction
 from src.models.budget import Budget
 
@@ -15,6 +20,7 @@ db = DatabaseManager()
 transaction_service = TransactionService(db)
 budget_service = BudgetService(db, transaction_service)
 export_service = ExportService(db, transaction_service)
+import_service = ImportService(db, transaction_service)
 
 @click.group()
 def cli():
@@ -59,8 +65,11 @@ def add(amount, description, category, date_str, type):
             date=trans_date
         )
         
+        existing_id = transaction_service.find_duplicate(transaction)
         trans_id = transaction_service.add_transaction(transaction)
         click.echo(f"✅ Transaction ajoutée (ID: {trans_id})")
+        if existing_id:
+            click.echo(f"⚠️  Une transaction identique était déjà enregistrée (ID: {existing_id})")
         
         # Vérifier si cela dépasse un budget
         check_budget_alert(category_id, trans_date)
@@ -301,17 +310,34 @@ def status(category, start_date, end_date):
 
 
 @cli.command()
-@click.option('--format', 'format_', type=click.Choice(['csv', 'json']), required=True)
+@click.option('--format', 'format_', type=click.Choice(['csv', 'json', 'jsonl', 'columnar']),
+              required=True)
 @click.option('--output', '-o', required=True, help='Chemin du fichier a creer')
 @click.option('--category', '-c', help='Filtrer par categorie')
 @click.option('--start', '-s', help='Date de debut (YYYY-MM-DD)')
 @click.option('--end', '-e', help='Date de fin (YYYY-MM-DD)')
 @click.option('--pretty/--compact', default=True, help='Format JSON lisible')
-def export(format_, output, category, start, end, pretty):
-    """Exporte les transactions en CSV ou JSON
+@click.option('--compress', type=click.Choice(['gzip', 'bz2', 'xz']),
+              help="Compression (par defaut deduite de l'extension: .gz, .bz2, .xz)")
+@click.option('--level', type=click.IntRange(0, 9), help='Niveau de compression')
+@click.option('--partition-by', type=click.Choice(['month', 'category']),
+              help='Un fichier par mois ou par categorie (--output est alors un dossier)')
+@click.option('--workers', '-w', type=click.IntRange(min=1),
+              help='Nombre de processus pour un export partitionne (par defaut: 4)')
+def export(format_, output, category, start, end, pretty, compress, level, partition_by, workers):
+    """Exporte les transactions en CSV, JSON, JSON Lines ou binaire colonnaire
     
-    Exemple: mybudget export --format csv --output export.csv
+    Exemple: mybudget export --format csv --output export.csv.gz --level 6
     """
+    # Options sans effet pour ce format : refusées plutôt qu'ignorées
+    if format_ == 'columnar':
+        for option, value in (('--compress', compress), ('--level', level),
+                              ('--partition-by', partition_by)):
+            if value is not None:
+                raise click.UsageError(f"{option} n'est pas disponible avec --format columnar")
+    if workers is not None and not partition_by:
+        raise click.UsageError("--workers ne s'utilise qu'avec --partition-by")
+
     try:
         category_id = None
         if category:
@@ -324,12 +350,53 @@ def export(format_, output, category, start, end, pretty):
         start_date = datetime.strptime(start, '%Y-%m-%d').date() if start else None
         end_date = datetime.strptime(end, '%Y-%m-%d').date() if end else None
 
+        if partition_by:
+            manifest = export_service.export_partitioned(
+                output,
+                export_format=format_,
+                partition_by=partition_by,
+                workers=workers or 4,
+                category_id=category_id,
+                start_date=start_date,
+                end_date=end_date,
+                compress=compress,
+                compress_level=level
+            )
+            click.echo(
+                f"✅ Export termine: {manifest['total_rows']} transaction(s) en "
+                f"{len(manifest['partitions'])} fichier(s) -> {output}"
+            )
+            return
+
+        progress = ExportProgress(callback=_report_export_progress)
+
         if format_ == 'csv':
             count = export_service.export_transactions_to_csv(
                 output,
                 category_id=category_id,
                 start_date=start_date,
-                end_date=end_date
+                end_date=end_date,
+                progress=progress,
+                compress=compress,
+                compress_level=level
+            )
+        elif format_ == 'columnar':
+            count = export_service.export_transactions_to_columnar(
+                output,
+                category_id=category_id,
+                start_date=start_date,
+                end_date=end_date,
+                progress=progress
+            )
+        elif format_ == 'jsonl':
+            count = export_service.export_transactions_to_jsonl(
+                output,
+                category_id=category_id,
+                start_date=start_date,
+                end_date=end_date,
+                progress=progress,
+                compress=compress,
+                compress_level=level
             )
         else:
             count = export_service.export_transactions_to_json(
@@ -337,12 +404,150 @@ def export(format_, output, category, start, end, pretty):
                 category_id=category_id,
                 start_date=start_date,
                 end_date=end_date,
-                pretty=pretty
+                pretty=pretty,
+                progress=progress,
+                compress=compress,
+                compress_level=level
             )
 
-        click.echo(f"✅ Export termine: {count} transaction(s) -> {output}")
+        rate = f" ({progress.rows_per_second:.0f} lignes/s)" if progress.rows else ""
+        click.echo(f"✅ Export termine: {count} transaction(s) -> {output}{rate}")
+    except Exception as e:
+        click.echo(f"❌ Erreur: {e}")
+
+
+@cli.command(name='export-changes')
+@click.option('--output', '-o', required=True, help='Chemin du fichier JSON a creer')
+@click.option('--since', type=int, help='Watermark de depart (par defaut: celui du dernier export)')
+@click.option('--name', default='default', show_default=True, help='Nom du watermark enregistre')
+def export_changes(output, since, name):
+    """Exporte les modifications depuis le dernier export (incremental)
+    
+    Exemple: mybudget export-changes -o changes.json.gz --name nightly
+    """
+    try:
+        result = export_service.export_changes_to_json(output, since=since, name=name)
+        click.echo(
+            f"✅ Export incremental termine: {result['count']} modification(s), "
+            f"{result['deleted_count']} suppression(s) -> {output}"
+        )
+        click.echo(f"   Watermark: {result['since']} -> {result['watermark']}")
+    except Exception as e:
+        click.echo(f"❌ Erreur: {e}")
+
+
+@cli.command(name='import')
+@click.argument('filepath', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'format_', type=click.Choice(['csv', 'json', 'jsonl']),
+              help="Format du fichier (par defaut deduit de l'extension)")
+@click.option('--batch-size', default=10000, show_default=True, type=click.IntRange(min=1),
+              help='Nombre de lignes inserees par bloc')
+@click.option('--dry-run', is_flag=True, help='Valider le fichier sans rien enregistrer')
+@click.option('--strict', is_flag=True, help="Annuler l'import a la premiere ligne invalide")
+@click.option('--on-duplicate', type=click.Choice(['skip', 'merge', 'insert']), default='skip',
+              show_default=True, help='Transactions deja presentes: ignorer, fusionner ou ajouter')
+def import_(filepath, format_, batch_size, dry_run, strict, on_duplicate):
+    """Importe des transactions depuis un export CSV, JSON ou JSON Lines
+    
+    Exemple: mybudget import export.csv.gz --dry-run
+    """
+    try:
+        result = import_service.import_file(
+            filepath,
+            import_format=format_,
+            batch_size=batch_size,
+            dry_run=dry_run,
+            strict=strict,
+            on_duplicate=on_duplicate
+        )
+    except Exception as e:
+        click.echo(f"❌ Erreur: {e}")
+        return
+
+    verb = "valide(s)" if dry_run else "importee(s)"
+    click.echo(
+        f"✅ Import termine: {result['imported']} transaction(s) {verb}, "
+        f"{result['rejected']} rejetee(s) ({result['rows_per_second']:.0f} lignes/s)"
+    )
+    if dry_run:
+        click.echo("   Mode simulation: aucune donnee enregistree")
+    else:
+        _report_duplicates(result)
+    for error in result['errors'][:10]:
+        click.echo(f"   ⚠️  Enregistrement {error['record']}: {error['error']}")
+    if result['rejected'] > 10:
+        click.echo(f"   ... et {result['rejected'] - 10} autre(s) erreur(s)")
+
+
+@cli.command()
+@click.argument('files', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'format_', type=click.Choice(['ofx', 'qif', 'csv']),
+              help="Format des releves (par defaut deduit de l'extension)")
+@click.option('--profile', '-p', default='default', show_default=True,
+              help='Profil de colonnes pour les releves CSV (default, fr, ...)')
+@click.option('--profiles-file', type=click.Path(exists=True, dir_okay=False),
+              help='Fichier JSON de profils CSV supplementaires')
+@click.option('--category', '-c', default='autres', show_default=True,
+              help='Categorie attribuee aux operations')
+@click.option('--qif-date-format', default='%d/%m/%Y', show_default=True,
+              help='Format des dates dans les fichiers QIF')
+@click.option('--workers', '-w', default=4, show_default=True, type=click.IntRange(min=1),
+              help='Nombre de processus de lecture')
+@click.option('--dry-run', is_flag=True, help='Lire les releves sans rien enregistrer')
+@click.option('--on-duplicate', type=click.Choice(['skip', 'merge', 'insert']), default='skip',
+              show_default=True, help='Transactions deja presentes: ignorer, fusionner ou ajouter')
+def ingest(files, format_, profile, profiles_file, category, qif_date_format, workers, dry_run,
+           on_duplicate):
+    """Integre des releves bancaires (OFX, QIF, CSV)
+    
+    Exemple: mybudget ingest releves/*.ofx releves/compte_joint.csv -p fr
+    """
+    try:
+        profiles = load_csv_profiles(profiles_file) if profiles_file else None
+        service = IngestionService(db, transaction_service, profiles)
+        result = service.ingest_files(
+            files,
+            statement_format=format_,
+            profile=profile,
+            category=category,
+            qif_date_format=qif_date_format,
+            workers=workers,
+            dry_run=dry_run,
+            on_duplicate=on_duplicate
+        )
     except Exception as e:
         click.echo(f"❌ Erreur: {e}")
+        return
+
+    for item in result['files']:
+        if item['error']:
+            click.echo(f"   ⚠️  {item['file']}: {item['error']}")
+        else:
+            click.echo(f"   {item['file']}: {item['entries']} operation(s)")
+
+    verb = "valide(s)" if dry_run else "importee(s)"
+    click.echo(
+        f"✅ Integration terminee: {result['imported']} transaction(s) {verb}, "
+        f"{result['rejected']} rejetee(s) ({result['rows_per_second']:.0f} operations/s)"
+    )
+    if dry_run:
+        click.echo("   Mode simulation: aucune donnee enregistree")
+    else:
+        _report_duplicates(result)
+
+
+def _report_duplicates(result):
+    """Affiche les doublons ignores ou fusionnes lors d'un import"""
+    if result['skipped'] or result['merged']:
+        click.echo(f"   Doublons: {result['skipped']} ignore(s), {result['merged']} fusionne(s)")
+
+
+def _report_export_progress(progress):
+    """Affiche la progression d'un export volumineux sur la sortie d'erreur"""
+    click.echo(
+        f"   ... {progress.rows} lignes exportees ({progress.rows_per_second:.0f} lignes/s)",
+        err=True
+    )
 
 
 @cli.command(name='export-budget')
@@ -380,6 +585,68 @@ def export_budget(category, start_date, end_date, output):
         click.echo(f"❌ Erreur: {e}")
 
 
+@cli.command(name='export-budgets')
+@click.option('--output', '-o', required=True, help='Chemin du fichier JSON a creer')
+@click.option('--category', '-c', help='Filtrer par categorie')
+@click.option('--start', '-s', help='Budgets se terminant a partir de cette date (YYYY-MM-DD)')
+@click.option('--end', '-e', help='Budgets commencant au plus tard a cette date (YYYY-MM-DD)')
+@click.option('--compress', type=click.Choice(['gzip', 'bz2', 'xz']),
+              help="Compression (par defaut deduite de l'extension: .gz, .bz2, .xz)")
+def export_budgets(output, category, start, end, compress):
+    """Exporte en un fichier JSON le resume de tous les budgets
+    
+    Exemple: mybudget export-budgets -o budgets_2026.json --start 2026-01-01 --end 2026-12-31
+    """
+    try:
+        category_id = None
+        if category:
+            categories = db.execute_query("SELECT id FROM categories WHERE name = ?", (category,))
+            if not categories:
+                click.echo(f"❌ Categorie '{category}' inconnue")
+                return
+            category_id = categories[0]['id']
+
+        start_date = datetime.strptime(start, '%Y-%m-%d').date() if start else None
+        end_date = datetime.strptime(end, '%Y-%m-%d').date() if end else None
+
+        count = export_service.export_budget_summaries_to_json(
+            output,
+            category_id=category_id,
+            start_date=start_date,
+            end_date=end_date,
+            compress=compress
+        )
+        click.echo(f"✅ Export termine: {count} budget(s) -> {output}")
+    except Exception as e:
+        click.echo(f"❌ Erreur: {e}")
+
+
+@cli.command()
+@click.argument('year', type=int)
+@click.option('--output', '-o', required=True, help='Chemin du fichier JSON a creer')
+@click.option('--workers', '-w', default=4, show_default=True, type=click.IntRange(min=1),
+              help='Nombre de workers paralleles')
+def report(year, output, workers):
+    """Genere le rapport annuel (resumes mensuels, tendances, budgets)
+    
+    Exemple: mybudget report 2026 -o rapport_2026.json --workers 4
+    """
+    try:
+        builder = ReportBuilder(db, workers=workers)
+        data = builder.build_year_report(year)
+
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+        click.echo(
+            f"✅ Rapport {year} genere: {len(data['monthly_summaries'])} mois, "
+            f"{len(data['category_trends'])} categorie(s), "
+            f"{len(data['budgets'])} budget(s) -> {output}"
+        )
+    except Exception as e:
+        click.echo(f"❌ Erreur: {e}")
+
+
 @cli.command()
 @click.option('--yes', is_flag=True, help='Confirmer la reinitialisation sans prompt')
 def reset(yes):
@@ -404,28 +671,11 @@ def reset(yes):
 
 def check_budget_alert(category_id, trans_date):
     """Vérifie si une transaction dépasse un budget"""
-    # Trouver les budgets actifs pour cette catégorie
-    query = """
-    SELECT * FROM budgets
-    WHERE category_id = ?
-    AND period_start <= ?
-    AND period_end >= ?
-    """
-    budgets = db.execute_query(query, (category_id, trans_date, trans_date))
-    
-    for budget_data in budgets:
-        status = budget_service.get_budget_status(
-            category_id,
-            datetime.strptime(budget_data['period_start'], '%Y-%m-%d').date(),
-            datetime.strptime(budget_data['period_end'], '%Y-%m-%d').date()
-        )
-        
-        if status and status['is_exceeded']:
-            cat_name = db.execute_query(
-                "SELECT name FROM categories WHERE id = ?", 
-                (category_id,)
-            )[0]['name']
-            click.echo(f"\n⚠️  ALERTE: Budget {cat_name} dépassé de {abs(status['remaining']):.2f} € !")
+    # Budgets actifs de la catégorie à cette date, en une requête groupée
+    for status in budget_service.get_affected_statuses([category_id], trans_date, trans_date):
+        if status['is_exceeded']:
+            click.echo(f"\n⚠️  ALERTE: Budget {status['category']} dépassé de "
+                       f"{abs(status['remaining']):.2f} € !")
 
 
 if __name__ == '__main__':
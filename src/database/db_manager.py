@@ -1,32 +1,139 @@
 # src/database/db_manager.py
 
 import sqlite3
+import threading
+import time
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import Callable, List, Dict, Optional, Any, Iterator
+from src.utils.content_hash import ContentHasher, signed_amount
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Curseur qui transmet la durée de ses requêtes à DatabaseManager.query_observer"""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _observe_query(time.perf_counter() - start, 1)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _observe_query(time.perf_counter() - start, 1)
+
+    # La lecture des lignes fait partie du coût de la requête, sans la recompter
+    def fetchone(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            _observe_query(time.perf_counter() - start, 0)
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            _observe_query(time.perf_counter() - start, 0)
+
+    def fetchall(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            _observe_query(time.perf_counter() - start, 0)
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connexion dont tous les curseurs sont des TimedCursor"""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def _observe_query(seconds: float, queries: int) -> None:
+    observer = DatabaseManager.query_observer
+    if observer is not None:
+        observer(seconds, queries)
+
+
+# Version du schéma, enregistrée dans PRAGMA user_version : à incrémenter
+# à chaque modification de _create_tables pour que les bases existantes
+# soient migrées à leur prochaine ouverture
+SCHEMA_VERSION = 4
+
 
 class DatabaseManager:
     """Gestionnaire de base de données SQLite pour MyBudget"""
     
-    def __init__(self, db_path: str = "data/budget.db"):
+    # Fonction (durée en secondes, nombre de requêtes) appelée pour chaque
+    # requête SQL ; les connexions ouvertes sans observateur ne sont pas
+    # instrumentées et ne paient aucun surcoût
+    query_observer: Optional[Callable[[float, int], None]] = None
+    
+    def __init__(self, db_path: str = "data/budget.db", read_only: bool = False):
         """
         Initialise la connexion à la base de données
         
         Args:
             db_path: Chemin vers le fichier de base de données
                     Utiliser ":memory:" pour une base en mémoire (tests)
+            read_only: Ouvrir une connexion en lecture seule sur une base
+                    existante (rapports et exports parallèles)
         """
         self.db_path = db_path
+        self.read_only = read_only
+        
+        if read_only:
+            if db_path == ":memory:":
+                raise ValueError("Une base en mémoire ne peut pas être ouverte en lecture seule")
+            uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+            # Connexion d'un worker : fermée par le thread qui arrête le pool
+            self.connection = sqlite3.connect(uri, uri=True, factory=self._connection_factory(),
+                                              check_same_thread=False)
+            self.connection.row_factory = sqlite3.Row
+            return
         
         # Créer le dossier data s'il n'existe pas
         if db_path != ":memory:":
             Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         
-        self.connection = sqlite3.connect(db_path)
+        self.connection = sqlite3.connect(db_path, factory=self._connection_factory())
         self.connection.row_factory = sqlite3.Row  # Permet d'accéder aux colonnes par nom
         self._create_tables()
     
+    @classmethod
+    def _connection_factory(cls) -> type:
+        return TimedConnection if cls.query_observer is not None else sqlite3.Connection
+    
     def _create_tables(self):
-        """Crée les tables de la base de données si elles n'existent pas"""
+        """
+        Crée ou migre le schéma de la base, si sa version n'est pas à jour
+        
+        Une base à jour est ouverte sans aucune écriture : recréer les
+        triggers à chaque connexion prendrait le verrou d'écriture et
+        changerait la version des données vue par les autres connexions.
+        """
+        if self._schema_version() >= SCHEMA_VERSION:
+            return
+        
+        # Verrou d'écriture pendant la migration : deux connexions ouvertes en
+        # même temps (threads du mode ASGI) ne recréent pas les triggers ensemble
+        self.connection.execute("BEGIN IMMEDIATE")
+        if self._schema_version() >= SCHEMA_VERSION:
+            # Migrée entre-temps par une autre connexion
+            self.connection.rollback()
+            return
         
         # Table des catégories
         self.connection.execute("""
@@ -61,11 +168,416 @@ class DatabaseManager:
         )
         """)
         
+        # Index sur la date : filtres par période et parcours triés sans tri en mémoire
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date)"
+        )
+        
+        # Index (catégorie, date) : pages filtrées par catégorie, lues dans l'ordre des dates
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_transactions_category_date "
+            "ON transactions(category_id, date)"
+        )
+        
+        # Sketches de quantiles des montants par catégorie, type et mois
+        self.connection.execute("""
+        CREATE TABLE IF NOT EXISTS quantile_sketches (
+            category_id INTEGER NOT NULL,
+            type TEXT NOT NULL,
+            month TEXT NOT NULL,
+            sketch BLOB NOT NULL,
+            PRIMARY KEY (category_id, type, month)
+        ) WITHOUT ROWID
+        """)
+        
+        # Mois dont le sketch est à reconstruire à sa prochaine lecture
+        self.connection.execute("""
+        CREATE TABLE IF NOT EXISTS quantile_sketch_dirty (
+            category_id INTEGER NOT NULL,
+            type TEXT NOT NULL,
+            month TEXT NOT NULL,
+            PRIMARY KEY (category_id, type, month)
+        ) WITHOUT ROWID
+        """)
+        self._mark_missing_sketches()
+        
+        # Agrégats pré-calculés (jour et mois) maintenus par triggers
+        self._create_rollups()
+        
+        # Suivi des modifications (séquence et tombstones) pour les exports incrémentaux
+        self._create_change_tracking()
+        self._create_reference_tracking()
+        
+        # Empreinte de contenu unique pour dédoublonner les imports
+        self._create_dedup_index()
+        
+        # File des tâches de fond (exports et rapports lancés depuis le web)
+        self.connection.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            params TEXT NOT NULL,
+            status TEXT NOT NULL CHECK(status IN ('queued', 'running', 'done', 'failed')),
+            total INTEGER,
+            progress INTEGER NOT NULL DEFAULT 0,
+            result_path TEXT,
+            error TEXT,
+            created_at TEXT NOT NULL,
+            started_at TEXT,
+            finished_at TEXT
+        )
+        """)
+        # Processus qui exécute la tâche et date de son dernier signe de vie
+        self._add_column_if_missing('jobs', 'owner', 'TEXT')
+        self._add_column_if_missing('jobs', 'heartbeat_at', 'REAL')
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, id)"
+        )
+        
+        # Clés d'idempotence des écritures web : empreintes de 16 octets,
+        # résultat rejoué aux requêtes répétées, purgées après expiration
+        self.connection.execute("""
+        CREATE TABLE IF NOT EXISTS idempotency_keys (
+            key BLOB PRIMARY KEY,
+            fingerprint BLOB NOT NULL,
+            created_at INTEGER NOT NULL,
+            status INTEGER,
+            response TEXT
+        ) WITHOUT ROWID
+        """)
+        
+        self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        
         # Initialiser les catégories par défaut
         self._init_default_categories()
         
+        # Une seule validation : le verrou d'écriture est gardé jusqu'ici
         self.connection.commit()
     
+    def _schema_version(self) -> int:
+        return self.connection.execute("PRAGMA user_version").fetchone()[0]
+
+    def _mark_missing_sketches(self) -> None:
+        """
+        Marque à reconstruire les mois d'une base existante sans sketches
+
+        La reconstruction se fait une fois, à la première lecture des
+        percentiles, et non à chaque ouverture d'un service.
+        """
+        if self.connection.execute("SELECT 1 FROM quantile_sketches LIMIT 1").fetchone():
+            return
+        self.connection.execute("""
+        INSERT OR IGNORE INTO quantile_sketch_dirty (category_id, type, month)
+        SELECT DISTINCT category_id, type, substr(date, 1, 7) FROM transactions
+        """)
+
+    def _create_rollups(self):
+        """
+        Crée la table d'agrégats par (niveau, période, catégorie, type)
+        
+        Les niveaux 'day' et 'month' sont maintenus par triggers sur
+        transactions ; les niveaux semaine et année sont des vues dérivées.
+        Le coût d'une statistique dépend ainsi du nombre de périodes et
+        non du nombre de transactions.
+        """
+        self.connection.execute("""
+        CREATE TABLE IF NOT EXISTS transaction_rollups (
+            level TEXT NOT NULL CHECK(level IN ('day', 'month')),
+            period TEXT NOT NULL,
+            category_id INTEGER NOT NULL,
+            type TEXT NOT NULL,
+            total REAL NOT NULL DEFAULT 0,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (level, period, category_id, type)
+        ) WITHOUT ROWID
+        """)
+        
+        add_new = """
+            INSERT INTO transaction_rollups (level, period, category_id, type, total, count)
+            VALUES ('day', NEW.date, NEW.category_id, NEW.type, NEW.amount, 1),
+                   ('month', substr(NEW.date, 1, 7), NEW.category_id, NEW.type, NEW.amount, 1)
+            ON CONFLICT (level, period, category_id, type)
+            DO UPDATE SET total = total + excluded.total, count = count + excluded.count;
+        """
+        remove_old = """
+            UPDATE transaction_rollups SET total = total - OLD.amount, count = count - 1
+            WHERE level = 'day' AND period = OLD.date
+            AND category_id = OLD.category_id AND type = OLD.type;
+            UPDATE transaction_rollups SET total = total - OLD.amount, count = count - 1
+            WHERE level = 'month' AND period = substr(OLD.date, 1, 7)
+            AND category_id = OLD.category_id AND type = OLD.type;
+            DELETE FROM transaction_rollups
+            WHERE level IN ('day', 'month') AND period IN (OLD.date, substr(OLD.date, 1, 7))
+            AND category_id = OLD.category_id AND type = OLD.type AND count <= 0;
+        """
+        
+        # Les insertions en masse arrivent avec change_seq déjà attribué :
+        # leurs agrégats sont mis à jour par bloc (apply_rollups)
+        self.connection.execute("DROP TRIGGER IF EXISTS trg_rollups_insert")
+        self.connection.execute(f"""
+        CREATE TRIGGER trg_rollups_insert AFTER INSERT ON transactions
+        WHEN NEW.change_seq = 0
+        BEGIN {add_new} END
+        """)
+        self.connection.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_rollups_delete AFTER DELETE ON transactions
+        BEGIN {remove_old} END
+        """)
+        self.connection.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_rollups_update
+        AFTER UPDATE OF amount, type, category_id, date ON transactions
+        BEGIN {remove_old} {add_new} END
+        """)
+        
+        self.connection.execute("""
+        CREATE VIEW IF NOT EXISTS rollup_weeks AS
+        SELECT strftime('%Y-W%W', period) AS period, category_id, type,
+               SUM(total) AS total, SUM(count) AS count
+        FROM transaction_rollups WHERE level = 'day'
+        GROUP BY 1, category_id, type
+        """)
+        self.connection.execute("""
+        CREATE VIEW IF NOT EXISTS rollup_years AS
+        SELECT substr(period, 1, 4) AS period, category_id, type,
+               SUM(total) AS total, SUM(count) AS count
+        FROM transaction_rollups WHERE level = 'month'
+        GROUP BY 1, category_id, type
+        """)
+        
+        # Base existante créée avant les agrégats : les calculer une fois
+        has_rollups = self.connection.execute(
+            "SELECT 1 FROM transaction_rollups LIMIT 1"
+        ).fetchone()
+        has_transactions = self.connection.execute(
+            "SELECT 1 FROM transactions LIMIT 1"
+        ).fetchone()
+        if has_transactions and not has_rollups:
+            self._rebuild_rollups()
+    
+    def _create_change_tracking(self):
+        """
+        Numérote chaque insertion, modification et suppression de transaction
+        
+        Un compteur unique fournit la séquence ; la colonne change_seq de
+        transactions garde la dernière modification de chaque ligne et
+        transaction_tombstones garde les suppressions.
+        """
+        self.connection.execute("""
+        CREATE TABLE IF NOT EXISTS change_counter (
+            id INTEGER PRIMARY KEY CHECK(id = 1),
+            value INTEGER NOT NULL
+        )
+        """)
+        self.connection.execute("INSERT OR IGNORE INTO change_counter (id, value) VALUES (1, 0)")
+        
+        self.connection.execute("""
+        CREATE TABLE IF NOT EXISTS transaction_tombstones (
+            transaction_id INTEGER PRIMARY KEY,
+            change_seq INTEGER NOT NULL,
+            deleted_at TEXT NOT NULL
+        )
+        """)
+        self.connection.execute("""
+        CREATE TABLE IF NOT EXISTS export_watermarks (
+            name TEXT PRIMARY KEY,
+            change_seq INTEGER NOT NULL,
+            exported_at TEXT NOT NULL
+        )
+        """)
+        
+        if self._add_column_if_missing('transactions', 'change_seq', 'INTEGER NOT NULL DEFAULT 0'):
+            # Lignes existantes : une séquence par ligne, dans l'ordre des IDs
+            self.connection.execute("UPDATE transactions SET change_seq = id")
+            self.connection.execute("""
+            UPDATE change_counter
+            SET value = (SELECT COALESCE(MAX(id), 0) FROM transactions)
+            WHERE id = 1
+            """)
+        
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_transactions_change_seq ON transactions(change_seq)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tombstones_change_seq "
+            "ON transaction_tombstones(change_seq)"
+        )
+        
+        next_seq = """
+            UPDATE change_counter SET value = value + 1 WHERE id = 1;
+        """
+        # Une insertion en masse réserve sa plage (reserve_change_sequence)
+        self.connection.execute("DROP TRIGGER IF EXISTS trg_changes_insert")
+        self.connection.execute(f"""
+        CREATE TRIGGER trg_changes_insert AFTER INSERT ON transactions
+        WHEN NEW.change_seq = 0
+        BEGIN
+            {next_seq}
+            UPDATE transactions SET change_seq = (SELECT value FROM change_counter WHERE id = 1)
+            WHERE id = NEW.id;
+        END
+        """)
+        self.connection.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_changes_update
+        AFTER UPDATE OF amount, description, type, category_id, date ON transactions
+        BEGIN
+            {next_seq}
+            UPDATE transactions SET change_seq = (SELECT value FROM change_counter WHERE id = 1)
+            WHERE id = NEW.id;
+        END
+        """)
+        self.connection.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_changes_delete AFTER DELETE ON transactions
+        BEGIN
+            {next_seq}
+            INSERT OR REPLACE INTO transaction_tombstones (transaction_id, change_seq, deleted_at)
+            VALUES (OLD.id, (SELECT value FROM change_counter WHERE id = 1), datetime('now'));
+        END
+        """)
+    
+    def _create_reference_tracking(self):
+        """
+        Version des budgets et des catégories, incrémentée par trigger
+        
+        Complète le numéro de modification des transactions dans
+        data_version() : les pages affichent aussi ces tables.
+        """
+        self.connection.execute("""
+        CREATE TABLE IF NOT EXISTS reference_version (
+            id INTEGER PRIMARY KEY CHECK(id = 1),
+            value INTEGER NOT NULL
+        )
+        """)
+        self.connection.execute("INSERT OR IGNORE INTO reference_version (id, value) VALUES (1, 0)")
+        
+        for table in ('budgets', 'categories'):
+            for event in ('INSERT', 'UPDATE', 'DELETE'):
+                self.connection.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE reference_version SET value = value + 1 WHERE id = 1;
+                END
+                """)
+    
+    def _create_dedup_index(self):
+        """
+        Ajoute le compte et l'empreinte de contenu des transactions
+        
+        L'index unique sur content_hash permet de détecter un doublon par
+        une simple recherche d'index. Les lignes existantes reçoivent leur
+        empreinte à la migration, dans l'ordre des IDs.
+        """
+        self._add_column_if_missing('transactions', 'account', 'TEXT')
+        self._add_column_if_missing('transactions', 'content_hash', 'TEXT')
+        
+        missing = self.connection.execute(
+            "SELECT 1 FROM transactions WHERE content_hash IS NULL LIMIT 1"
+        ).fetchone()
+        if missing:
+            self.backfill_content_hashes()
+        
+        self.connection.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_content_hash "
+            "ON transactions(content_hash)"
+        )
+    
+    def backfill_content_hashes(self) -> None:
+        """Calcule l'empreinte de toutes les transactions (lignes identiques numérotées)"""
+        self.connection.execute("UPDATE transactions SET content_hash = NULL")
+        hasher = ContentHasher()
+        last_id = 0
+        while True:
+            # Parcours par plages d'IDs : chaque lecture est terminée avant l'écriture
+            rows = self.connection.execute(
+                """
+                SELECT id, date, amount, type, description, account FROM transactions
+                WHERE id > ? ORDER BY id LIMIT 10000
+                """,
+                (last_id,)
+            ).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            self.connection.executemany(
+                "UPDATE transactions SET content_hash = ? WHERE id = ?",
+                [
+                    (hasher(date_iso, signed_amount(amount, kind), description, account), row_id)
+                    for row_id, date_iso, amount, kind, description, account in rows
+                ]
+            )
+    
+    def _add_column_if_missing(self, table: str, column: str, definition: str) -> bool:
+        """Ajoute une colonne à une table existante ; retourne True si elle a été créée"""
+        columns = [row['name'] for row in self.connection.execute(f"PRAGMA table_info({table})")]
+        if column in columns:
+            return False
+        self.connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        return True
+    
+    def data_version(self) -> str:
+        """
+        Version des données affichées par les pages
+        
+        Numéro de modification des transactions et version des budgets et
+        catégories, lus dans la base : toutes les connexions (threads,
+        processus) donnent la même version pour les mêmes données. Sert
+        d'ETag aux pages calculées et de clé à leurs caches.
+        """
+        row = self.connection.execute("""
+            SELECT (SELECT value FROM change_counter WHERE id = 1),
+                   (SELECT value FROM reference_version WHERE id = 1)
+        """).fetchone()
+        return f"{row[0]}-{row[1]}"
+    
+    def get_change_sequence(self) -> int:
+        """Retourne le dernier numéro de modification des transactions"""
+        row = self.connection.execute("SELECT value FROM change_counter WHERE id = 1").fetchone()
+        return row[0] if row else 0
+    
+    def reserve_change_sequence(self, count: int) -> int:
+        """
+        Réserve une plage de numéros de modification pour une insertion en masse
+        
+        Returns:
+            Premier numéro de la plage (les suivants sont consécutifs)
+        """
+        self.connection.execute(
+            "UPDATE change_counter SET value = value + ? WHERE id = 1", (count,)
+        )
+        return self.get_change_sequence() - count + 1
+    
+    def apply_rollups(self, first_seq: int, last_seq: int) -> None:
+        """Ajoute aux agrégats les transactions insérées avec change_seq dans la plage"""
+        for level, period in (('day', 'date'), ('month', 'substr(date, 1, 7)')):
+            self.connection.execute(f"""
+            INSERT INTO transaction_rollups (level, period, category_id, type, total, count)
+            SELECT '{level}', {period}, category_id, type, SUM(amount), COUNT(*)
+            FROM transactions WHERE change_seq BETWEEN ? AND ?
+            GROUP BY {period}, category_id, type
+            ON CONFLICT (level, period, category_id, type)
+            DO UPDATE SET total = total + excluded.total, count = count + excluded.count
+            """, (first_seq, last_seq))
+    
+    def rebuild_rollups(self) -> None:
+        """Recalcule entièrement les agrégats depuis la table transactions"""
+        self._rebuild_rollups()
+        self.connection.commit()
+    
+    def _rebuild_rollups(self) -> None:
+        # Sans validation : appelé aussi pendant la migration, qui garde le
+        # verrou d'écriture jusqu'à sa propre validation
+        self.connection.execute("DELETE FROM transaction_rollups")
+        self.connection.execute("""
+        INSERT INTO transaction_rollups (level, period, category_id, type, total, count)
+        SELECT 'day', date, category_id, type, SUM(amount), COUNT(*)
+        FROM transactions GROUP BY date, category_id, type
+        """)
+        self.connection.execute("""
+        INSERT INTO transaction_rollups (level, period, category_id, type, total, count)
+        SELECT 'month', substr(date, 1, 7), category_id, type, SUM(amount), COUNT(*)
+        FROM transactions GROUP BY substr(date, 1, 7), category_id, type
+        """)
+    
     def _init_default_categories(self):
         """Initialise les catégories par défaut"""
         default_categories = [
@@ -86,8 +598,6 @@ class DatabaseManager:
             except sqlite3.IntegrityError:
                 # La catégorie existe déjà
                 pass
-        
-        self.connection.commit()
     
     def execute_query(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
         """
@@ -106,6 +616,34 @@ class DatabaseManager:
         # Convertir les Row en dictionnaires
         return [dict(row) for row in rows]
     
+    def iter_query(self, query: str, params: tuple = (),
+                   chunk_size: int = 1000) -> Iterator[List[tuple]]:
+        """
+        Exécute une requête SELECT et retourne les résultats par blocs
+        
+        Les lignes sont des tuples simples (sans conversion en dictionnaire)
+        et seul un bloc est en mémoire à la fois.
+        
+        Args:
+            query: La requête SQL à exécuter
+            params: Les paramètres de la requête
+            chunk_size: Nombre de lignes par bloc
+            
+        Returns:
+            Itérateur de listes de tuples
+        """
+        cursor = self.connection.cursor()
+        cursor.row_factory = None
+        cursor.execute(query, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+    
     def execute_update(self, query: str, params: tuple = ()) -> int:
         """
         Exécute une requête INSERT, UPDATE ou DELETE
@@ -129,6 +667,9 @@ class DatabaseManager:
         """
         self.connection.execute("DELETE FROM transactions")
         self.connection.execute("DELETE FROM budgets")
+        self.connection.execute("DELETE FROM quantile_sketches")
+        self.connection.execute("DELETE FROM quantile_sketch_dirty")
+        self.connection.execute("DELETE FROM transaction_rollups")
         self.connection.commit()
 
     def close(self):
@@ -143,3 +684,71 @@ class DatabaseManager:
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Support pour le context manager"""
         self.close()
+
+
+class ThreadLocalDatabaseManager:
+    """
+    Une connexion DatabaseManager par thread, derrière une seule instance
+
+    Une connexion SQLite ne sert que dans le thread qui l'a ouverte : les
+    services reçoivent cet objet à la place d'un DatabaseManager et chaque
+    thread (pool du mode ASGI, serveur Flask threadé) ouvre sa propre
+    connexion à son premier accès. Les attributs sont délégués à la
+    connexion du thread courant.
+    """
+
+    def __init__(self, db_path: str = "data/budget.db"):
+        if db_path == ":memory:":
+            raise ValueError("Une base en mémoire ne peut pas être partagée entre threads")
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._open = 0
+
+    def get(self) -> DatabaseManager:
+        """Retourne la connexion du thread courant, ouverte au premier appel"""
+        manager = getattr(self._local, 'manager', None)
+        if manager is None:
+            manager = DatabaseManager(self.db_path)
+            self._local.manager = manager
+            with self._lock:
+                self._open += 1
+        return manager
+
+    def keep_open(self) -> None:
+        """Garde la connexion du thread courant d'une requête à l'autre (threads d'un pool)"""
+        self._local.keep = True
+
+    def release(self) -> None:
+        """
+        Fin de requête : ferme la connexion du thread courant
+
+        Le serveur threadé de Flask sert chaque requête dans un nouveau
+        thread, dont la connexion ne resservirait jamais ; les threads
+        marqués par keep_open() gardent la leur.
+        """
+        if not getattr(self._local, 'keep', False):
+            self.close()
+
+    @property
+    def open_connections(self) -> int:
+        """Connexions ouvertes, tous threads confondus"""
+        return self._open
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.get(), name)
+
+    def close(self) -> None:
+        """Ferme la connexion du thread courant"""
+        manager = getattr(self._local, 'manager', None)
+        if manager is not None:
+            manager.close()
+            self._local.manager = None
+            with self._lock:
+                self._open -= 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -374,9 +374,13 @@ class MyBudgetApp:
                 date=transaction_date
             )
             
+            existing_id = self.transaction_service.find_duplicate(transaction)
             transaction_id = self.transaction_service.add_transaction(transaction)
             
-            messagebox.showinfo("Succès", f"Transaction ajoutée (ID: {transaction_id})")
+            message = f"Transaction ajoutée (ID: {transaction_id})"
+            if existing_id:
+                message += f"\nUne transaction identique était déjà enregistrée (ID: {existing_id})"
+            messagebox.showinfo("Succès", message)
             
             # Réinitialiser le formulaire
             self.amount_var.set("")
@@ -531,12 +535,12 @@ class MyBudgetApp:
     
     def refresh_dashboard(self):
         """Rafraîchit le tableau de bord."""
-        # Calculer les totaux
-        all_transactions = self.transaction_service.list_transactions()
+        # Calculer les totaux depuis les agrégats
+        totals = self.stats_service.get_totals()
         
-        total_revenue = sum(t.amount for t in all_transactions if t.type == "revenu")
-        total_expense = sum(t.amount for t in all_transactions if t.type == "dépense")
-        balance = total_revenue - total_expense
+        total_revenue = totals['total_revenus']
+        total_expense = totals['total_depenses']
+        balance = totals['balance']
         
         # Mettre à jour les cartes
         self.revenue_card.value_label.config(text=f"{total_revenue:.2f} €")
@@ -1,17 +1,30 @@
 # src/services/budget_service.py
 
 from datetime import date
-from typing import List, Optional, Dict
+from typing import Iterable, Iterator, List, Optional, Dict, Tuple
 from src.database.db_manager import DatabaseManager
 from src.models.budget import Budget
 from src.services.transaction_service import TransactionService
+from src.utils.events import Event, EventBus
 
 class BudgetService:
     """Service pour gérer les budgets"""
     
-    def __init__(self, db_manager: DatabaseManager, transaction_service: TransactionService):
+    def __init__(self, db_manager: DatabaseManager, transaction_service: TransactionService,
+                 events: Optional[EventBus] = None):
+        """
+        Args:
+            db_manager: Base de données
+            transaction_service: Service des transactions
+            events: Bus d'événements ; après chaque écriture de transaction,
+                    le statut des budgets touchés y est publié ('budget'),
+                    avec une alerte ('alert') pour chaque budget dépassé
+        """
         self.db = db_manager
         self.transaction_service = transaction_service
+        self.events = events
+        if events is not None:
+            events.subscribe(self._on_transactions_changed, ('transaction', 'transactions'))
     
     def create_budget(self, budget: Budget) -> int:
         """Crée un nouveau budget et retourne son ID"""
@@ -25,7 +38,14 @@ class BudgetService:
             budget.period_start.isoformat(),
             budget.period_end.isoformat()
         )
-        return self.db.execute_update(query, params)
+        budget_id = self.db.execute_update(query, params)
+        if self.events is not None:
+            statuses = self.get_budget_statuses(budget.category_id, budget.period_start,
+                                                budget.period_end)
+            self._publish_statuses([
+                status for status in statuses if status['budget_id'] == budget_id
+            ])
+        return budget_id
     
     def get_budget_status(self, category_id: int, period_start: date, period_end: date) -> Optional[Dict]:
         """Récupère le statut d'un budget (montant, dépensé, restant, %)"""
@@ -65,6 +85,165 @@ class BudgetService:
             'is_exceeded': is_exceeded
         }
     
+    def get_budget_statuses(
+        self,
+        category_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> List[Dict]:
+        """
+        Statut de tous les budgets (ou d'une sélection) en une seule requête
+        
+        Les dépenses sont sommées sur les agrégats journaliers, groupées par
+        budget. Un budget est retenu s'il chevauche la période demandée.
+        
+        Returns:
+            Liste de statuts comme get_budget_status, complétés du nom de
+            la catégorie et des dates de période, du plus récent au plus ancien
+        """
+        where, params = self._build_filters(category_id, start_date, end_date)
+        query = f"""
+        SELECT b.id, b.category_id, b.amount, b.period_start, b.period_end,
+               c.name AS category, COALESCE(SUM(r.total), 0) AS spent
+        FROM budgets b
+        LEFT JOIN categories c ON c.id = b.category_id
+        LEFT JOIN transaction_rollups r
+            ON r.level = 'day'
+            AND r.category_id = b.category_id
+            AND r.type = 'dépense'
+            AND r.period >= b.period_start
+            AND r.period <= b.period_end
+        WHERE {where}
+        GROUP BY b.id
+        ORDER BY b.period_start DESC, b.id
+        """
+        
+        statuses = []
+        for row in self.db.execute_query(query, params):
+            budget_amount = row['amount']
+            spent = round(row['spent'], 2)
+            percentage = (spent / budget_amount * 100) if budget_amount > 0 else 0
+            statuses.append({
+                'budget_id': row['id'],
+                'category_id': row['category_id'],
+                'category': row['category'] or "Unknown",
+                'period_start': row['period_start'],
+                'period_end': row['period_end'],
+                'budget_amount': budget_amount,
+                'spent': spent,
+                'remaining': budget_amount - spent,
+                'percentage': round(percentage, 1),
+                'is_exceeded': spent > budget_amount
+            })
+        return statuses
+    
+    def get_affected_statuses(self, category_ids: Iterable[int], start_date: date,
+                              end_date: date) -> List[Dict]:
+        """
+        Statut des budgets de ces catégories qui chevauchent la période
+
+        Sert après une écriture (alertes de la CLI, événements du web) :
+        une seule requête groupée, quel que soit le nombre de budgets.
+        """
+        category_ids = set(category_ids)
+        if len(category_ids) == 1:
+            return self.get_budget_statuses(next(iter(category_ids)), start_date, end_date)
+        return [
+            status for status in self.get_budget_statuses(None, start_date, end_date)
+            if status['category_id'] in category_ids
+        ]
+    
+    def _on_transactions_changed(self, event: Event) -> None:
+        """Recalcule et publie les budgets touchés par une écriture de transactions"""
+        data = event.data
+        if event.type == 'transactions':
+            category_ids = set(data['category_ids'])
+            dates = [data['start'], data['end']]
+        else:
+            # Un revenu ajouté ou supprimé ne change aucun budget
+            if data['type'] == 'revenu' and data['action'] in ('added', 'deleted'):
+                return
+            category_ids = {data['category_id']}
+            dates = [data['date']]
+            previous = data.get('previous')
+            if previous:
+                category_ids.add(previous['category_id'])
+                dates.append(previous['date'])
+        
+        self._publish_statuses(self.get_affected_statuses(
+            category_ids, date.fromisoformat(min(dates)), date.fromisoformat(max(dates))
+        ))
+    
+    def _publish_statuses(self, statuses: List[Dict]) -> None:
+        for status in statuses:
+            self.events.publish('budget', status)
+            if status['is_exceeded']:
+                exceeded_by = round(status['spent'] - status['budget_amount'], 2)
+                self.events.publish('alert', {
+                    'budget_id': status['budget_id'],
+                    'category_id': status['category_id'],
+                    'category': status['category'],
+                    'period_start': status['period_start'],
+                    'period_end': status['period_end'],
+                    'budget_amount': status['budget_amount'],
+                    'spent': status['spent'],
+                    'exceeded_by': exceeded_by,
+                    'message': f"Budget {status['category']} dépassé de {exceeded_by:.2f} €",
+                })
+    
+    def iter_budget_transaction_rows(
+        self,
+        category_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        chunk_size: int = 5000
+    ) -> Iterator[List[Tuple]]:
+        """
+        Parcourt par blocs les dépenses rattachées aux budgets sélectionnés
+        
+        Chaque ligne vaut (budget_id, id, date, amount, description, type,
+        category_id), dans l'ordre des budgets de get_budget_statuses puis
+        par date décroissante. Une dépense couverte par deux budgets
+        apparaît pour chacun.
+        """
+        where, params = self._build_filters(category_id, start_date, end_date)
+        query = f"""
+        SELECT b.id, t.id, t.date, t.amount, t.description, t.type, t.category_id
+        FROM budgets b
+        JOIN transactions t
+            ON t.category_id = b.category_id
+            AND t.type = 'dépense'
+            AND t.date >= b.period_start
+            AND t.date <= b.period_end
+        WHERE {where}
+        ORDER BY b.period_start DESC, b.id, t.date DESC
+        """
+        return self.db.iter_query(query, params, chunk_size)
+    
+    @staticmethod
+    def _build_filters(
+        category_id: Optional[int],
+        start_date: Optional[date],
+        end_date: Optional[date]
+    ) -> Tuple[str, tuple]:
+        """Clause WHERE sur les budgets : catégorie et chevauchement de période"""
+        clauses = ["1=1"]
+        params = []
+        
+        if category_id:
+            clauses.append("b.category_id = ?")
+            params.append(category_id)
+        
+        if start_date:
+            clauses.append("b.period_end >= ?")
+            params.append(start_date.isoformat())
+        
+        if end_date:
+            clauses.append("b.period_start <= ?")
+            params.append(end_date.isoformat())
+        
+        return " AND ".join(clauses), tuple(params)
+    
     def list_budgets(self, category_id: Optional[int] = None) -> List[Budget]:
         """Liste tous les budgets, avec filtre optionnel par catégorie"""
         query = "SELECT * FROM budgets"
@@ -1,12 +1,75 @@
 # src/services/export_service.py
 
+import calendar
 import csv
+import hashlib
+import io
 import json
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date, datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from src.database.db_manager import DatabaseManager
 from src.services.transaction_service import TransactionService
+from src.utils.columnar import ColumnarReader, ColumnarWriter
+from src.utils.streams import COMPRESSIONS, open_text_output
+
+CSV_FIELDS = ['id', 'date', 'amount', 'description', 'type', 'category_id']
+
+# Colonnes du format binaire colonnaire (dates en ordinal, type 1 = revenu)
+COLUMNAR_SCHEMA = [
+    ('id', 'q'),
+    ('date', 'i'),
+    ('amount', 'd'),
+    ('type', 'b'),
+    ('category_id', 'i'),
+    ('description', 's'),
+]
+
+# Format d'export -> (méthode d'ExportService, extension)
+EXPORT_FORMATS = {
+    'csv': ('export_transactions_to_csv', '.csv'),
+    'json': ('export_transactions_to_json', '.json'),
+    'jsonl': ('export_transactions_to_jsonl', '.jsonl'),
+}
+
+
+class ExportProgress:
+    """Suivi de progression d'un export (lignes écrites et débit)"""
+    
+    def __init__(self, callback: Optional[Callable[['ExportProgress'], None]] = None,
+                 every: int = 100000):
+        """
+        Args:
+            callback: Fonction appelée avec la progression toutes les `every` lignes
+            every: Intervalle de notification en nombre de lignes
+        """
+        self.callback = callback
+        self.every = every
+        self.rows = 0
+        self.started_at = time.perf_counter()
+        self._next_report = every
+    
+    @property
+    def elapsed(self) -> float:
+        """Durée écoulée en secondes"""
+        return time.perf_counter() - self.started_at
+    
+    @property
+    def rows_per_second(self) -> float:
+        """Débit moyen en lignes par seconde"""
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed > 0 else 0.0
+    
+    def advance(self, rows: int) -> None:
+        """Ajoute des lignes écrites et notifie si l'intervalle est atteint"""
+        self.rows += rows
+        if self.callback and self.rows >= self._next_report:
+            self.callback(self)
+            while self._next_report <= self.rows:
+                self._next_report += self.every
+
 
 class ExportService:
     """Service pour exporter les données en CSV et JSON"""
@@ -20,47 +83,86 @@ class ExportService:
         filepath: str,
         category_id: Optional[int] = None,
         start_date: Optional[date] = None,
-        end_date: Optional[date] = None
+        end_date: Optional[date] = None,
+        chunk_size: int = 5000,
+        buffer_size: Optional[int] = None,
+        progress: Optional[ExportProgress] = None,
+        compress: Optional[str] = None,
+        compress_level: Optional[int] = None
     ) -> int:
         """
         Exporte les transactions en CSV
         
+        Les lignes sont lues par blocs depuis un curseur et écrites au fil
+        de l'eau : la mémoire utilisée ne dépend pas du nombre de lignes.
+        
         Args:
             filepath: Chemin du fichier CSV de sortie
             category_id: Filtrer par catégorie (optionnel)
             start_date: Date de début (optionnel)
             end_date: Date de fin (optionnel)
+            chunk_size: Nombre de lignes lues par bloc
+            buffer_size: Taille du tampon d'écriture en octets (optionnel)
+            progress: Suivi de progression (lignes, lignes/s) (optionnel)
+            compress: 'gzip', 'bz2' ou 'xz' ; déduit de l'extension si absent
+            compress_level: Niveau de compression (optionnel)
             
         Returns:
             Nombre de transactions exportées
         """
-        # Récupérer les transactions
-        transactions = self.transaction_service.list_transactions(
-            category_id=category_id,
-            start_date=start_date,
-            end_date=end_date
-        )
+        progress = progress or ExportProgress()
         
         # Créer le dossier parent si nécessaire
         Path(filepath).parent.mkdir(parents=True, exist_ok=True)
         
         # Écrire le CSV
-        with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['id', 'date', 'amount', 'description', 'type', 'category_id']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            writer.writeheader()
-            for t in transactions:
-                writer.writerow({
-                    'id': t.id,
-                    'date': t.date.isoformat(),
-                    'amount': t.amount,
-                    'description': t.description,
-                    'type': t.type,
-                    'category_id': t.category_id
-                })
+        with open_text_output(filepath, compress, compress_level, buffer_size,
+                              newline='') as csvfile:
+            for chunk in self.iter_transactions_csv(
+                category_id=category_id,
+                start_date=start_date,
+                end_date=end_date,
+                chunk_size=chunk_size,
+                progress=progress
+            ):
+                csvfile.write(chunk)
         
-        return len(transactions)
+        return progress.rows
+    
+    def iter_transactions_csv(
+        self,
+        category_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        transaction_type: Optional[str] = None,
+        chunk_size: int = 5000,
+        progress: Optional[ExportProgress] = None
+    ) -> Iterator[str]:
+        """
+        Génère le CSV des transactions par morceaux de texte
+        
+        Returns:
+            Itérateur de chaînes : l'en-tête puis un morceau par bloc de lignes
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        
+        writer.writerow(CSV_FIELDS)
+        yield buffer.getvalue()
+        
+        for rows in self.transaction_service.iter_transaction_rows(
+            category_id=category_id,
+            start_date=start_date,
+            end_date=end_date,
+            transaction_type=transaction_type,
+            chunk_size=chunk_size
+        ):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            if progress:
+                progress.advance(len(rows))
     
     def export_transactions_to_json(
         self,
@@ -68,46 +170,495 @@ class ExportService:
         category_id: Optional[int] = None,
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
-        pretty: bool = True
+        pretty: bool = True,
+        chunk_size: int = 5000,
+        buffer_size: Optional[int] = None,
+        progress: Optional[ExportProgress] = None,
+        compress: Optional[str] = None,
+        compress_level: Optional[int] = None
     ) -> int:
         """
         Exporte les transactions en JSON
         
+        Le tableau 'transactions' est écrit au fil de la lecture ; le champ
+        'count' est placé après le tableau, ce qui évite un pré-comptage.
+        
         Args:
             filepath: Chemin du fichier JSON de sortie
             category_id: Filtrer par catégorie (optionnel)
             start_date: Date de début (optionnel)
             end_date: Date de fin (optionnel)
             pretty: Formater le JSON avec indentation
+            chunk_size: Nombre de lignes lues par bloc
+            buffer_size: Taille du tampon d'écriture en octets (optionnel)
+            progress: Suivi de progression (lignes, lignes/s) (optionnel)
+            compress: 'gzip', 'bz2' ou 'xz' ; déduit de l'extension si absent
+            compress_level: Niveau de compression (optionnel)
             
         Returns:
             Nombre de transactions exportées
         """
-        # Récupérer les transactions
-        transactions = self.transaction_service.list_transactions(
+        progress = progress or ExportProgress()
+        
+        # Créer le dossier parent si nécessaire
+        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+        
+        # Écrire le JSON
+        with open_text_output(filepath, compress, compress_level, buffer_size) as jsonfile:
+            for chunk in self.iter_transactions_json(
+                category_id=category_id,
+                start_date=start_date,
+                end_date=end_date,
+                pretty=pretty,
+                chunk_size=chunk_size,
+                progress=progress
+            ):
+                jsonfile.write(chunk)
+        
+        return progress.rows
+    
+    def export_transactions_to_jsonl(
+        self,
+        filepath: str,
+        category_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        chunk_size: int = 5000,
+        buffer_size: Optional[int] = None,
+        progress: Optional[ExportProgress] = None,
+        compress: Optional[str] = None,
+        compress_level: Optional[int] = None
+    ) -> int:
+        """
+        Exporte les transactions en JSON Lines (un objet JSON par ligne)
+        
+        Args:
+            filepath: Chemin du fichier JSONL de sortie
+            category_id: Filtrer par catégorie (optionnel)
+            start_date: Date de début (optionnel)
+            end_date: Date de fin (optionnel)
+            chunk_size: Nombre de lignes lues par bloc
+            buffer_size: Taille du tampon d'écriture en octets (optionnel)
+            progress: Suivi de progression (lignes, lignes/s) (optionnel)
+            compress: 'gzip', 'bz2' ou 'xz' ; déduit de l'extension si absent
+            compress_level: Niveau de compression (optionnel)
+            
+        Returns:
+            Nombre de transactions exportées
+        """
+        progress = progress or ExportProgress()
+        
+        # Créer le dossier parent si nécessaire
+        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+        
+        with open_text_output(filepath, compress, compress_level, buffer_size) as jsonlfile:
+            for chunk in self.iter_transactions_jsonl(
+                category_id=category_id,
+                start_date=start_date,
+                end_date=end_date,
+                chunk_size=chunk_size,
+                progress=progress
+            ):
+                jsonlfile.write(chunk)
+        
+        return progress.rows
+    
+    def iter_transactions_json(
+        self,
+        category_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        transaction_type: Optional[str] = None,
+        pretty: bool = True,
+        chunk_size: int = 5000,
+        progress: Optional[ExportProgress] = None
+    ) -> Iterator[str]:
+        """
+        Génère le document JSON des transactions par morceaux de texte
+        
+        Returns:
+            Itérateur de chaînes formant {'export_date', 'transactions', 'count'}
+        """
+        export_date = json.dumps(datetime.now().isoformat())
+        if pretty:
+            yield f'{{\n  "export_date": {export_date},\n  "transactions": ['
+            separator, indent = ',\n    ', 2
+        else:
+            yield f'{{"export_date": {export_date}, "transactions": ['
+            separator, indent = ', ', None
+        
+        count = 0
+        for rows in self.transaction_service.iter_transaction_rows(
             category_id=category_id,
             start_date=start_date,
-            end_date=end_date
+            end_date=end_date,
+            transaction_type=transaction_type,
+            chunk_size=chunk_size
+        ):
+            items = [
+                json.dumps(_row_to_dict(row), indent=indent, ensure_ascii=False)
+                for row in rows
+            ]
+            if pretty:
+                items = [item.replace('\n', '\n    ') for item in items]
+            text = separator.join(items)
+            yield (separator if count else ('\n    ' if pretty else '')) + text
+            count += len(rows)
+            if progress:
+                progress.advance(len(rows))
+        
+        if pretty:
+            yield f'\n  ],\n  "count": {count}\n}}\n'
+        else:
+            yield f'], "count": {count}}}'
+    
+    def iter_transactions_jsonl(
+        self,
+        category_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        transaction_type: Optional[str] = None,
+        chunk_size: int = 5000,
+        progress: Optional[ExportProgress] = None
+    ) -> Iterator[str]:
+        """
+        Génère les transactions au format JSON Lines par morceaux de texte
+        
+        Returns:
+            Itérateur de chaînes, un objet JSON compact par ligne
+        """
+        for rows in self.transaction_service.iter_transaction_rows(
+            category_id=category_id,
+            start_date=start_date,
+            end_date=end_date,
+            transaction_type=transaction_type,
+            chunk_size=chunk_size
+        ):
+            yield ''.join(
+                json.dumps(_row_to_dict(row), ensure_ascii=False, separators=(',', ':')) + '\n'
+                for row in rows
+            )
+            if progress:
+                progress.advance(len(rows))
+    
+    def export_transactions_to_columnar(
+        self,
+        filepath: str,
+        category_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        chunk_size: int = 65536,
+        progress: Optional[ExportProgress] = None
+    ) -> int:
+        """
+        Exporte les transactions au format binaire colonnaire (.mbcol)
+        
+        Chaque bloc lu devient un groupe de colonnes typées (array/struct),
+        relisible sans analyse via ColumnarReader (mmap).
+        
+        Args:
+            filepath: Chemin du fichier de sortie
+            category_id: Filtrer par catégorie (optionnel)
+            start_date: Date de début (optionnel)
+            end_date: Date de fin (optionnel)
+            chunk_size: Nombre de lignes par groupe
+            progress: Suivi de progression (lignes, lignes/s) (optionnel)
+            
+        Returns:
+            Nombre de transactions exportées
+        """
+        progress = progress or ExportProgress()
+        
+        # Créer le dossier parent si nécessaire
+        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+        
+        with open(filepath, 'wb') as binfile:
+            writer = ColumnarWriter(binfile, COLUMNAR_SCHEMA)
+            for rows in self.transaction_service.iter_transaction_rows(
+                category_id=category_id,
+                start_date=start_date,
+                end_date=end_date,
+                chunk_size=chunk_size
+            ):
+                ids, dates, amounts, descriptions, types, category_ids = zip(*rows)
+                writer.write_row_group({
+                    'id': ids,
+                    'date': [date.fromisoformat(d).toordinal() for d in dates],
+                    'amount': amounts,
+                    'type': [1 if t == 'revenu' else 0 for t in types],
+                    'category_id': category_ids,
+                    'description': descriptions,
+                })
+                progress.advance(len(rows))
+        
+        return progress.rows
+    
+    def load_transactions_from_columnar(self, filepath: str) -> int:
+        """
+        Recharge un export colonnaire dans la base en une seule transaction
+        
+        Les transactions reçoivent de nouveaux IDs. Pour l'analyse sans
+        passer par la base, utiliser directement ColumnarReader.read_columns().
+        
+        Args:
+            filepath: Fichier .mbcol produit par export_transactions_to_columnar
+            
+        Returns:
+            Nombre de transactions insérées (les doublons sont ignorés)
+        """
+        with ColumnarReader(filepath) as reader:
+            stats = self.transaction_service.add_transactions_bulk(
+                row
+                for group in reader.iter_row_groups()
+                for row in _columnar_to_rows(group)
+            )
+        return stats['inserted']
+    
+    def export_changes_to_json(
+        self,
+        filepath: str,
+        since: Optional[int] = None,
+        name: str = 'default',
+        chunk_size: int = 5000,
+        compress: Optional[str] = None,
+        compress_level: Optional[int] = None
+    ) -> Dict:
+        """
+        Exporte uniquement les modifications depuis un watermark
+        
+        Le fichier contient les transactions insérées ou modifiées depuis
+        le watermark, les IDs supprimés, et le nouveau watermark. Celui-ci
+        est aussi enregistré sous `name` pour que l'export suivant reprenne
+        à partir de là.
+        
+        Args:
+            filepath: Chemin du fichier JSON de sortie
+            since: Watermark de départ ; par défaut celui enregistré sous `name`
+            name: Nom du watermark enregistré (un par tâche d'export)
+            chunk_size: Nombre de lignes lues par bloc
+            compress: 'gzip', 'bz2' ou 'xz' ; déduit de l'extension si absent
+            compress_level: Niveau de compression (optionnel)
+            
+        Returns:
+            Dictionnaire avec since, watermark, et le nombre de lignes
+            modifiées et supprimées
+        """
+        if since is None:
+            since = self.get_watermark(name)
+        
+        # Les modifications postérieures à cette lecture ont une séquence
+        # plus grande : elles seront reprises par l'export suivant
+        watermark = self.db.get_change_sequence()
+        
+        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+        
+        counts = {'count': 0, 'deleted_count': 0}
+        with open_text_output(filepath, compress, compress_level) as jsonfile:
+            jsonfile.write(
+                f'{{"export_date": {json.dumps(datetime.now().isoformat())}, '
+                f'"since": {since}, "watermark": {watermark}, "transactions": ['
+            )
+            
+            for rows in self.db.iter_query(
+                """
+                SELECT id, date, amount, description, type, category_id
+                FROM transactions
+                WHERE change_seq > ? AND change_seq <= ?
+                ORDER BY change_seq
+                """,
+                (since, watermark),
+                chunk_size
+            ):
+                items = ', '.join(json.dumps(_row_to_dict(row), ensure_ascii=False) for row in rows)
+                jsonfile.write((', ' if counts['count'] else '') + items)
+                counts['count'] += len(rows)
+            
+            jsonfile.write('], "deleted": [')
+            for rows in self.db.iter_query(
+                """
+                SELECT transaction_id FROM transaction_tombstones
+                WHERE change_seq > ? AND change_seq <= ?
+                ORDER BY change_seq
+                """,
+                (since, watermark),
+                chunk_size
+            ):
+                ids = ', '.join(str(row[0]) for row in rows)
+                jsonfile.write((', ' if counts['deleted_count'] else '') + ids)
+                counts['deleted_count'] += len(rows)
+            
+            jsonfile.write(
+                f'], "count": {counts["count"]}, "deleted_count": {counts["deleted_count"]}}}'
+            )
+        
+        self.db.execute_update(
+            """
+            INSERT OR REPLACE INTO export_watermarks (name, change_seq, exported_at)
+            VALUES (?, ?, ?)
+            """,
+            (name, watermark, datetime.now().isoformat())
         )
         
-        # Convertir en dictionnaires
-        data = {
+        return {'since': since, 'watermark': watermark, **counts}
+    
+    def get_watermark(self, name: str = 'default') -> int:
+        """Retourne le watermark enregistré sous `name` (0 si aucun export)"""
+        results = self.db.execute_query(
+            "SELECT change_seq FROM export_watermarks WHERE name = ?",
+            (name,)
+        )
+        return results[0]['change_seq'] if results else 0
+    
+    def export_partitioned(
+        self,
+        output_dir: str,
+        export_format: str = 'csv',
+        partition_by: str = 'month',
+        workers: int = 4,
+        category_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        compress: Optional[str] = None,
+        compress_level: Optional[int] = None
+    ) -> Dict:
+        """
+        Exporte les transactions en un fichier par mois ou par catégorie
+        
+        Les partitions sont écrites en parallèle sur un pool de processus,
+        chacun avec sa propre connexion en lecture seule. Un fichier
+        manifest.json liste les partitions, leur nombre de lignes et leur
+        empreinte SHA-256.
+        
+        Args:
+            output_dir: Dossier de sortie (créé si nécessaire)
+            export_format: 'csv', 'json' ou 'jsonl'
+            partition_by: 'month' ou 'category'
+            workers: Nombre de processus (1 = export séquentiel)
+            category_id: Filtrer par catégorie (optionnel)
+            start_date: Date de début (optionnel)
+            end_date: Date de fin (optionnel)
+            compress: 'gzip', 'bz2' ou 'xz' (optionnel)
+            compress_level: Niveau de compression (optionnel)
+            
+        Returns:
+            Le contenu du manifeste
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Format inconnu: {export_format}")
+        if partition_by not in ('month', 'category'):
+            raise ValueError("Le partitionnement doit être 'month' ou 'category'")
+        
+        output = Path(output_dir)
+        output.mkdir(parents=True, exist_ok=True)
+        
+        extension = EXPORT_FORMATS[export_format][1]
+        if compress:
+            extension += COMPRESSIONS[compress]
+        
+        jobs = []
+        for key, filters in self._plan_partitions(partition_by, category_id, start_date, end_date):
+            filename = f"transactions_{key}{extension}"
+            jobs.append((key, filename, filters))
+        
+        options = {'compress': compress, 'compress_level': compress_level}
+        tasks = [
+            (self.db.db_path, export_format, str(output / filename), filters, options)
+            for _, filename, filters in jobs
+        ]
+        
+        if workers <= 1 or self.db.db_path == ":memory:" or len(tasks) <= 1:
+            results = [self._export_partition_file(*task[1:]) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_export_partition_worker, tasks))
+        
+        manifest = {
             'export_date': datetime.now().isoformat(),
-            'count': len(transactions),
-            'transactions': [t.to_dict() for t in transactions]
+            'format': export_format,
+            'partition_by': partition_by,
+            'compression': compress,
+            'total_rows': sum(rows for rows, _, _ in results),
+            'partitions': [
+                {'key': key, 'file': filename, 'rows': rows, 'bytes': size, 'sha256': checksum}
+                for (key, filename, _), (rows, checksum, size) in zip(jobs, results)
+            ]
         }
         
-        # Créer le dossier parent si nécessaire
-        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+        with open(output / 'manifest.json', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
         
-        # Écrire le JSON
-        with open(filepath, 'w', encoding='utf-8') as jsonfile:
-            if pretty:
-                json.dump(data, jsonfile, indent=2, ensure_ascii=False)
+        return manifest
+    
+    def _plan_partitions(
+        self,
+        partition_by: str,
+        category_id: Optional[int],
+        start_date: Optional[date],
+        end_date: Optional[date]
+    ) -> List[Tuple[str, Dict]]:
+        """Liste les partitions non vides (clé, filtres) depuis les agrégats"""
+        query = "SELECT DISTINCT {column} AS key FROM transaction_rollups WHERE level = ?"
+        params: list = []
+        
+        if category_id:
+            query += " AND category_id = ?"
+            params.append(category_id)
+        
+        if partition_by == 'month':
+            query = query.format(column='period')
+            params.insert(0, 'month')
+            if start_date:
+                query += " AND period >= ?"
+                params.append(start_date.isoformat()[:7])
+            if end_date:
+                query += " AND period <= ?"
+                params.append(end_date.isoformat()[:7])
+        else:
+            query = query.format(column='category_id')
+            params.insert(0, 'day')
+            if start_date:
+                query += " AND period >= ?"
+                params.append(start_date.isoformat())
+            if end_date:
+                query += " AND period <= ?"
+                params.append(end_date.isoformat())
+        
+        query += " ORDER BY key"
+        
+        partitions = []
+        for row in self.db.execute_query(query, tuple(params)):
+            if partition_by == 'month':
+                year, month = map(int, row['key'].split('-'))
+                month_start = date(year, month, 1)
+                month_end = date(year, month, calendar.monthrange(year, month)[1])
+                filters = {
+                    'category_id': category_id,
+                    'start_date': max(month_start, start_date) if start_date else month_start,
+                    'end_date': min(month_end, end_date) if end_date else month_end,
+                }
+                partitions.append((row['key'], filters))
             else:
-                json.dump(data, jsonfile, ensure_ascii=False)
+                filters = {
+                    'category_id': row['key'],
+                    'start_date': start_date,
+                    'end_date': end_date,
+                }
+                partitions.append((f"category_{row['key']}", filters))
         
-        return len(transactions)
+        return partitions
+    
+    def _export_partition_file(self, export_format: str, filepath: str, filters: Dict,
+                               options: Dict) -> Tuple[int, str, int]:
+        """Exporte une partition et retourne (lignes, sha256, taille en octets)"""
+        method = getattr(self, EXPORT_FORMATS[export_format][0])
+        rows = method(filepath, **filters, **options)
+        
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        
+        return rows, digest.hexdigest(), Path(filepath).stat().st_size
     
     def export_budget_summary_to_json(
         self,
@@ -172,3 +723,161 @@ class ExportService:
             json.dump(data, jsonfile, indent=2, ensure_ascii=False)
         
         return True
+    
+    def export_budget_summaries_to_json(
+        self,
+        filepath: str,
+        category_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        chunk_size: int = 5000,
+        progress: Optional[ExportProgress] = None,
+        compress: Optional[str] = None,
+        compress_level: Optional[int] = None,
+        statuses: Optional[List[Dict]] = None
+    ) -> int:
+        """
+        Exporte en un seul fichier le résumé de tous les budgets (ou d'une sélection)
+        
+        Chaque résumé a la forme de export_budget_summary_to_json. Les statuts
+        sont calculés en une requête groupée, les dépenses lues en une seule
+        requête triée par budget et écrites au fil de l'eau.
+        
+        Args:
+            filepath: Chemin du fichier JSON de sortie
+            category_id: Filtrer par catégorie (optionnel)
+            start_date: Budgets se terminant à partir de cette date (optionnel)
+            end_date: Budgets commençant au plus tard à cette date (optionnel)
+            chunk_size: Nombre de transactions lues par bloc
+            progress: Suivi de progression (en budgets) (optionnel)
+            compress: 'gzip', 'bz2' ou 'xz' ; déduit de l'extension si absent
+            compress_level: Niveau de compression (optionnel)
+            statuses: Statuts déjà calculés pour ces filtres (optionnel)
+            
+        Returns:
+            Nombre de budgets exportés
+        """
+        progress = progress or ExportProgress()
+        
+        # Créer le dossier parent si nécessaire
+        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+        
+        with open_text_output(filepath, compress, compress_level) as jsonfile:
+            for chunk in self.iter_budget_summaries_json(
+                category_id=category_id,
+                start_date=start_date,
+                end_date=end_date,
+                chunk_size=chunk_size,
+                progress=progress,
+                statuses=statuses
+            ):
+                jsonfile.write(chunk)
+        
+        return progress.rows
+    
+    def iter_budget_summaries_json(
+        self,
+        category_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        chunk_size: int = 5000,
+        progress: Optional[ExportProgress] = None,
+        statuses: Optional[List[Dict]] = None
+    ) -> Iterator[str]:
+        """
+        Génère par morceaux le document {'export_date', 'budgets', 'count'}
+        
+        Les statuts et les dépenses sont dans le même ordre de budgets : les
+        deux résultats sont parcourus ensemble, sans regrouper en mémoire.
+        Des statuts déjà calculés pour les mêmes filtres peuvent être fournis.
+        """
+        from src.services.budget_service import BudgetService
+        budget_service = BudgetService(self.db, self.transaction_service)
+        
+        if statuses is None:
+            statuses = budget_service.get_budget_statuses(category_id, start_date, end_date)
+        blocks = budget_service.iter_budget_transaction_rows(category_id, start_date, end_date,
+                                                             chunk_size)
+        export_date = json.dumps(datetime.now().isoformat())
+        
+        yield f'{{\n  "export_date": {export_date},\n  "budgets": ['
+        
+        pending: List[Tuple] = []
+        for index, status in enumerate(statuses):
+            status = dict(status)
+            category_name = status.pop('category')
+            period = {'start': status.pop('period_start'), 'end': status.pop('period_end')}
+            yield (
+                ('\n    {' if index == 0 else ',\n    {')
+                + f'\n      "category": {json.dumps(category_name, ensure_ascii=False)},'
+                + f'\n      "period": {json.dumps(period)},'
+                + f'\n      "budget": {json.dumps(status)},'
+                + '\n      "transactions": ['
+            )
+            
+            first = True
+            while True:
+                if not pending:
+                    pending = next(blocks, [])
+                    if not pending:
+                        break
+                # Lignes du budget courant en tête du bloc
+                end = 0
+                while end < len(pending) and pending[end][0] == status['budget_id']:
+                    end += 1
+                if end:
+                    items = ',\n        '.join(
+                        json.dumps(_row_to_dict(row[1:]), ensure_ascii=False)
+                        for row in pending[:end]
+                    )
+                    yield ('\n        ' if first else ',\n        ') + items
+                    first = False
+                if end < len(pending):
+                    pending = pending[end:]
+                    break
+                pending = []
+            
+            yield '\n      ]\n    }' if not first else ']\n    }'
+            if progress:
+                progress.advance(1)
+        
+        yield f'\n  ],\n  "count": {len(statuses)}\n}}\n'
+
+
+def _row_to_dict(row: tuple) -> dict:
+    """Ligne (id, date, amount, description, type, category_id) comme Transaction.to_dict()"""
+    return {
+        'id': row[0],
+        'amount': row[2],
+        'description': row[3],
+        'type': row[4],
+        'category_id': row[5],
+        'date': row[1]
+    }
+
+
+def _columnar_to_rows(group: Dict) -> Iterator[Tuple]:
+    """Groupe colonnaire en lignes (amount, description, type, category_id, date ISO)"""
+    to_iso = {}
+    for ordinal, amount, type_code, category_id, description in zip(
+        group['date'].tolist(),
+        group['amount'].tolist(),
+        group['type'].tolist(),
+        group['category_id'].tolist(),
+        group['description']
+    ):
+        if ordinal not in to_iso:
+            to_iso[ordinal] = date.fromordinal(ordinal).isoformat()
+        transaction_type = 'revenu' if type_code else 'dépense'
+        yield (amount, description, transaction_type, category_id, to_iso[ordinal])
+
+
+def _export_partition_worker(task: tuple) -> Tuple[int, str, int]:
+    """Exporte une partition dans un processus, avec sa propre connexion en lecture seule"""
+    db_path, export_format, filepath, filters, options = task
+    db = DatabaseManager(db_path, read_only=True)
+    try:
+        service = ExportService(db, TransactionService(db))
+        return service._export_partition_file(export_format, filepath, filters, options)
+    finally:
+        db.close()
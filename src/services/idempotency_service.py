@@ -0,0 +1,120 @@
+# src/services/idempotency_service.py
+
+import hashlib
+import json
+import time
+from typing import Any, Dict, Optional
+from src.database.db_manager import DatabaseManager
+
+# Durée de conservation d'une clé (secondes)
+IDEMPOTENCY_TTL = 24 * 3600
+
+# Intervalle minimal entre deux purges des clés expirées (secondes)
+EVICTION_INTERVAL = 3600
+
+# Longueur maximale d'une clé fournie par le client
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyService:
+    """
+    Clés d'idempotence des écritures web (en-tête Idempotency-Key)
+
+    La première requête réserve la clé par une insertion sur la clé
+    primaire, dans la même transaction SQL que l'écriture qui suit : la
+    clé et l'écriture sont validées ensemble. Le résultat (statut, en-têtes
+    utiles, messages) est ensuite enregistré ; une requête répétée avec la
+    même clé le reçoit sans rien écrire ; une écriture refusée ou en échec
+    libère la clé (release). La table ne garde que des
+    empreintes de 16 octets et les clés expirées sont purgées par lots.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, ttl: int = IDEMPOTENCY_TTL):
+        self.db = db_manager
+        self.ttl = ttl
+        self._next_eviction = 0.0
+
+    def reserve(self, scope: str, key: str, payload: Any) -> Optional[Dict]:
+        """
+        Réserve key pour scope (la route) avant l'écriture
+
+        Returns:
+            None si la clé est nouvelle (ou expirée) : exécuter l'écriture
+            puis appeler complete(), ou release() si elle échoue. Sinon la
+            réservation existante :
+            {'matches': même requête ?, 'status': None si en cours,
+            'response': résultat enregistré}
+
+        Raises:
+            ValueError: Clé vide ou trop longue
+        """
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise ValueError(f"Clé d'idempotence invalide (1 à {MAX_KEY_LENGTH} caractères)")
+        now = int(time.time())
+        self._evict_if_due(now)
+
+        digest = _digest(scope, key)
+        fingerprint = _digest(json.dumps(payload, sort_keys=True, default=str))
+        # Une clé expirée encore en table est reprise comme une clé nouvelle
+        cursor = self.db.connection.execute(
+            """
+            INSERT INTO idempotency_keys (key, fingerprint, created_at) VALUES (?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                fingerprint = excluded.fingerprint, created_at = excluded.created_at,
+                status = NULL, response = NULL
+            WHERE idempotency_keys.created_at <= ?
+            """,
+            (digest, fingerprint, now, now - self.ttl)
+        )
+        if cursor.rowcount:
+            return None
+
+        row = self.db.connection.execute(
+            "SELECT fingerprint, status, response FROM idempotency_keys WHERE key = ?", (digest,)
+        ).fetchone()
+        return {
+            'matches': row[0] == fingerprint,
+            'status': row[1],
+            'response': json.loads(row[2]) if row[2] else None,
+        }
+
+    def complete(self, scope: str, key: str, status: int, response: Dict) -> None:
+        """Enregistre le résultat de l'écriture (et valide la réservation)"""
+        self.db.connection.execute(
+            "UPDATE idempotency_keys SET status = ?, response = ? WHERE key = ?",
+            (status, json.dumps(response, ensure_ascii=False), _digest(scope, key))
+        )
+        self.db.connection.commit()
+
+    def release(self, scope: str, key: str) -> None:
+        """
+        Libère la clé d'une écriture refusée ou en échec
+
+        Seules les écritures réussies sont enregistrées : la même clé peut
+        resservir, pour la requête corrigée comme pour la même requête.
+        """
+        self.db.connection.rollback()
+        self.db.connection.execute(
+            "DELETE FROM idempotency_keys WHERE key = ?", (_digest(scope, key),)
+        )
+        self.db.connection.commit()
+
+    def evict_expired(self, now: Optional[int] = None) -> int:
+        """Supprime les clés expirées, retourne leur nombre"""
+        now = int(time.time()) if now is None else now
+        cursor = self.db.connection.execute(
+            "DELETE FROM idempotency_keys WHERE created_at <= ?", (now - self.ttl,)
+        )
+        self.db.connection.commit()
+        return cursor.rowcount
+
+    def _evict_if_due(self, now: int) -> None:
+        # Purge par lots, hors du chemin de chaque écriture (pas d'index sur created_at)
+        if now >= self._next_eviction:
+            self._next_eviction = now + EVICTION_INTERVAL
+            self.evict_expired(now)
+
+
+def _digest(*parts: str) -> bytes:
+    """Empreinte de 16 octets (clé primaire compacte)"""
+    return hashlib.sha256('\0'.join(parts).encode('utf-8')).digest()[:16]
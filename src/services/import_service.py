@@ -0,0 +1,337 @@
+# src/services/import_service.py
+
+import csv
+import json
+import time
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from src.database.db_manager import DatabaseManager
+from src.models.transaction import Transaction
+from src.services.transaction_service import TransactionService
+from src.utils.streams import COMPRESSIONS, open_text_input
+
+# Formats lisibles par ImportService (ceux produits par ExportService)
+IMPORT_FORMATS = ('csv', 'json', 'jsonl')
+
+# Nombre maximal d'erreurs détaillées conservées dans le résultat
+MAX_REPORTED_ERRORS = 100
+
+_READ_SIZE = 1 << 16
+
+
+class ImportService:
+    """
+    Importe en masse des transactions depuis les fichiers d'ExportService
+
+    Les fichiers sont lus en flux (CSV, JSON, JSON Lines, éventuellement
+    compressés), chaque enregistrement est validé par le modèle Transaction
+    puis inséré par blocs dans une seule transaction SQL. Les IDs d'origine
+    ne sont pas conservés.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, transaction_service: TransactionService):
+        self.db = db_manager
+        self.transaction_service = transaction_service
+        self._category_ids: Optional[set] = None
+        self._category_names: Optional[Dict[str, int]] = None
+
+    def import_file(
+        self,
+        filepath: str,
+        import_format: Optional[str] = None,
+        batch_size: int = 10000,
+        dry_run: bool = False,
+        strict: bool = False,
+        on_duplicate: str = 'skip'
+    ) -> Dict:
+        """
+        Importe un fichier de transactions
+
+        Args:
+            filepath: Fichier CSV, JSON ou JSONL (.gz, .bz2, .xz acceptés)
+            import_format: 'csv', 'json' ou 'jsonl' ; déduit de l'extension si None
+            batch_size: Nombre de lignes par insertion (executemany)
+            dry_run: Valider sans rien écrire en base
+            strict: Annuler tout l'import à la première ligne invalide
+            on_duplicate: Transactions déjà présentes : 'skip', 'merge' ou 'insert'
+
+        Returns:
+            Dictionnaire avec le nombre de lignes lues, importées, rejetées,
+            ignorées et fusionnées (doublons), les premières erreurs et le
+            débit (lignes/s)
+        """
+        import_format = import_format or detect_import_format(filepath)
+        if import_format not in IMPORT_FORMATS:
+            raise ValueError(f"Format d'import inconnu: {import_format}")
+
+        readers = {
+            'csv': iter_csv_records,
+            'json': iter_json_records,
+            'jsonl': iter_jsonl_records,
+        }
+        result = {
+            'format': import_format,
+            'dry_run': dry_run,
+            'read': 0,
+            'imported': 0,
+            'rejected': 0,
+            'skipped': 0,
+            'merged': 0,
+            'errors': [],
+        }
+        self._load_categories()
+
+        start = time.perf_counter()
+        rows = self._validate_records(readers[import_format](filepath), result, strict)
+        if dry_run:
+            result['imported'] = sum(1 for _ in rows)
+        else:
+            stats = self.transaction_service.add_transactions_bulk(
+                rows, batch_size=batch_size, on_duplicate=on_duplicate
+            )
+            result['imported'] = stats['inserted']
+            result['skipped'] = stats['skipped']
+            result['merged'] = stats['merged']
+        elapsed = time.perf_counter() - start
+
+        result['elapsed'] = elapsed
+        result['rows_per_second'] = result['read'] / elapsed if elapsed > 0 else 0.0
+        return result
+
+    def resolve_category(self, value) -> int:
+        """
+        Retourne l'ID d'une catégorie à partir de son ID ou de son nom
+
+        Les catégories sont chargées une seule fois par import.
+
+        Raises:
+            ValueError: Si la catégorie est inconnue
+        """
+        if self._category_ids is None:
+            self._load_categories()
+
+        if isinstance(value, int) or (isinstance(value, str) and value.strip().isdigit()):
+            category_id = int(value)
+            if category_id in self._category_ids:
+                return category_id
+        elif isinstance(value, str):
+            category_id = self._category_names.get(value.strip().lower())
+            if category_id is not None:
+                return category_id
+
+        raise ValueError(f"Catégorie inconnue: {value}")
+
+    def _load_categories(self) -> None:
+        rows = self.db.connection.execute("SELECT id, name FROM categories").fetchall()
+        self._category_ids = {row[0] for row in rows}
+        self._category_names = {row[1].lower(): row[0] for row in rows}
+
+    def import_records(
+        self,
+        records: Iterable[Dict],
+        on_duplicate: str = 'insert',
+        strict: bool = False,
+        dry_run: bool = False
+    ) -> Dict:
+        """
+        Importe des enregistrements déjà décodés (API web, synchronisation)
+        
+        Tous les enregistrements sont validés, puis les valides sont
+        insérés en une seule transaction SQL. Contrairement à un relevé
+        réimporté, deux envois successifs ne numérotent pas leurs
+        opérations ensemble : une seconde transaction identique envoyée
+        plus tard est légitime, elle est donc insérée par défaut.
+        
+        Args:
+            records: Dictionnaires au format des exports (category ou category_id)
+            on_duplicate: Transactions déjà présentes : 'insert' (par défaut),
+                          'skip' ou 'merge' sur demande explicite
+            strict: Ne rien écrire si un enregistrement est invalide
+            dry_run: Valider sans rien écrire en base
+            
+        Returns:
+            Dictionnaire avec les nombres importés, rejetés, ignorés et
+            fusionnés, et 'results' : pour chaque enregistrement, dans
+            l'ordre, {'status', 'id'} ou {'status': 'rejected', 'error'} ;
+            un enregistrement ignoré ('skipped') porte l'ID de la
+            transaction identique déjà enregistrée
+        """
+        self._load_categories()
+        dates: Dict[str, Tuple[date, str]] = {}
+        results: List[Dict] = []
+        rows: List[Tuple] = []
+        positions: List[int] = []
+        
+        for index, record in enumerate(records):
+            try:
+                rows.append(self._record_to_row(record, dates))
+                positions.append(index)
+                results.append({'status': 'valid'})
+            except ValueError as e:
+                results.append({'status': 'rejected', 'error': str(e)})
+        
+        rejected = len(results) - len(rows)
+        stats = {'inserted': 0, 'skipped': 0, 'merged': 0}
+        if rows and not dry_run and not (strict and rejected):
+            stats = self.transaction_service.add_transactions_bulk(
+                rows, on_duplicate=on_duplicate, with_results=True
+            )
+            for index, outcome in zip(positions, stats['results']):
+                results[index] = outcome
+        
+        return {
+            'dry_run': dry_run,
+            'imported': stats['inserted'],
+            'rejected': rejected,
+            'skipped': stats['skipped'],
+            'merged': stats['merged'],
+            'results': results,
+        }
+    
+    def _validate_records(self, records: Iterator[Dict], result: Dict,
+                          strict: bool) -> Iterator[Tuple]:
+        """Valide les enregistrements et produit les lignes à insérer"""
+        # Date brute -> (date, date ISO normalisée), les dates se répètent beaucoup
+        dates: Dict[str, Tuple[date, str]] = {}
+        
+        for number, record in enumerate(records, start=1):
+            result['read'] += 1
+            try:
+                row = self._record_to_row(record, dates)
+            except ValueError as e:
+                if strict:
+                    raise ValueError(f"Enregistrement {number}: {e}") from e
+                result['rejected'] += 1
+                if len(result['errors']) < MAX_REPORTED_ERRORS:
+                    result['errors'].append({'record': number, 'error': str(e)})
+                continue
+            
+            yield row
+    
+    def _record_to_row(self, record: Dict, dates: Dict[str, Tuple[date, str]]) -> Tuple:
+        """
+        Valide un enregistrement par le modèle Transaction
+        
+        Returns:
+            Ligne (amount, description, type, category_id, date ISO)
+            
+        Raises:
+            ValueError: Enregistrement invalide (champ manquant, catégorie inconnue...)
+        """
+        try:
+            raw_date = record.get('date')
+            if raw_date not in dates:
+                parsed = date.fromisoformat(raw_date)
+                dates[raw_date] = (parsed, parsed.isoformat())
+            transaction_date, date_iso = dates[raw_date]
+            category = record.get('category_id')
+            if category in (None, ''):
+                category = record.get('category')
+            
+            transaction = Transaction(
+                amount=float(record['amount']),
+                description=record.get('description') or '',
+                type=record.get('type'),
+                category_id=self.resolve_category(category),
+                date=transaction_date
+            )
+        except KeyError as e:
+            raise ValueError(f"Champ manquant: {e.args[0]}") from e
+        except (AttributeError, TypeError) as e:
+            raise ValueError(str(e)) from e
+        
+        return (
+            transaction.amount,
+            transaction.description,
+            transaction.type,
+            transaction.category_id,
+            date_iso
+        )
+
+
+def detect_import_format(filepath: str) -> Optional[str]:
+    """Déduit le format de l'extension ('export.jsonl.gz' -> 'jsonl')"""
+    path = Path(filepath)
+    if path.suffix.lower() in COMPRESSIONS.values():
+        path = path.with_suffix('')
+    suffix = path.suffix.lower().lstrip('.')
+    return suffix if suffix in IMPORT_FORMATS else None
+
+
+def iter_csv_records(filepath: str) -> Iterator[Dict]:
+    """Lit un CSV ligne à ligne (en-têtes comme ExportService)"""
+    with open_text_input(filepath, newline='') as f:
+        yield from csv.DictReader(f)
+
+
+def iter_jsonl_records(filepath: str) -> Iterator[Dict]:
+    """Lit un fichier JSON Lines, un objet par ligne"""
+    with open_text_input(filepath) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_json_records(filepath: str) -> Iterator[Dict]:
+    """
+    Lit en flux les transactions d'un document JSON
+
+    Accepte l'export d'ExportService ({"transactions": [...]}) ou une liste
+    au premier niveau. Les objets sont décodés un par un : le document
+    n'est jamais chargé entièrement en mémoire.
+    """
+    decoder = json.JSONDecoder()
+
+    with open_text_input(filepath) as f:
+        buffer = ''
+        position = 0
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buffer, position, eof
+            # Libérer la partie déjà décodée avant d'ajouter la suite
+            buffer = buffer[position:]
+            position = 0
+            chunk = f.read(_READ_SIZE)
+            if not chunk:
+                eof = True
+            buffer += chunk
+            return bool(chunk)
+
+        # Se placer juste après le '[' du tableau des transactions
+        while True:
+            stripped = buffer.lstrip()
+            if stripped.startswith('['):
+                position = len(buffer) - len(stripped) + 1
+                break
+            key = buffer.find('"transactions"')
+            bracket = buffer.find('[', key) if key >= 0 else -1
+            if bracket >= 0:
+                position = bracket + 1
+                break
+            if not fill():
+                raise ValueError("Document JSON sans tableau de transactions")
+
+        while True:
+            # Ignorer les blancs et les virgules entre deux objets
+            while True:
+                while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                    position += 1
+                if position < len(buffer) or not fill():
+                    break
+
+            if position >= len(buffer):
+                raise ValueError("Document JSON tronqué")
+            if buffer[position] == ']':
+                return
+
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof or not fill():
+                    raise
+                continue
+
+            yield record
+            position = end
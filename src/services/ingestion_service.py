@@ -0,0 +1,163 @@
+# src/services/ingestion_service.py
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from src.database.db_manager import DatabaseManager
+from src.models.transaction import Transaction
+from src.services.transaction_service import TransactionService
+from src.utils.content_hash import ContentHasher
+from src.utils.statements import CSV_PROFILES, CsvProfile, StatementEntry, parse_statement
+
+# Une tâche de lecture : (fichier, format, profil CSV, format de date QIF)
+ParseTask = Tuple[str, Optional[str], Optional[CsvProfile], str]
+
+
+def _parse_statement_worker(task: ParseTask) -> Tuple[List[StatementEntry], Optional[str]]:
+    """Lit un relevé dans un processus du pool ; l'erreur est retournée, pas levée"""
+    filepath, statement_format, profile, qif_date_format = task
+    try:
+        return parse_statement(filepath, statement_format, profile, qif_date_format), None
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        return [], str(e)
+
+
+class IngestionService:
+    """
+    Intègre des relevés bancaires (OFX/QFX, QIF, CSV) dans MyBudget
+
+    Les fichiers sont lus en parallèle dans un pool de processus ; les
+    opérations sont ensuite normalisées en Transaction et écrites par un
+    seul écrivain (TransactionService.add_transactions_bulk), en une
+    transaction SQL. Un débit devient une dépense, un crédit un revenu.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, transaction_service: TransactionService,
+                 profiles: Optional[Dict[str, CsvProfile]] = None):
+        self.db = db_manager
+        self.transaction_service = transaction_service
+        self.profiles = profiles or dict(CSV_PROFILES)
+
+    def ingest_files(
+        self,
+        filepaths: Sequence[str],
+        statement_format: Optional[str] = None,
+        profile: str = 'default',
+        category: str = 'autres',
+        qif_date_format: str = '%d/%m/%Y',
+        workers: int = 4,
+        dry_run: bool = False,
+        on_duplicate: str = 'skip'
+    ) -> Dict:
+        """
+        Intègre un ensemble de relevés
+
+        Args:
+            filepaths: Fichiers de relevés
+            statement_format: 'ofx', 'qif' ou 'csv' ; déduit de l'extension si None
+            profile: Nom du profil de colonnes pour les fichiers CSV
+            category: Catégorie attribuée aux opérations (nom ou ID)
+            qif_date_format: Format des dates QIF
+            workers: Nombre de processus de lecture
+            dry_run: Lire et valider sans rien écrire en base
+            on_duplicate: Opérations déjà présentes : 'skip', 'merge' ou 'insert'
+
+        Returns:
+            Dictionnaire avec le détail par fichier, le nombre d'opérations
+            lues, importées, rejetées, ignorées et fusionnées (doublons) et
+            le débit (opérations/s)
+        """
+        if workers < 1:
+            raise ValueError("Le nombre de workers doit être au moins 1")
+        if profile not in self.profiles:
+            raise ValueError(f"Profil CSV inconnu: {profile}")
+        category_id = self._resolve_category(category)
+
+        tasks: List[ParseTask] = [
+            (filepath, statement_format, self.profiles[profile], qif_date_format)
+            for filepath in filepaths
+        ]
+
+        start = time.perf_counter()
+        parsed = self._parse_all(tasks, workers)
+
+        result = {
+            'dry_run': dry_run,
+            'files': [],
+            'parsed': 0,
+            'imported': 0,
+            'rejected': 0,
+            'skipped': 0,
+            'merged': 0,
+        }
+        for (filepath, *_), (entries, error) in zip(tasks, parsed):
+            result['files'].append({'file': filepath, 'entries': len(entries), 'error': error})
+            result['parsed'] += len(entries)
+
+        rows = self._normalize([entries for entries, _ in parsed], category_id, result)
+        if dry_run:
+            result['imported'] = sum(1 for _ in rows)
+        else:
+            stats = self.transaction_service.add_transactions_bulk(rows, on_duplicate=on_duplicate)
+            result['imported'] = stats['inserted']
+            result['skipped'] = stats['skipped']
+            result['merged'] = stats['merged']
+
+        elapsed = time.perf_counter() - start
+        result['elapsed'] = elapsed
+        result['rows_per_second'] = result['parsed'] / elapsed if elapsed > 0 else 0.0
+        return result
+
+    def _parse_all(self, tasks: List[ParseTask],
+                   workers: int) -> List[Tuple[List[StatementEntry], Optional[str]]]:
+        """Lit les relevés, en parallèle si plusieurs fichiers et plusieurs workers"""
+        if workers == 1 or len(tasks) < 2:
+            return [_parse_statement_worker(task) for task in tasks]
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            return list(pool.map(_parse_statement_worker, tasks))
+
+    def _resolve_category(self, category) -> int:
+        rows = self.db.execute_query(
+            "SELECT id FROM categories WHERE name = ? OR CAST(id AS TEXT) = ?",
+            (str(category).lower(), str(category))
+        )
+        if not rows:
+            raise ValueError(f"Catégorie inconnue: {category}")
+        return rows[0]['id']
+
+    def _normalize(self, files: List[List[StatementEntry]], category_id: int,
+                   result: Dict) -> Iterator[Tuple]:
+        """
+        Convertit les opérations en lignes validées par le modèle Transaction
+
+        Les empreintes sont calculées fichier par fichier : deux relevés qui
+        se chevauchent produisent les mêmes empreintes pour les mêmes
+        opérations, qui ne sont donc importées qu'une fois.
+        """
+        for entries in files:
+            hasher = ContentHasher()
+            for entry in entries:
+                try:
+                    transaction = Transaction(
+                        amount=round(abs(entry.amount), 2),
+                        description=entry.description,
+                        type='dépense' if entry.amount < 0 else 'revenu',
+                        category_id=category_id,
+                        date=entry.date
+                    )
+                except ValueError:
+                    # Montant nul ou libellé vide
+                    result['rejected'] += 1
+                    continue
+
+                date_iso = transaction.date.isoformat()
+                yield (
+                    transaction.amount,
+                    transaction.description,
+                    transaction.type,
+                    transaction.category_id,
+                    date_iso,
+                    entry.account,
+                    hasher(date_iso, entry.amount, transaction.description, entry.account)
+                )
@@ -0,0 +1,420 @@
+# src/services/job_service.py
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from src.database.db_manager import DatabaseManager
+from src.services.budget_service import BudgetService
+from src.services.export_service import EXPORT_FORMATS, ExportProgress, ExportService
+from src.services.report_builder import ReportBuilder
+from src.services.transaction_service import TransactionService
+from src.utils.streams import COMPRESSIONS
+
+# Types de tâches -> paramètres acceptés
+JOB_KINDS = {
+    'export_transactions': ('format', 'category_id', 'start_date', 'end_date', 'compress'),
+    'export_budgets': ('category_id', 'start_date', 'end_date', 'compress'),
+    'year_report': ('year',),
+}
+
+JOB_STATUSES = ('queued', 'running', 'done', 'failed')
+
+# Intervalle de notification de progression (lignes)
+PROGRESS_EVERY = 1000
+
+# Attente maximale d'un worker inactif avant de relire la file (secondes) :
+# rattrape les tâches soumises par un autre processus
+POLL_INTERVAL = 1.0
+
+# Intervalle des signes de vie des tâches en cours (secondes) ; une tâche
+# sans signe de vie depuis STALE_AFTER a perdu son processus : remise en file
+HEARTBEAT_INTERVAL = 10.0
+STALE_AFTER = 3 * HEARTBEAT_INTERVAL
+
+# UPDATE ... RETURNING n'existe qu'à partir de SQLite 3.35
+HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+class JobService:
+    """
+    File de tâches de fond (exports, rapports) persistée en SQLite
+
+    submit() enregistre la tâche et rend la main aussitôt. Des threads
+    workers, chacun avec sa propre connexion, exécutent les tâches dans
+    l'ordre de soumission ; le résultat est écrit dans un fichier de
+    results_dir. Statut et dates sont en base ; la progression d'une tâche
+    en cours est tenue en mémoire pour ne pas écrire en base à chaque bloc,
+    et recopiée en base à chaque signe de vie (visible des autres processus).
+
+    Une tâche réservée porte l'identifiant de son processus (owner) ; un
+    thread met à jour heartbeat_at de ses tâches en cours et remet en file
+    celles dont le processus a disparu (plus de signe de vie), jamais celles
+    qu'un autre processus exécute encore.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, results_dir: Optional[str] = None,
+                 workers: int = 1):
+        """
+        Args:
+            db_manager: Base de données (fichier : les workers ouvrent leur connexion)
+            results_dir: Dossier des résultats ; 'jobs' à côté de la base par défaut
+            workers: Nombre de threads workers
+        """
+        if workers < 1:
+            raise ValueError("Le nombre de workers doit être au moins 1")
+        self.db = db_manager
+        self.results_dir = (Path(results_dir) if results_dir
+                            else Path(db_manager.db_path).parent / 'jobs')
+        self.workers = workers
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._threads: List[threading.Thread] = []
+        self._heartbeat: Optional[threading.Thread] = None
+        self._wakeup = threading.Condition()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        # Progression des tâches en cours : id -> lignes traitées
+        self._progress: Dict[int, int] = {}
+
+    def submit(self, kind: str, params: Optional[Dict] = None) -> Dict:
+        """
+        Enregistre une tâche et démarre les workers si besoin
+
+        Raises:
+            ValueError: Type de tâche ou paramètres invalides
+        """
+        params = self._validate(kind, params or {})
+        job_id = self.db.execute_update(
+            "INSERT INTO jobs (kind, params, status, created_at) VALUES (?, ?, 'queued', ?)",
+            (kind, json.dumps(params), _now())
+        )
+        # Relue avant de réveiller les workers : la tâche retournée est en attente
+        job = self.get_job(job_id)
+        self.start()
+        with self._wakeup:
+            self._wakeup.notify()
+        return job
+
+    def get_job(self, job_id: int) -> Optional[Dict]:
+        """Statut et progression d'une tâche, None si elle n'existe pas"""
+        rows = self.db.execute_query("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return self._to_dict(rows[0]) if rows else None
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """Dernières tâches, des plus récentes aux plus anciennes"""
+        if status is not None and status not in JOB_STATUSES:
+            raise ValueError(f"Statut inconnu: {status}")
+        query = "SELECT * FROM jobs"
+        params: tuple = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        query += " ORDER BY id DESC LIMIT ?"
+        return [self._to_dict(row) for row in self.db.execute_query(query, params + (limit,))]
+
+    def delete_job(self, job_id: int) -> bool:
+        """
+        Supprime une tâche terminée et son fichier de résultat
+
+        Raises:
+            ValueError: Tâche en attente ou en cours
+        """
+        job = self.get_job(job_id)
+        if job is None:
+            return False
+        if job['status'] in ('queued', 'running'):
+            raise ValueError(f"Tâche {job_id} non terminée")
+        if job['result_path']:
+            Path(job['result_path']).unlink(missing_ok=True)
+        self.db.execute_update("DELETE FROM jobs WHERE id = ?", (job_id,))
+        return True
+
+    def count_by_status(self) -> Dict[str, int]:
+        """Nombre de tâches par statut (tous les statuts, même à zéro)"""
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        rows = self.db.execute_query("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status")
+        for row in rows:
+            counts[row['status']] = row['count']
+        return counts
+
+    @property
+    def worker_count(self) -> int:
+        return len(self._threads)
+
+    def start(self) -> None:
+        """Démarre les workers (une seule fois) et remet en file les tâches interrompues"""
+        with self._lock:
+            if self._threads:
+                return
+            if self.db.db_path == ":memory:":
+                raise ValueError("Les tâches de fond nécessitent une base fichier")
+            self.requeue_abandoned(self.db)
+            self._stopping.clear()
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'mybudget-job-{index}',
+                                          daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            self._heartbeat = threading.Thread(target=self._beat, name='mybudget-job-heartbeat',
+                                               daemon=True)
+            self._heartbeat.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Arrête les workers après leur tâche en cours"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+            if self._heartbeat is not None:
+                threads.append(self._heartbeat)
+                self._heartbeat = None
+        self._stopping.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in threads:
+            thread.join(timeout)
+
+    @staticmethod
+    def requeue_abandoned(db: DatabaseManager, now: Optional[float] = None) -> int:
+        """
+        Remet en file les tâches en cours dont le processus a disparu
+
+        Returns:
+            Nombre de tâches remises en file
+        """
+        now = time.time() if now is None else now
+        # Sans signe de vie : tâche réservée avant l'enregistrement du processus
+        cursor = db.connection.execute(
+            """
+            UPDATE jobs SET status = 'queued', started_at = NULL, owner = NULL, heartbeat_at = NULL
+            WHERE status = 'running' AND (heartbeat_at IS NULL OR heartbeat_at < ?)
+            """,
+            (now - STALE_AFTER,)
+        )
+        db.connection.commit()
+        return cursor.rowcount
+
+    def wait(self, job_id: int, timeout: float = 30.0) -> Dict:
+        """Attend la fin d'une tâche (tests, CLI)"""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get_job(job_id)
+            if job is None or job['status'] in ('done', 'failed') or time.monotonic() >= deadline:
+                return job
+            time.sleep(0.05)
+
+    def _beat(self) -> None:
+        """Signes de vie des tâches de ce processus, reprise de celles des processus disparus"""
+        db = DatabaseManager(self.db.db_path)
+        try:
+            while not self._stopping.wait(HEARTBEAT_INTERVAL):
+                self._record_heartbeat(db)
+                if self.requeue_abandoned(db):
+                    with self._wakeup:
+                        self._wakeup.notify_all()
+        finally:
+            db.close()
+
+    def _record_heartbeat(self, db: DatabaseManager) -> None:
+        """Signe de vie et progression des tâches en cours de ce processus"""
+        now = time.time()
+        db.connection.execute(
+            "UPDATE jobs SET heartbeat_at = ? WHERE status = 'running' AND owner = ?",
+            (now, self.owner)
+        )
+        db.connection.executemany(
+            "UPDATE jobs SET progress = ? WHERE id = ? AND status = 'running' AND owner = ?",
+            [(rows, job_id, self.owner) for job_id, rows in list(self._progress.items())]
+        )
+        db.connection.commit()
+
+    def _work(self) -> None:
+        """Boucle d'un worker : réserve la plus ancienne tâche en attente et l'exécute"""
+        db = DatabaseManager(self.db.db_path)
+        try:
+            while not self._stopping.is_set():
+                job = self._claim(db, self.owner)
+                if job is None:
+                    with self._wakeup:
+                        self._wakeup.wait(POLL_INTERVAL)
+                    continue
+                self._run(db, job)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _claim(db: DatabaseManager, owner: str) -> Optional[Dict]:
+        # Réservation atomique : un seul worker (ou processus) obtient la tâche
+        if HAS_RETURNING:
+            row = db.connection.execute(
+                """
+                UPDATE jobs SET status = 'running', started_at = ?, owner = ?, heartbeat_at = ?
+                WHERE id = (SELECT id FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1)
+                AND status = 'queued'
+                RETURNING id, kind, params
+                """,
+                (_now(), owner, time.time())
+            ).fetchone()
+        else:
+            # Lecture puis réservation sous le verrou d'écriture
+            db.connection.execute("BEGIN IMMEDIATE")
+            row = db.connection.execute(
+                "SELECT id, kind, params FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                db.connection.execute(
+                    """
+                    UPDATE jobs SET status = 'running', started_at = ?, owner = ?, heartbeat_at = ?
+                    WHERE id = ?
+                    """,
+                    (_now(), owner, time.time(), row[0])
+                )
+        db.connection.commit()
+        return {'id': row[0], 'kind': row[1], 'params': json.loads(row[2])} if row else None
+
+    def _run(self, db: DatabaseManager, job: Dict) -> None:
+        job_id = job['id']
+        self._progress[job_id] = 0
+
+        def report(rows: int) -> None:
+            self._progress[job_id] = rows
+
+        try:
+            handler = getattr(self, f"_run_{job['kind']}")
+            path, total = handler(db, job_id, job['params'], report)
+            db.execute_update(
+                """
+                UPDATE jobs SET status = 'done', result_path = ?, total = ?, progress = ?,
+                    finished_at = ?
+                WHERE id = ?
+                """,
+                (str(path), total, total, _now(), job_id)
+            )
+        except Exception as e:
+            db.connection.rollback()
+            db.execute_update(
+                """
+                UPDATE jobs SET status = 'failed', error = ?, progress = ?, finished_at = ?
+                WHERE id = ?
+                """,
+                (str(e), self._progress.get(job_id, 0), _now(), job_id)
+            )
+        finally:
+            self._progress.pop(job_id, None)
+
+    @staticmethod
+    def _set_total(db: DatabaseManager, job_id: int, total: int) -> None:
+        """Enregistre le volume attendu, une fois au démarrage de la tâche"""
+        db.execute_update("UPDATE jobs SET total = ? WHERE id = ?", (total, job_id))
+
+    def _result_path(self, job_id: int, extension: str, compress: Optional[str]) -> Path:
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        return self.results_dir / f"job-{job_id}{extension}{COMPRESSIONS.get(compress, '')}"
+
+    def _run_export_transactions(self, db: DatabaseManager, job_id: int, params: Dict,
+                                 report: Callable[[int], None]):
+        transaction_service = TransactionService(db)
+        export_service = ExportService(db, transaction_service)
+        method, extension = EXPORT_FORMATS[params.get('format', 'csv')]
+        filters = _date_filters(params)
+        path = self._result_path(job_id, extension, params.get('compress'))
+        self._set_total(db, job_id, transaction_service.count_transactions(**filters))
+
+        rows = getattr(export_service, method)(
+            str(path),
+            progress=ExportProgress(lambda progress: report(progress.rows), every=PROGRESS_EVERY),
+            compress=params.get('compress'),
+            **filters
+        )
+        return path, rows
+
+    def _run_export_budgets(self, db: DatabaseManager, job_id: int, params: Dict,
+                            report: Callable[[int], None]):
+        transaction_service = TransactionService(db)
+        export_service = ExportService(db, transaction_service)
+        path = self._result_path(job_id, '.json', params.get('compress'))
+        budget_service = BudgetService(db, transaction_service)
+        filters = _date_filters(params)
+        statuses = budget_service.get_budget_statuses(**filters)
+        self._set_total(db, job_id, len(statuses))
+
+        # Statuts calculés une fois : le total et l'export en partagent le résultat
+        budgets = export_service.export_budget_summaries_to_json(
+            str(path),
+            progress=ExportProgress(lambda progress: report(progress.rows), every=1),
+            compress=params.get('compress'),
+            statuses=statuses,
+            **filters
+        )
+        return path, budgets
+
+    def _run_year_report(self, db: DatabaseManager, job_id: int, params: Dict,
+                         report: Callable[[int], None]):
+        self._set_total(db, job_id, 1)
+        report_data = ReportBuilder(db).build_year_report(params['year'])
+        path = self._result_path(job_id, '.json', None)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report_data, f, ensure_ascii=False, indent=2)
+        return path, 1
+
+    def _to_dict(self, row: Dict) -> Dict:
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        if job['status'] == 'running':
+            job['progress'] = self._progress.get(job['id'], job['progress'])
+        total = job['total']
+        job['percentage'] = round(job['progress'] / total * 100, 1) if total else (
+            100.0 if job['status'] == 'done' else None
+        )
+        return job
+
+    @staticmethod
+    def _validate(kind: str, params: Dict) -> Dict:
+        """Vérifie et normalise les paramètres (dates ISO, entiers) avant l'enregistrement"""
+        # Valeurs venues d'un corps JSON : listes ou objets refusés comme les valeurs inconnues
+        if not isinstance(kind, str) or kind not in JOB_KINDS:
+            raise ValueError(f"Type de tâche inconnu: {kind}")
+        unknown = set(params) - set(JOB_KINDS[kind])
+        if unknown:
+            raise ValueError(f"Paramètres inconnus: {', '.join(sorted(unknown))}")
+
+        normalized: Dict[str, Any] = {}
+        for name, value in params.items():
+            if value is None:
+                continue
+            if name == 'format' and (not isinstance(value, str) or value not in EXPORT_FORMATS):
+                raise ValueError(f"Format d'export inconnu: {value}")
+            if name == 'compress' and (not isinstance(value, str) or value not in COMPRESSIONS):
+                raise ValueError(f"Compression inconnue: {value}")
+            if name in ('start_date', 'end_date'):
+                value = date.fromisoformat(str(value)).isoformat()
+            if name in ('category_id', 'year'):
+                if not isinstance(value, (int, str)) or isinstance(value, bool):
+                    raise ValueError(f"Entier attendu pour {name}: {value}")
+                value = int(value)
+            normalized[name] = value
+
+        if kind == 'year_report' and 'year' not in normalized:
+            raise ValueError("Paramètre manquant: year")
+        return normalized
+
+
+def _date_filters(params: Dict) -> Dict:
+    """Filtres des exports (catégorie, dates) à partir des paramètres enregistrés"""
+    return {
+        'category_id': params.get('category_id'),
+        'start_date': _parse_date(params.get('start_date')),
+        'end_date': _parse_date(params.get('end_date')),
+    }
+
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    return date.fromisoformat(value) if value else None
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec='seconds')
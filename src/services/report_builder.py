@@ -0,0 +1,158 @@
+# src/services/report_builder.py
+
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+from src.database.db_manager import DatabaseManager
+from src.services.budget_service import BudgetService
+from src.services.statistics_service import StatisticsService
+from src.services.transaction_service import TransactionService
+
+# Une tâche : (section, clé, service, méthode, arguments)
+ReportTask = Tuple[str, Any, str, str, tuple]
+
+_worker_state = threading.local()
+
+
+def _init_worker(db_path: str, opened: Optional[List[DatabaseManager]] = None) -> None:
+    """Ouvre la connexion en lecture seule propre à chaque worker"""
+    db = DatabaseManager(db_path, read_only=True)
+    if opened is not None:
+        # Pool de threads : connexion fermée à l'arrêt du pool
+        opened.append(db)
+    transaction_service = TransactionService(db)
+    _worker_state.services = {
+        'statistics': StatisticsService(db, transaction_service),
+        'budget': BudgetService(db, transaction_service),
+    }
+
+
+def _run_task(task: ReportTask) -> Any:
+    """Exécute une tâche de rapport dans un worker"""
+    _, _, service, method, args = task
+    return getattr(_worker_state.services[service], method)(*args)
+
+
+class ReportBuilder:
+    """
+    Génère le rapport annuel (résumés mensuels, tendances, budgets) en parallèle
+
+    Le travail est découpé en tâches indépendantes exécutées sur un pool
+    de threads ou de processus ; chaque worker ouvre sa propre connexion
+    SQLite en lecture seule. Les résultats sont fusionnés dans l'ordre du
+    plan, le rapport est donc identique quel que soit le nombre de workers.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, workers: int = 4, executor: str = 'thread'):
+        if workers < 1:
+            raise ValueError("Le nombre de workers doit être au moins 1")
+        if executor not in ('thread', 'process'):
+            raise ValueError("L'exécuteur doit être 'thread' ou 'process'")
+        self.db = db_manager
+        self.workers = workers
+        self.executor = executor
+
+    def plan_year_report(self, year: int) -> List[ReportTask]:
+        """Découpe le rapport annuel en tâches indépendantes"""
+        tasks: List[ReportTask] = []
+
+        for month in range(1, 13):
+            tasks.append((
+                'monthly_summaries', month, 'statistics', 'get_monthly_summary', (year, month)
+            ))
+
+        categories = self.db.execute_query("SELECT id FROM categories ORDER BY id")
+        for row in categories:
+            tasks.append((
+                'category_trends', row['id'], 'statistics', 'get_category_trend',
+                (row['id'], 12, date(year, 12, 31))
+            ))
+
+        budgets = self.db.execute_query(
+            """
+            SELECT id, category_id, period_start, period_end FROM budgets
+            WHERE period_start <= ? AND period_end >= ?
+            ORDER BY id
+            """,
+            (date(year, 12, 31).isoformat(), date(year, 1, 1).isoformat())
+        )
+        for row in budgets:
+            tasks.append((
+                'budgets', row['id'], 'budget', 'get_budget_status',
+                (
+                    row['category_id'],
+                    date.fromisoformat(row['period_start']),
+                    date.fromisoformat(row['period_end'])
+                )
+            ))
+
+        return tasks
+
+    def build_year_report(self, year: int) -> Dict:
+        """
+        Construit le rapport annuel complet
+
+        Returns:
+            Dictionnaire avec les résumés mensuels, les tendances par catégorie
+            et le statut de chaque budget actif pendant l'année
+        """
+        tasks = self.plan_year_report(year)
+        results = self._run(tasks)
+
+        names = {
+            row['id']: row['name']
+            for row in self.db.execute_query("SELECT id, name FROM categories")
+        }
+        report: Dict[str, Any] = {
+            'year': year,
+            'monthly_summaries': [],
+            'category_trends': [],
+            'budgets': []
+        }
+
+        for (section, key, _, _, _), result in zip(tasks, results):
+            if section == 'category_trends':
+                result = {'category_id': key, 'name': names.get(key), 'trend': result}
+            elif section == 'budgets' and result is None:
+                continue
+            report[section].append(result)
+
+        return report
+
+    def _run(self, tasks: List[ReportTask]) -> List[Any]:
+        """Exécute les tâches et retourne les résultats dans l'ordre du plan"""
+        if self.workers == 1 or self.db.db_path == ":memory:":
+            # Base en mémoire : non partageable entre connexions
+            transaction_service = TransactionService(self.db)
+            services = {
+                'statistics': StatisticsService(self.db, transaction_service),
+                'budget': BudgetService(self.db, transaction_service),
+            }
+            return [
+                getattr(services[service], method)(*args)
+                for _, _, service, method, args in tasks
+            ]
+
+        opened: List[DatabaseManager] = []
+        try:
+            with self._create_executor(opened) as pool:
+                return list(pool.map(_run_task, tasks))
+        finally:
+            # Pool arrêté : plus aucun thread n'utilise ces connexions. Celles
+            # d'un pool de processus sont fermées avec leur processus.
+            for db in opened:
+                db.close()
+
+    def _create_executor(self, opened: List[DatabaseManager]) -> Executor:
+        if self.executor == 'thread':
+            return ThreadPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.db.db_path, opened)
+            )
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.db.db_path,)
+        )
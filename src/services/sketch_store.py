@@ -0,0 +1,154 @@
+# src/services/sketch_store.py
+
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple
+from src.database.db_manager import DatabaseManager
+from src.utils.tdigest import TDigest
+
+SketchKey = Tuple[int, str, str]  # (category_id, type, 'YYYY-MM')
+
+
+class SketchStore:
+    """
+    Stockage des sketches de quantiles par catégorie, type et mois
+
+    Une écriture unitaire (ajout, modification, suppression) marque
+    seulement son mois à recalculer (table quantile_sketch_dirty) : le
+    sketch est reconstruit depuis les transactions à sa prochaine lecture,
+    une fois quel que soit le nombre d'écritures. Les insertions en masse
+    fusionnent leurs sketches construits en mémoire. Les écritures ne sont
+    pas validées ici : l'appelant fait le commit (sauf refresh()).
+    """
+
+    COMPRESSION = 100
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db = db_manager
+
+    @staticmethod
+    def month_key(value) -> str:
+        """Retourne la clé de mois 'YYYY-MM' d'une date ou d'une chaîne ISO"""
+        if isinstance(value, date):
+            return f"{value.year:04d}-{value.month:02d}"
+        return str(value)[:7]
+
+    def mark_dirty(self, keys: Iterable[SketchKey]) -> None:
+        """Marque des mois à reconstruire à la prochaine lecture (sans lire de sketch)"""
+        self.db.connection.executemany(
+            """
+            INSERT OR IGNORE INTO quantile_sketch_dirty (category_id, type, month)
+            VALUES (?, ?, ?)
+            """,
+            set(keys)
+        )
+
+    def refresh(self) -> None:
+        """
+        Reconstruit les sketches des mois marqués, puis valide
+
+        Une connexion en lecture seule lit les sketches tels qu'à leur
+        dernière reconstruction.
+        """
+        connection = self.db.connection
+        if self.db.read_only:
+            return
+        if connection.execute("SELECT 1 FROM quantile_sketch_dirty LIMIT 1").fetchone() is None:
+            return
+        # Verrou d'écriture : un mois marqué pendant la reconstruction n'est pas perdu
+        started = not connection.in_transaction
+        if started:
+            connection.execute("BEGIN IMMEDIATE")
+        keys = connection.execute(
+            "SELECT category_id, type, month FROM quantile_sketch_dirty"
+        ).fetchall()
+        self.rebuild(tuple(key) for key in keys)
+        connection.execute("DELETE FROM quantile_sketch_dirty")
+        if started:
+            connection.commit()
+
+    def add_digests(self, digests: Dict[SketchKey, TDigest]) -> None:
+        """Fusionne des sketches construits en mémoire (insertions en masse)"""
+        for key, digest in digests.items():
+            stored = self._load(key)
+            self._save(key, stored.merge(digest) if stored else digest)
+
+    def new_digest(self) -> TDigest:
+        """Crée un sketch vide avec la compression du stockage"""
+        return TDigest(self.COMPRESSION)
+
+    def rebuild(self, keys: Iterable[SketchKey]) -> None:
+        """Reconstruit les sketches des clés données depuis les transactions"""
+        for category_id, transaction_type, month in set(keys):
+            cursor = self.db.connection.execute(
+                """
+                SELECT amount FROM transactions
+                WHERE category_id = ? AND type = ? AND substr(date, 1, 7) = ?
+                """,
+                (category_id, transaction_type, month)
+            )
+            digest = TDigest(self.COMPRESSION)
+            digest.update(row[0] for row in cursor)
+            key = (category_id, transaction_type, month)
+            if digest.count:
+                self._save(key, digest)
+            else:
+                self.db.connection.execute(
+                    """
+                    DELETE FROM quantile_sketches WHERE category_id = ? AND type = ? AND month = ?
+                    """,
+                    key
+                )
+
+    def load_merged(
+        self,
+        category_id: Optional[int] = None,
+        transaction_type: str = 'dépense',
+        start_month: Optional[str] = None,
+        end_month: Optional[str] = None
+    ) -> TDigest:
+        """Fusionne les sketches d'une plage de mois (bornes incluses)"""
+        query = "SELECT sketch FROM quantile_sketches WHERE type = ?"
+        params: list = [transaction_type]
+
+        if category_id:
+            query += " AND category_id = ?"
+            params.append(category_id)
+
+        if start_month:
+            query += " AND month >= ?"
+            params.append(start_month)
+
+        if end_month:
+            query += " AND month <= ?"
+            params.append(end_month)
+
+        self.refresh()
+        merged = TDigest(self.COMPRESSION)
+        for (blob,) in self.db.connection.execute(query, tuple(params)):
+            merged.merge(TDigest.from_bytes(blob))
+        return merged
+
+    def load_by_category(self, month: str, transaction_type: str = 'dépense') -> Dict[int, TDigest]:
+        """Retourne les sketches d'un mois, indexés par catégorie"""
+        self.refresh()
+        cursor = self.db.connection.execute(
+            "SELECT category_id, sketch FROM quantile_sketches WHERE month = ? AND type = ?",
+            (month, transaction_type)
+        )
+        return {category_id: TDigest.from_bytes(blob) for category_id, blob in cursor}
+
+    def _load(self, key: SketchKey) -> Optional[TDigest]:
+        row = self.db.connection.execute(
+            "SELECT sketch FROM quantile_sketches WHERE category_id = ? AND type = ? AND month = ?",
+            key
+        ).fetchone()
+        return TDigest.from_bytes(row[0]) if row else None
+
+    def _save(self, key: SketchKey, digest: TDigest) -> None:
+        self.db.connection.execute(
+            """
+            INSERT OR REPLACE INTO quantile_sketches (category_id, type, month, sketch)
+            VALUES (?, ?, ?, ?)
+            """,
+            key + (digest.to_bytes(),)
+        )
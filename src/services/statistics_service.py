@@ -1,9 +1,11 @@
 # src/services/statistics_service.py
 
 from datetime import date, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence
 from src.database.db_manager import DatabaseManager
+from src.services.sketch_store import SketchStore
 from src.services.transaction_service import TransactionService
+from src.utils.tdigest import TDigest
 
 class StatisticsService:
     """Service pour les statistiques avancées sur les transactions"""
@@ -11,6 +13,7 @@ class StatisticsService:
     def __init__(self, db_manager: DatabaseManager, transaction_service: TransactionService):
         self.db = db_manager
         self.transaction_service = transaction_service
+        self.sketches = SketchStore(db_manager)
     
     def get_monthly_summary(self, year: int, month: int) -> Dict:
         """
@@ -26,37 +29,40 @@ class StatisticsService:
         else:
             end_date = date(year, month + 1, 1) - timedelta(days=1)
         
-        # Récupérer toutes les transactions du mois
-        transactions = self.transaction_service.list_transactions(
-            start_date=start_date,
-            end_date=end_date
+        # Lire les agrégats du mois (une ligne par catégorie et type)
+        rows = self.db.execute_query(
+            """
+            SELECT r.category_id, c.name, r.type, r.total, r.count
+            FROM transaction_rollups r
+            LEFT JOIN categories c ON c.id = r.category_id
+            WHERE r.level = 'month' AND r.period = ?
+            ORDER BY r.category_id
+            """,
+            (f"{year:04d}-{month:02d}",)
         )
         
-        # Calculer les totaux
-        total_revenus = sum(t.amount for t in transactions if t.type == 'revenu')
-        total_depenses = sum(t.amount for t in transactions if t.type == 'dépense')
-        balance = total_revenus - total_depenses
+        total_revenus = 0
+        total_depenses = 0
+        transactions_count = 0
         
         # Regrouper par catégorie
         by_category = {}
-        for t in transactions:
-            if t.category_id not in by_category:
-                # Récupérer le nom de la catégorie
-                cat_data = self.db.execute_query(
-                    "SELECT name FROM categories WHERE id = ?",
-                    (t.category_id,)
-                )
-                cat_name = cat_data[0]['name'] if cat_data else f"Category {t.category_id}"
-                by_category[t.category_id] = {
-                    'name': cat_name,
+        for row in rows:
+            if row['category_id'] not in by_category:
+                by_category[row['category_id']] = {
+                    'name': row['name'] or f"Category {row['category_id']}",
                     'revenus': 0,
                     'depenses': 0
                 }
             
-            if t.type == 'revenu':
-                by_category[t.category_id]['revenus'] += t.amount
+            amount = round(row['total'], 2)
+            transactions_count += row['count']
+            if row['type'] == 'revenu':
+                by_category[row['category_id']]['revenus'] += amount
+                total_revenus += amount
             else:
-                by_category[t.category_id]['depenses'] += t.amount
+                by_category[row['category_id']]['depenses'] += amount
+                total_depenses += amount
         
         return {
             'period': {
@@ -65,26 +71,32 @@ class StatisticsService:
                 'start': start_date.isoformat(),
                 'end': end_date.isoformat()
             },
-            'total_revenus': total_revenus,
-            'total_depenses': total_depenses,
-            'balance': balance,
-            'transactions_count': len(transactions),
+            'total_revenus': round(total_revenus, 2),
+            'total_depenses': round(total_depenses, 2),
+            'balance': round(total_revenus - total_depenses, 2),
+            'transactions_count': transactions_count,
             'by_category': list(by_category.values())
         }
     
-    def get_category_trend(self, category_id: int, months: int = 6) -> List[Dict]:
+    def get_category_trend(
+        self,
+        category_id: int,
+        months: int = 6,
+        reference_date: Optional[date] = None
+    ) -> List[Dict]:
         """
         Analyse l'évolution des dépenses d'une catégorie sur plusieurs mois
         
         Args:
             category_id: ID de la catégorie
             months: Nombre de mois à analyser (défaut: 6)
+            reference_date: Date du dernier mois analysé (défaut: aujourd'hui)
             
         Returns:
             Liste des totaux par mois
         """
-        today = date.today()
-        trends = []
+        today = reference_date or date.today()
+        periods = []
         
         for i in range(months):
             # Calculer le mois
@@ -95,25 +107,60 @@ class StatisticsService:
                 month += 12
                 year -= 1
             
-            # Dates du mois
-            start_date = date(year, month, 1)
-            if month == 12:
-                end_date = date(year + 1, 1, 1) - timedelta(days=1)
-            else:
-                end_date = date(year, month + 1, 1) - timedelta(days=1)
-            
-            # Total pour ce mois
-            total = self.transaction_service.get_total_by_category(
-                category_id, start_date, end_date, 'dépense'
+            periods.append((year, month))
+        
+        periods.reverse()
+        if not periods:
+            return []
+        
+        # Totaux de tous les mois en une seule requête sur les agrégats
+        rows = self.db.execute_query(
+            """
+            SELECT period, total FROM transaction_rollups
+            WHERE level = 'month' AND category_id = ? AND type = 'dépense'
+            AND period >= ? AND period <= ?
+            """,
+            (
+                category_id,
+                f"{periods[0][0]:04d}-{periods[0][1]:02d}",
+                f"{periods[-1][0]:04d}-{periods[-1][1]:02d}"
             )
-            
-            trends.append({
+        )
+        totals = {row['period']: round(row['total'], 2) for row in rows}
+        
+        return [
+            {
                 'year': year,
                 'month': month,
-                'total': total
-            })
+                'total': totals.get(f"{year:04d}-{month:02d}", 0)
+            }
+            for year, month in periods
+        ]
+    
+    def get_totals(self) -> Dict:
+        """
+        Calcule les totaux globaux (tableau de bord) depuis les agrégats mensuels
         
-        return list(reversed(trends))
+        Returns:
+            Dictionnaire avec total revenus, total dépenses et balance
+        """
+        rows = self.db.execute_query(
+            """
+            SELECT type, COALESCE(SUM(total), 0) AS total
+            FROM transaction_rollups
+            WHERE level = 'month'
+            GROUP BY type
+            """
+        )
+        totals = {row['type']: round(row['total'], 2) for row in rows}
+        total_revenus = totals.get('revenu', 0)
+        total_depenses = totals.get('dépense', 0)
+        
+        return {
+            'total_revenus': total_revenus,
+            'total_depenses': total_depenses,
+            'balance': round(total_revenus - total_depenses, 2)
+        }
     
     def get_average_spending_by_category(self, category_id: int, months: int = 3) -> float:
         """Calcule la moyenne des dépenses mensuelles pour une catégorie"""
@@ -182,19 +229,26 @@ class StatisticsService:
         end_date = date.today()
         start_date = end_date - timedelta(days=months * 30)
         
-        transactions = self.transaction_service.list_transactions(
-            category_id=category_id,
-            start_date=start_date,
-            end_date=end_date,
-            transaction_type='dépense'
-        )
+        # Grouper les agrégats journaliers par jour de la semaine
+        # (strftime('%w') : 0=dimanche, ramené à 0=lundi)
+        query = """
+        SELECT (CAST(strftime('%w', period) AS INTEGER) + 6) % 7 AS weekday,
+               SUM(total) AS total
+        FROM transaction_rollups
+        WHERE level = 'day' AND type = 'dépense'
+        AND period >= ? AND period <= ?
+        """
+        params = [start_date.isoformat(), end_date.isoformat()]
         
-        # Grouper par jour de la semaine
-        by_weekday = {i: 0 for i in range(7)}
+        if category_id:
+            query += " AND category_id = ?"
+            params.append(category_id)
+        
+        query += " GROUP BY weekday"
         
-        for t in transactions:
-            weekday = t.date.weekday()
-            by_weekday[weekday] += t.amount
+        by_weekday = {i: 0 for i in range(7)}
+        for row in self.db.execute_query(query, tuple(params)):
+            by_weekday[row['weekday']] = row['total']
         
         weekday_names = ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche']
         
@@ -203,6 +257,94 @@ class StatisticsService:
             for day, total in by_weekday.items()
         }
     
+    def get_category_day_heatmap(
+        self,
+        start_date: date,
+        end_date: date,
+        transaction_type: str = 'dépense'
+    ) -> Dict:
+        """
+        Matrice jour × catégorie des montants (heatmap calendaire)
+        
+        Returns:
+            Dictionnaire compact : 'rows' (jours ISO), 'columns' (catégories)
+            et 'values' (une liste de montants par jour, dans l'ordre des colonnes)
+        """
+        categories = self.db.execute_query("SELECT id, name FROM categories ORDER BY id")
+        column_index = {row['id']: i for i, row in enumerate(categories)}
+        
+        days = [
+            start_date + timedelta(days=i)
+            for i in range((end_date - start_date).days + 1)
+        ]
+        row_index = {d.isoformat(): i for i, d in enumerate(days)}
+        values = [[0] * len(categories) for _ in days]
+        
+        rows = self.db.execute_query(
+            """
+            SELECT period, category_id, total FROM transaction_rollups
+            WHERE level = 'day' AND type = ? AND period >= ? AND period <= ?
+            """,
+            (transaction_type, start_date.isoformat(), end_date.isoformat())
+        )
+        for row in rows:
+            if row['category_id'] in column_index:
+                column = column_index[row['category_id']]
+                values[row_index[row['period']]][column] = round(row['total'], 2)
+        
+        return {
+            'rows': list(row_index),
+            'columns': [row['name'] for row in categories],
+            'values': values
+        }
+    
+    def get_weekday_week_heatmap(
+        self,
+        year: int,
+        category_id: Optional[int] = None,
+        transaction_type: str = 'dépense'
+    ) -> Dict:
+        """
+        Matrice jour de la semaine × semaine de l'année des montants
+        
+        Les semaines suivent strftime('%W') : semaine 0 jusqu'au premier lundi,
+        puis 1 à 53.
+        
+        Returns:
+            Dictionnaire compact : 'rows' (lundi à dimanche), 'columns'
+            (numéros de semaine 0 à 53), 'values' (7 listes de 54 montants)
+            et 'totals' (total de l'année par jour de la semaine)
+        """
+        query = """
+        SELECT (CAST(strftime('%w', period) AS INTEGER) + 6) % 7 AS weekday,
+               CAST(strftime('%W', period) AS INTEGER) AS week,
+               SUM(total) AS total
+        FROM transaction_rollups
+        WHERE level = 'day' AND type = ?
+        AND period >= ? AND period <= ?
+        """
+        params = [transaction_type, f"{year:04d}-01-01", f"{year:04d}-12-31"]
+        
+        if category_id:
+            query += " AND category_id = ?"
+            params.append(category_id)
+        
+        query += " GROUP BY weekday, week"
+        
+        values = [[0] * 54 for _ in range(7)]
+        # Totaux cumulés avant arrondi : la somme des cellules arrondies dériverait
+        totals = [0.0] * 7
+        for row in self.db.execute_query(query, tuple(params)):
+            values[row['weekday']][row['week']] = round(row['total'], 2)
+            totals[row['weekday']] += row['total']
+        
+        return {
+            'rows': ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche'],
+            'columns': list(range(54)),
+            'values': values,
+            'totals': [round(total, 2) for total in totals]
+        }
+    
     def predict_end_of_month_spending(self, category_id: int) -> Dict:
         """
         Prédit les dépenses en fin de mois basé sur la tendance actuelle
@@ -242,3 +384,78 @@ class StatisticsService:
             'days_in_month': days_in_month,
             'projected_total': round(projected_spending, 2)
         }
+    
+    def get_spending_percentiles(
+        self,
+        category_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        percentiles: Sequence[float] = (50, 90, 99),
+        transaction_type: str = 'dépense'
+    ) -> Dict:
+        """
+        Estime les percentiles des montants à partir des sketches mensuels
+        
+        Les sketches sont stockés par mois : la période est étendue aux mois
+        complets qui contiennent start_date et end_date. L'erreur sur le rang
+        est bornée par la compression du sketch (environ 1 % au centre,
+        beaucoup moins pour p90/p99).
+        
+        Returns:
+            Dictionnaire avec le nombre de transactions, min, max et les percentiles
+        """
+        digest = self.sketches.load_merged(
+            category_id=category_id,
+            transaction_type=transaction_type,
+            start_month=SketchStore.month_key(start_date) if start_date else None,
+            end_month=SketchStore.month_key(end_date) if end_date else None
+        )
+        return self._describe_digest(digest, percentiles)
+    
+    def get_category_percentiles(
+        self,
+        year: int,
+        month: int,
+        percentiles: Sequence[float] = (50, 90, 99),
+        transaction_type: str = 'dépense'
+    ) -> List[Dict]:
+        """
+        Estime les percentiles des montants de chaque catégorie pour un mois
+        
+        Returns:
+            Liste de dictionnaires (nom de catégorie, nombre, min, max, percentiles)
+        """
+        digests = self.sketches.load_by_category(f"{year:04d}-{month:02d}", transaction_type)
+        names = {
+            row['id']: row['name']
+            for row in self.db.execute_query("SELECT id, name FROM categories")
+        }
+        
+        result = []
+        for category_id in sorted(digests):
+            stats = self._describe_digest(digests[category_id], percentiles)
+            stats['category_id'] = category_id
+            stats['name'] = names.get(category_id, f"Category {category_id}")
+            result.append(stats)
+        
+        return result
+    
+    @staticmethod
+    def _describe_digest(digest: TDigest, percentiles: Sequence[float]) -> Dict:
+        """Résume un sketch : nombre, min, max et percentiles demandés"""
+        if not digest.count:
+            return {
+                'count': 0,
+                'min': None,
+                'max': None,
+                'percentiles': {f"p{p:g}": None for p in percentiles}
+            }
+        
+        return {
+            'count': int(digest.count),
+            'min': round(digest.min, 2),
+            'max': round(digest.max, 2),
+            'percentiles': {
+                f"p{p:g}": round(digest.percentile(p), 2) for p in percentiles
+            }
+        }
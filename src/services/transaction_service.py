@@ -1,30 +1,341 @@
 # src/services/transaction_service.py
 
+import base64
+import binascii
 from datetime import date, datetime
-from typing import List, Optional, Dict
+from typing import Iterable, Iterator, List, Optional, Dict, Sequence, Tuple
 from src.database.db_manager import DatabaseManager
 from src.models.transaction import Transaction
+from src.services.sketch_store import SketchStore
+from src.utils.content_hash import ContentHasher, content_hash, content_key, signed_amount
+from src.utils.events import EventBus
+from src.utils.tdigest import TDigest
+
+# Traitement d'une transaction identique à une transaction existante
+DUPLICATE_POLICIES = ('skip', 'merge', 'insert')
+
+# Nombre d'empreintes recherchées par requête (limite de paramètres SQLite)
+HASH_LOOKUP_SIZE = 500
+
+# Taille maximale d'une page de list_transactions_page
+MAX_PAGE_SIZE = 5000
+
+# Champs sélectionnables dans list_transactions_page -> expression SQL
+TRANSACTION_FIELDS = {
+    'id': 't.id',
+    'date': 't.date',
+    'amount': 't.amount',
+    'description': 't.description',
+    'type': 't.type',
+    'category_id': 't.category_id',
+    'category': 'c.name',
+    'account': 't.account',
+}
+
+# Champs retournés par défaut (tous sauf le compte)
+DEFAULT_TRANSACTION_FIELDS = (
+    'id', 'date', 'amount', 'description', 'type', 'category_id', 'category'
+)
 
 class TransactionService:
     """Service pour gérer les transactions"""
     
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: DatabaseManager, events: Optional[EventBus] = None):
+        """
+        Args:
+            db_manager: Base de données
+            events: Bus sur lequel publier les écritures ('transaction' pour
+                    une transaction, 'transactions' pour un ajout en masse)
+        """
         self.db = db_manager
+        self.events = events
+        self.sketches = SketchStore(db_manager)
     
-    def add_transaction(self, transaction: Transaction) -> int:
-        """Ajoute une nouvelle transaction et retourne son ID"""
+    def add_transaction(self, transaction: Transaction, on_duplicate: str = 'insert',
+                        account: Optional[str] = None) -> int:
+        """
+        Ajoute une nouvelle transaction et retourne son ID
+        
+        Une saisie manuelle est toujours ajoutée ('insert', par défaut) : deux
+        cafés le même jour sont deux transactions. Avec 'skip' ou 'merge', une
+        transaction identique (même date, montant, libellé normalisé et
+        compte) est détectée par l'index d'empreintes : elle est ignorée
+        (l'ID existant est retourné) ou fusionnée (catégorie, type et libellé
+        mis à jour). Voir find_duplicate pour prévenir l'utilisateur.
+        """
+        if on_duplicate not in DUPLICATE_POLICIES:
+            raise ValueError(f"Politique de doublon inconnue: {on_duplicate}")
+        
+        date_iso = transaction.date.isoformat()
+        key = content_key(date_iso, signed_amount(transaction.amount, transaction.type),
+                          transaction.description, account)
+        # Une saisie 'insert' ne cherche pas de doublon : _free_hash numérote
+        existing = self._find_hashes([content_hash(key)]) if on_duplicate != 'insert' else {}
+        
+        if existing:
+            (existing_id, previous), = existing.values()
+            if on_duplicate == 'skip':
+                return existing_id
+            if on_duplicate == 'merge':
+                self._merge_rows([(transaction.description, transaction.type,
+                                   transaction.category_id, existing_id, date_iso, previous)])
+                self.db.connection.commit()
+                self._publish_transaction('merged', existing_id, transaction)
+                return existing_id
+        
         query = """
-        INSERT INTO transactions (amount, description, type, category_id, date)
-        VALUES (?, ?, ?, ?, ?)
+        INSERT INTO transactions
+            (amount, description, type, category_id, date, account, content_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
         """
         params = (
             transaction.amount,
             transaction.description,
             transaction.type,
             transaction.category_id,
-            transaction.date.isoformat()
+            date_iso,
+            account,
+            self._free_hash(key)
+        )
+        cursor = self.db.connection.execute(query, params)
+        self.sketches.mark_dirty([
+            (transaction.category_id, transaction.type, SketchStore.month_key(transaction.date))
+        ])
+        self.db.connection.commit()
+        self._publish_transaction('added', cursor.lastrowid, transaction)
+        return cursor.lastrowid
+    
+    def find_duplicate(self, transaction: Transaction,
+                       account: Optional[str] = None) -> Optional[int]:
+        """Retourne l'ID d'une transaction identique déjà enregistrée, ou None"""
+        amount = signed_amount(transaction.amount, transaction.type)
+        key = content_key(transaction.date.isoformat(), amount, transaction.description, account)
+        existing = self._find_hashes([content_hash(key)])
+        return next(iter(existing.values()))[0] if existing else None
+    
+    def add_transactions_bulk(self, rows: Iterable[Tuple], batch_size: int = 10000,
+                              on_duplicate: str = 'skip', with_results: bool = False) -> Dict:
+        """
+        Insère un grand nombre de transactions dans une seule transaction SQL
+        
+        Les lignes sont déjà validées par l'appelant et valent
+        (amount, description, type, category_id, date ISO), suivies
+        éventuellement du compte et d'une empreinte précalculée. Elles sont
+        insérées par blocs avec executemany ; les agrégats sont mis à jour
+        une fois par bloc et les sketches une fois à la fin. En cas
+        d'erreur, rien n'est inséré.
+        
+        Les doublons sont détectés par l'index d'empreintes, un bloc à la
+        fois, et traités selon on_duplicate ('skip', 'merge' ou 'insert').
+        Sans empreinte fournie, les lignes identiques sont numérotées dans
+        l'ordre de la source : réimporter la même source est sans effet.
+        
+        Returns:
+            Dictionnaire {'inserted', 'skipped', 'merged'} ; avec
+            with_results, 'results' donne pour chaque ligne, dans l'ordre,
+            {'status': 'inserted' | 'skipped' | 'merged', 'id': ID}
+        """
+        if on_duplicate not in DUPLICATE_POLICIES:
+            raise ValueError(f"Politique de doublon inconnue: {on_duplicate}")
+        
+        query = """
+        INSERT INTO transactions
+            (amount, description, type, category_id, date, account, content_hash, change_seq)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """
+        connection = self.db.connection
+        hasher = ContentHasher()
+        stats = {'inserted': 0, 'skipped': 0, 'merged': 0}
+        results: Optional[List[Dict]] = [] if with_results else None
+        batch: List[Tuple] = []
+        # Sketches accumulés en mémoire et enregistrés une seule fois à la fin
+        digests: Dict[Tuple, TDigest] = {}
+        # Catégories et période touchées, pour l'événement publié à la fin
+        touched: Optional[set] = set() if self.events is not None else None
+        start_iso = end_iso = None
+        
+        try:
+            for row in rows:
+                amount, description, transaction_type, category_id, date_iso = row[:5]
+                if touched is not None:
+                    touched.add(category_id)
+                    start_iso = date_iso if start_iso is None or date_iso < start_iso else start_iso
+                    end_iso = date_iso if end_iso is None or date_iso > end_iso else end_iso
+                account = row[5] if len(row) > 5 else None
+                row_hash = row[6] if len(row) > 6 and row[6] else hasher(
+                    date_iso, signed_amount(amount, transaction_type), description, account
+                )
+                batch.append((amount, description, transaction_type, category_id, date_iso,
+                              account, row_hash))
+                if len(batch) >= batch_size:
+                    self._insert_batch(query, batch, digests, on_duplicate, stats, results)
+                    batch = []
+            if batch:
+                self._insert_batch(query, batch, digests, on_duplicate, stats, results)
+            self.sketches.add_digests(digests)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        
+        if touched and (stats['inserted'] or stats['merged']):
+            self.events.publish('transactions', {
+                'inserted': stats['inserted'],
+                'merged': stats['merged'],
+                'category_ids': sorted(touched),
+                'start': start_iso,
+                'end': end_iso,
+            })
+        if with_results:
+            stats['results'] = results
+        return stats
+    
+    def _insert_batch(self, query: str, batch: List[Tuple], digests: Dict[Tuple, TDigest],
+                      on_duplicate: str, stats: Dict[str, int],
+                      results: Optional[List[Dict]] = None) -> None:
+        """
+        Insère un bloc de lignes, met à jour les agrégats et alimente les sketches
+        
+        Si results est fourni, le résultat de chaque ligne du bloc y est
+        ajouté ; l'ID d'une ligne ignorée est celui de la transaction
+        existante de même empreinte.
+        """
+        existing = self._find_hashes([row[6] for row in batch])
+        known = {row_hash: found[0] for row_hash, found in existing.items()}
+        taken = set(existing)
+        to_insert: List[Tuple] = []
+        to_merge: List[Tuple] = []
+        # Résultats du bloc : (statut, ID fusionné ou empreinte résolue après insertion)
+        outcomes: List[Tuple[str, object]] = []
+        
+        for row in batch:
+            row_hash = row[6]
+            if row_hash in taken:
+                if on_duplicate == 'merge' and row_hash in existing:
+                    existing_id, previous = existing.pop(row_hash)
+                    to_merge.append((row[1], row[2], row[3], existing_id, row[4], previous))
+                    outcomes.append(('merged', existing_id))
+                    continue
+                if on_duplicate != 'insert':
+                    stats['skipped'] += 1
+                    outcomes.append(('skipped', row_hash))
+                    continue
+                row_hash = self._free_hash(
+                    content_key(row[4], signed_amount(row[0], row[2]), row[1], row[5]), taken
+                )
+                row = row[:6] + (row_hash,)
+            taken.add(row_hash)
+            to_insert.append(row)
+            outcomes.append(('inserted', row_hash))
+        
+        if to_merge:
+            self._merge_rows(to_merge)
+            stats['merged'] += len(to_merge)
+        if not to_insert:
+            if results is not None:
+                results.extend(
+                    {'status': status, 'id': ref if status == 'merged' else known.get(ref)}
+                    for status, ref in outcomes
+                )
+            return
+        
+        # Séquence réservée d'avance : les triggers par ligne sont évités
+        first_seq = self.db.reserve_change_sequence(len(to_insert))
+        last_seq = first_seq + len(to_insert) - 1
+        self.db.connection.executemany(
+            query,
+            (row + (first_seq + offset,) for offset, row in enumerate(to_insert))
         )
-        return self.db.execute_update(query, params)
+        self.db.apply_rollups(first_seq, last_seq)
+        
+        if results is not None:
+            # La séquence réservée relie chaque ligne insérée à son ID
+            ids = dict(self.db.connection.execute(
+                "SELECT change_seq, id FROM transactions WHERE change_seq BETWEEN ? AND ?",
+                (first_seq, last_seq)
+            ).fetchall())
+            inserted = {row[6]: ids[first_seq + offset] for offset, row in enumerate(to_insert)}
+            results.extend(
+                {
+                    'status': status,
+                    'id': ref if status == 'merged' else known.get(ref) or inserted.get(ref)
+                }
+                for status, ref in outcomes
+            )
+        
+        grouped: Dict[Tuple, List[float]] = {}
+        for amount, _, transaction_type, category_id, date_iso, _, _ in to_insert:
+            grouped.setdefault((category_id, transaction_type, date_iso[:7]), []).append(amount)
+        for key, amounts in grouped.items():
+            if key not in digests:
+                digests[key] = self.sketches.new_digest()
+            digests[key].update(amounts)
+        
+        stats['inserted'] += len(to_insert)
+    
+    def _find_hashes(self, hashes: List[str]) -> Dict[str, Tuple[int, Tuple]]:
+        """Recherche des empreintes dans l'index : {empreinte: (id, clé de sketch)}"""
+        found: Dict[str, Tuple[int, Tuple]] = {}
+        for start in range(0, len(hashes), HASH_LOOKUP_SIZE):
+            chunk = hashes[start:start + HASH_LOOKUP_SIZE]
+            cursor = self.db.connection.execute(
+                f"""
+                SELECT content_hash, id, category_id, type, substr(date, 1, 7) FROM transactions
+                WHERE content_hash IN ({', '.join('?' * len(chunk))})
+                """,
+                chunk
+            )
+            for row_hash, transaction_id, category_id, transaction_type, month in cursor:
+                found[row_hash] = (transaction_id, (category_id, transaction_type, month))
+        return found
+    
+    def _free_hash(self, key: str, taken: Iterable[str] = (), own_id: Optional[int] = None) -> str:
+        """
+        Première empreinte libre pour une clé (occurrence 0, 1, ...)
+        
+        Les empreintes ne se prêtent pas à une recherche par préfixe ; mais
+        toutes les occurrences d'une clé portent sa date : les empreintes du
+        jour sont lues en une requête (index sur la date), puis les
+        occurrences sont essayées en mémoire.
+        """
+        date_iso = key.split('|', 1)[0]
+        used = {
+            row_hash
+            for row_hash, transaction_id in self.db.connection.execute(
+                "SELECT content_hash, id FROM transactions WHERE date = ?", (date_iso,)
+            )
+            if transaction_id != own_id
+        }
+        occurrence = 0
+        while True:
+            candidate = content_hash(key, occurrence)
+            if candidate not in taken and candidate not in used:
+                return candidate
+            occurrence += 1
+    
+    def _merge_rows(self, merges: List[Tuple]) -> None:
+        """
+        Fusionne des doublons dans les transactions existantes
+        
+        Chaque élément vaut (description, type, category_id, id, date ISO,
+        clé de sketch précédente) ; seules les lignes modifiées sont écrites.
+        """
+        self.db.connection.executemany(
+            """
+            UPDATE transactions SET description = ?, type = ?, category_id = ?
+            WHERE id = ? AND (description, type, category_id) IS NOT (?, ?, ?)
+            """,
+            [
+                (description, transaction_type, category_id, transaction_id,
+                 description, transaction_type, category_id)
+                for description, transaction_type, category_id, transaction_id, _, _ in merges
+            ]
+        )
+        keys = set()
+        for _, transaction_type, category_id, _, date_iso, previous in merges:
+            keys.add(previous)
+            keys.add((category_id, transaction_type, date_iso[:7]))
+        self.sketches.mark_dirty(keys)
     
     def get_transaction_by_id(self, transaction_id: int) -> Optional[Transaction]:
         """Récupère une transaction par son ID"""
@@ -52,40 +363,190 @@ class TransactionService:
         transaction_type: Optional[str] = None
     ) -> List[Transaction]:
         """Liste les transactions avec filtres optionnels"""
-        query = "SELECT * FROM transactions WHERE 1=1"
-        params = []
+        where, params = self._build_filters(category_id, start_date, end_date, transaction_type)
+        query = f"SELECT * FROM transactions WHERE {where} ORDER BY date DESC"
+        
+        results = self.db.execute_query(query, params)
+        
+        return [
+            Transaction(
+                id=row['id'],
+                amount=row['amount'],
+                description=row['description'],
+                type=row['type'],
+                category_id=row['category_id'],
+                date=datetime.strptime(row['date'], '%Y-%m-%d').date()
+            )
+            for row in results
+        ]
+    
+    def list_transactions_page(
+        self,
+        category_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        transaction_type: Optional[str] = None,
+        page_size: int = 50,
+        cursor: Optional[str] = None,
+        order: str = 'desc',
+        fields: Optional[Sequence[str]] = None
+    ) -> Dict:
+        """
+        Retourne une page de transactions filtrées, avec le nom de catégorie
+        
+        La pagination se fait par curseur sur (date, id) : la page suivante
+        reprend après la dernière ligne lue, via l'index, sans OFFSET. Le
+        coût d'une page ne dépend donc pas de sa position ni du volume.
+        
+        Args:
+            category_id: Filtrer par catégorie (optionnel)
+            start_date: Date de début (optionnel)
+            end_date: Date de fin (optionnel)
+            transaction_type: 'revenu' ou 'dépense' (optionnel)
+            page_size: Nombre de transactions par page (1 à MAX_PAGE_SIZE)
+            cursor: Curseur 'next_cursor' de la page précédente (optionnel)
+            order: 'desc' (plus récentes d'abord) ou 'asc'
+            fields: Champs à retourner parmi TRANSACTION_FIELDS ; seules ces
+                colonnes sont lues (jointure aux catégories si 'category')
+            
+        Returns:
+            Dictionnaire {'items', 'next_cursor', 'total'} ; next_cursor vaut
+            None sur la dernière page, total est calculé sur les agrégats
+            
+        Raises:
+            ValueError: Taille de page, ordre, curseur ou champ invalide
+        """
+        if not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise ValueError(f"La taille de page doit être comprise entre 1 et {MAX_PAGE_SIZE}")
+        if order not in ('asc', 'desc'):
+            raise ValueError(f"Ordre de tri inconnu: {order}")
+        fields = list(dict.fromkeys(fields or DEFAULT_TRANSACTION_FIELDS))
+        for field in fields:
+            if field not in TRANSACTION_FIELDS:
+                raise ValueError(f"Champ inconnu: {field}")
+        
+        # date et id sont toujours lus : ils forment le curseur
+        selected = list(dict.fromkeys(['id', 'date'] + fields))
+        columns = ", ".join(f"{TRANSACTION_FIELDS[field]} AS {field}" for field in selected)
+        join = "LEFT JOIN categories c ON c.id = t.category_id" if 'category' in selected else ""
+        
+        where, params = self._build_filters(category_id, start_date, end_date, transaction_type)
+        if cursor:
+            where += f" AND (t.date, t.id) {'<' if order == 'desc' else '>'} (?, ?)"
+            params += _decode_cursor(cursor)
+        
+        direction = order.upper()
+        query = f"""
+        SELECT {columns}
+        FROM transactions t
+        {join}
+        WHERE {where}
+        ORDER BY t.date {direction}, t.id {direction}
+        LIMIT ?
+        """
+        rows = self.db.execute_query(query, params + (page_size + 1,))
+        
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = _encode_cursor(rows[-1]['date'], rows[-1]['id'])
+        if len(selected) > len(fields):
+            rows = [{field: row[field] for field in fields} for row in rows]
+        
+        return {
+            'items': rows,
+            'next_cursor': next_cursor,
+            'total': self.count_transactions(category_id, start_date, end_date, transaction_type)
+        }
+    
+    def count_transactions(
+        self,
+        category_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        transaction_type: Optional[str] = None
+    ) -> int:
+        """
+        Compte les transactions filtrées à partir des agrégats
+        
+        Agrégats mensuels sans filtre de date, journaliers sinon : le coût
+        dépend du nombre de périodes, pas du nombre de transactions.
+        """
+        clauses = ["level = ?"]
+        params: list = ['day' if start_date or end_date else 'month']
         
         if category_id:
-            query += " AND category_id = ?"
+            clauses.append("category_id = ?")
             params.append(category_id)
         
         if start_date:
-            query += " AND date >= ?"
+            clauses.append("period >= ?")
             params.append(start_date.isoformat())
         
         if end_date:
-            query += " AND date <= ?"
+            clauses.append("period <= ?")
             params.append(end_date.isoformat())
         
         if transaction_type:
-            query += " AND type = ?"
+            clauses.append("type = ?")
             params.append(transaction_type)
         
-        query += " ORDER BY date DESC"
+        query = (
+            "SELECT COALESCE(SUM(count), 0) AS total FROM transaction_rollups "
+            f"WHERE {' AND '.join(clauses)}"
+        )
+        return self.db.execute_query(query, tuple(params))[0]['total']
+    
+    def iter_transaction_rows(
+        self,
+        category_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        transaction_type: Optional[str] = None,
+        chunk_size: int = 1000
+    ) -> Iterator[List[Tuple]]:
+        """
+        Parcourt les transactions filtrées par blocs de tuples bruts
         
-        results = self.db.execute_query(query, tuple(params))
+        Chaque ligne vaut (id, date, amount, description, type, category_id),
+        dans le même ordre que list_transactions, sans construire d'objets
+        Transaction : adapté aux exports volumineux.
+        """
+        where, params = self._build_filters(category_id, start_date, end_date, transaction_type)
+        query = f"""
+        SELECT id, date, amount, description, type, category_id
+        FROM transactions WHERE {where} ORDER BY date DESC
+        """
+        return self.db.iter_query(query, params, chunk_size)
+    
+    @staticmethod
+    def _build_filters(
+        category_id: Optional[int],
+        start_date: Optional[date],
+        end_date: Optional[date],
+        transaction_type: Optional[str]
+    ) -> Tuple[str, tuple]:
+        """Construit la clause WHERE commune aux listes et aux exports"""
+        clauses = ["1=1"]
+        params = []
         
-        return [
-            Transaction(
-                id=row['id'],
-                amount=row['amount'],
-                description=row['description'],
-                type=row['type'],
-                category_id=row['category_id'],
-                date=datetime.strptime(row['date'], '%Y-%m-%d').date()
-            )
-            for row in results
-        ]
+        if category_id:
+            clauses.append("category_id = ?")
+            params.append(category_id)
+        
+        if start_date:
+            clauses.append("date >= ?")
+            params.append(start_date.isoformat())
+        
+        if end_date:
+            clauses.append("date <= ?")
+            params.append(end_date.isoformat())
+        
+        if transaction_type:
+            clauses.append("type = ?")
+            params.append(transaction_type)
+        
+        return " AND ".join(clauses), tuple(params)
     
     def get_total_by_category(
         self, 
@@ -95,50 +556,105 @@ class TransactionService:
         transaction_type: str = 'dépense'
     ) -> float:
         """Calcule le total des transactions pour une catégorie sur une période"""
+        # Agrégats journaliers : coût proportionnel au nombre de jours
         query = """
-        SELECT COALESCE(SUM(amount), 0) as total
-        FROM transactions
-        WHERE category_id = ?
-        AND date >= ?
-        AND date <= ?
+        SELECT COALESCE(SUM(total), 0) as total
+        FROM transaction_rollups
+        WHERE level = 'day'
+        AND period >= ?
+        AND period <= ?
+        AND category_id = ?
         AND type = ?
         """
-        params = (category_id, start_date.isoformat(), end_date.isoformat(), transaction_type)
+        params = (start_date.isoformat(), end_date.isoformat(), category_id, transaction_type)
         result = self.db.execute_query(query, params)
-        return result[0]['total'] if result else 0.0
+        return round(result[0]['total'], 2) if result else 0.0
     
     def update_transaction(self, transaction_id: int, transaction: Transaction) -> bool:
         """Met à jour une transaction existante"""
-        query = """
-        UPDATE transactions
-        SET amount = ?, description = ?, type = ?, category_id = ?, date = ?
-        WHERE id = ?
-        """
-        params = (
-            transaction.amount,
-            transaction.description,
-            transaction.type,
-            transaction.category_id,
-            transaction.date.isoformat(),
-            transaction_id
-        )
+        previous = self._get_sketch_key(transaction_id)
+        row = self.db.connection.execute(
+            "SELECT account, category_id, date FROM transactions WHERE id = ?", (transaction_id,)
+        ).fetchone()
+        # Nouvelle empreinte : le contenu (date, montant, libellé) a pu changer
+        new_hash = self._free_hash(
+            content_key(transaction.date.isoformat(),
+                        signed_amount(transaction.amount, transaction.type),
+                        transaction.description, row[0]),
+            own_id=transaction_id
+        ) if row else None
         cursor = self.db.connection.execute(
             """
             UPDATE transactions
-            SET amount = ?, description = ?, type = ?, category_id = ?, date = ?
+            SET amount = ?, description = ?, type = ?, category_id = ?, date = ?, content_hash = ?
             WHERE id = ?
             """,
-            (transaction.amount, transaction.description, transaction.type, transaction.category_id, transaction.date, transaction_id)
+            (transaction.amount, transaction.description, transaction.type, transaction.category_id,
+             transaction.date, new_hash, transaction_id)
         )
+        if cursor.rowcount > 0:
+            self.sketches.mark_dirty([
+                previous,
+                (transaction.category_id, transaction.type, SketchStore.month_key(transaction.date))
+            ])
         self.db.connection.commit()
+        if cursor.rowcount > 0:
+            self._publish_transaction('updated', transaction_id, transaction,
+                                      previous={'category_id': row[1], 'date': row[2]})
         return cursor.rowcount > 0
     
     def delete_transaction(self, transaction_id: int) -> bool:
         """Supprime une transaction"""
-        query = "DELETE FROM transactions WHERE id = ?"
+        previous = self._get_sketch_key(transaction_id)
+        deleted = self.get_transaction_by_id(transaction_id) if self.events is not None else None
         cursor = self.db.connection.execute(
             "DELETE FROM transactions WHERE id = ?",
             (transaction_id,)
         )
+        if cursor.rowcount > 0:
+            self.sketches.mark_dirty([previous])
         self.db.connection.commit()
+        if cursor.rowcount > 0 and deleted is not None:
+            self._publish_transaction('deleted', transaction_id, deleted)
         return cursor.rowcount > 0
+    
+    def _publish_transaction(self, action: str, transaction_id: int, transaction: Transaction,
+                             previous: Optional[Dict] = None) -> None:
+        """Publie une écriture de transaction ('added', 'merged', 'updated', 'deleted')"""
+        if self.events is None:
+            return
+        data = {
+            'action': action,
+            'id': transaction_id,
+            'date': transaction.date.isoformat(),
+            'amount': transaction.amount,
+            'description': transaction.description,
+            'type': transaction.type,
+            'category_id': transaction.category_id,
+        }
+        if previous is not None:
+            data['previous'] = previous
+        self.events.publish('transaction', data)
+    
+    def _get_sketch_key(self, transaction_id: int):
+        """Retourne la clé de sketch (catégorie, type, mois) d'une transaction"""
+        row = self.db.connection.execute(
+            "SELECT category_id, type, substr(date, 1, 7) FROM transactions WHERE id = ?",
+            (transaction_id,)
+        ).fetchone()
+        return tuple(row) if row else None
+
+
+def _encode_cursor(date_iso: str, transaction_id: int) -> str:
+    """Curseur opaque de pagination pour la position (date, id)"""
+    return base64.urlsafe_b64encode(f"{date_iso}|{transaction_id}".encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Position (date ISO, id) d'un curseur de pagination"""
+    try:
+        decoded = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        date_iso, transaction_id = decoded.split('|')
+        return date.fromisoformat(date_iso).isoformat(), int(transaction_id)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError(f"Curseur de pagination invalide: {cursor}")
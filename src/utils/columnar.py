@@ -0,0 +1,208 @@
+# src/utils/columnar.py
+
+import mmap
+import struct
+import sys
+from array import array
+from typing import BinaryIO, Dict, Iterator, List, Sequence, Tuple, Union
+
+# Format binaire colonnaire MyBudget
+#
+#   En-tête : MAGIC, uint16 nombre de colonnes, puis pour chaque colonne
+#             uint8 longueur du nom, nom UTF-8, code de type (1 octet)
+#   Groupes : uint32 nombre de lignes, puis un bloc par colonne :
+#             - numérique : uint64 taille, valeurs (array, little-endian)
+#             - texte ('s') : uint64 taille, offsets uint32 (n + 1),
+#                             uint64 taille, octets UTF-8
+#
+# Chaque bloc commence sur un multiple de 8 octets, ce qui permet de lire
+# les colonnes numériques sans copie depuis un mmap (memoryview.cast).
+
+MAGIC = b'MBCOL\x01'
+STRING = 's'
+NUMERIC_TYPES = ('b', 'i', 'q', 'd')
+
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_U64 = struct.Struct('<Q')
+_SWAP = sys.byteorder != 'little'
+
+Schema = Sequence[Tuple[str, str]]
+Column = Union[memoryview, array, List[str]]
+
+
+def _padding(offset: int) -> int:
+    return -offset % 8
+
+
+class ColumnarWriter:
+    """Écrit des groupes de lignes en colonnes typées dans un flux binaire"""
+
+    def __init__(self, fileobj: BinaryIO, schema: Schema):
+        """
+        Args:
+            fileobj: Flux binaire ouvert en écriture
+            schema: Liste (nom, type) ; type parmi 'b', 'i', 'q', 'd' ou 's'
+        """
+        for name, typecode in schema:
+            if typecode not in NUMERIC_TYPES + (STRING,):
+                raise ValueError(f"Type de colonne inconnu: {typecode}")
+        self.fileobj = fileobj
+        self.schema = list(schema)
+        self.rows = 0
+        self._offset = 0
+
+        header = MAGIC + _U16.pack(len(self.schema))
+        for name, typecode in self.schema:
+            encoded = name.encode('utf-8')
+            header += bytes([len(encoded)]) + encoded + typecode.encode('ascii')
+        self._write(header)
+        self._align()
+
+    def write_row_group(self, columns: Dict[str, Sequence]) -> None:
+        """Écrit un groupe de lignes (une séquence de valeurs par colonne)"""
+        sizes = {len(columns[name]) for name, _ in self.schema}
+        if len(sizes) != 1:
+            raise ValueError("Toutes les colonnes doivent avoir la même longueur")
+        nrows = sizes.pop()
+        if nrows == 0:
+            return
+
+        self._write(_U32.pack(nrows))
+        self._align()
+
+        for name, typecode in self.schema:
+            values = columns[name]
+            if typecode == STRING:
+                encoded = [value.encode('utf-8') for value in values]
+                offsets = array('I', [0])
+                position = 0
+                for item in encoded:
+                    position += len(item)
+                    offsets.append(position)
+                self._write_block(offsets)
+                self._write_bytes_block(b''.join(encoded))
+            else:
+                self._write_block(values if isinstance(values, array) else array(typecode, values))
+
+        self.rows += nrows
+
+    def _write_block(self, values: array) -> None:
+        if _SWAP:
+            values = array(values.typecode, values)
+            values.byteswap()
+        self._write_bytes_block(values.tobytes())
+
+    def _write_bytes_block(self, data: bytes) -> None:
+        self._write(_U64.pack(len(data)))
+        self._write(data)
+        self._align()
+
+    def _write(self, data: bytes) -> None:
+        self.fileobj.write(data)
+        self._offset += len(data)
+
+    def _align(self) -> None:
+        padding = _padding(self._offset)
+        if padding:
+            self._write(b'\x00' * padding)
+
+
+class ColumnarReader:
+    """
+    Lit un fichier colonnaire via mmap
+
+    Les colonnes numériques sont exposées sans copie (memoryview typées) ;
+    les colonnes texte sont décodées à la demande. Les memoryview issues
+    de iter_row_groups() doivent être libérées avant close().
+    """
+
+    def __init__(self, filepath: str):
+        self._file = open(filepath, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Fichier vide : mmap refuse une taille nulle
+            self._file.close()
+            raise ValueError("Fichier colonnaire invalide")
+        self._view = memoryview(self._mmap)
+        self.schema: List[Tuple[str, str]] = []
+        self._data_start = self._read_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        """Libère le mmap et ferme le fichier"""
+        self._view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def iter_row_groups(self) -> Iterator[Dict[str, Column]]:
+        """Parcourt les groupes de lignes : {nom de colonne: valeurs}"""
+        offset = self._data_start
+        end = len(self._mmap)
+
+        while offset < end:
+            (nrows,) = _U32.unpack_from(self._view, offset)
+            offset += _U32.size
+            offset += _padding(offset)
+
+            group: Dict[str, Column] = {}
+            for name, typecode in self.schema:
+                if typecode == STRING:
+                    offsets, offset = self._read_block(offset, 'I')
+                    data, offset = self._read_block(offset, None)
+                    raw = bytes(data)
+                    group[name] = [
+                        raw[offsets[i]:offsets[i + 1]].decode('utf-8')
+                        for i in range(nrows)
+                    ]
+                else:
+                    group[name], offset = self._read_block(offset, typecode)
+            yield group
+
+    def read_columns(self) -> Dict[str, Union[array, List[str]]]:
+        """Charge toutes les colonnes (array.array pour les nombres, listes pour le texte)"""
+        result: Dict[str, Union[array, List[str]]] = {
+            name: [] if typecode == STRING else array(typecode)
+            for name, typecode in self.schema
+        }
+        for group in self.iter_row_groups():
+            for name, values in group.items():
+                if isinstance(values, memoryview):
+                    result[name].frombytes(values.tobytes())
+                else:
+                    result[name].extend(values)
+        return result
+
+    def _read_header(self) -> int:
+        if bytes(self._view[:len(MAGIC)]) != MAGIC:
+            raise ValueError("Fichier colonnaire invalide")
+        offset = len(MAGIC)
+        (count,) = _U16.unpack_from(self._view, offset)
+        offset += _U16.size
+        for _ in range(count):
+            length = self._view[offset]
+            name = bytes(self._view[offset + 1:offset + 1 + length]).decode('utf-8')
+            typecode = chr(self._view[offset + 1 + length])
+            self.schema.append((name, typecode))
+            offset += length + 2
+        return offset + _padding(offset)
+
+    def _read_block(self, offset: int, typecode):
+        (size,) = _U64.unpack_from(self._view, offset)
+        offset += _U64.size
+        block = self._view[offset:offset + size]
+        offset += size
+        offset += _padding(offset)
+        if typecode is None:
+            return block, offset
+        if _SWAP:
+            values = array(typecode, block.tobytes())
+            values.byteswap()
+            return memoryview(values), offset
+        return block.cast(typecode), offset
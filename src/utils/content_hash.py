@@ -0,0 +1,49 @@
+# src/utils/content_hash.py
+
+import hashlib
+import unicodedata
+from typing import Dict, Optional
+
+
+def normalize_description(value: str) -> str:
+    """Libellé comparable : minuscules, sans accents, espaces réduits"""
+    decomposed = unicodedata.normalize('NFKD', value.casefold())
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.split())
+
+
+def signed_amount(amount: float, transaction_type: str) -> float:
+    """Montant signé comme sur un relevé : négatif pour une dépense"""
+    return -amount if transaction_type == 'dépense' else amount
+
+
+def content_key(date_iso: str, amount: float, description: str,
+                account: Optional[str] = None) -> str:
+    """Clé de contenu : date, montant signé en centimes, libellé normalisé, compte"""
+    cents = int(round(float(amount) * 100))
+    return f"{date_iso}|{cents}|{normalize_description(description)}|{account or ''}"
+
+
+def content_hash(key: str, occurrence: int = 0) -> str:
+    """
+    Empreinte stable d'une clé de contenu
+
+    L'occurrence distingue les opérations identiques d'un même relevé
+    (deux cafés le même jour) : la n-ième reçoit toujours la même empreinte,
+    ce qui rend la réimportation du relevé idempotente.
+    """
+    return hashlib.blake2b(f"{key}#{occurrence}".encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ContentHasher:
+    """Calcule les empreintes d'une source en numérotant les opérations identiques"""
+
+    def __init__(self):
+        self._seen: Dict[str, int] = {}
+
+    def __call__(self, date_iso: str, amount: float, description: str,
+                 account: Optional[str] = None) -> str:
+        key = content_key(date_iso, amount, description, account)
+        occurrence = self._seen.get(key, 0)
+        self._seen[key] = occurrence + 1
+        return content_hash(key, occurrence)
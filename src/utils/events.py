@@ -0,0 +1,111 @@
+# src/utils/events.py
+
+import itertools
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Événements conservés pour les clients qui se reconnectent (Last-Event-ID)
+HISTORY_SIZE = 256
+
+
+@dataclass(frozen=True)
+class Event:
+    """Événement publié sur le bus ; l'ID croît avec l'ordre de publication"""
+    id: int
+    type: str
+    data: Dict[str, Any]
+
+
+class EventBus:
+    """
+    Bus d'événements en mémoire, partagé par les threads du processus
+
+    Les abonnés sont des fonctions appelées dans le thread qui publie,
+    une fois l'écriture validée : elles doivent rester courtes (mise en
+    file pour un client SSE, une requête groupée pour les budgets). Un
+    événement publié par un abonné est distribué après celui en cours :
+    dans un thread, les abonnés reçoivent les événements dans l'ordre des
+    IDs. Une erreur d'abonné est journalisée sans interrompre les autres. Les
+    derniers événements sont conservés pour être rejoués à un client qui
+    se reconnecte.
+    """
+
+    def __init__(self, history_size: int = HISTORY_SIZE):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._tokens = itertools.count()
+        self._subscribers: Dict[int, Tuple[Callable[[Event], None], Optional[frozenset]]] = {}
+        self._history: deque = deque(maxlen=history_size)
+        # Événements en attente de distribution dans le thread courant
+        self._local = threading.local()
+
+    def subscribe(self, callback: Callable[[Event], None],
+                  event_types: Optional[Iterable[str]] = None) -> Callable[[], None]:
+        """
+        Abonne callback aux événements (tous, ou seulement event_types)
+
+        Returns:
+            Fonction de désabonnement
+        """
+        types = frozenset(event_types) if event_types is not None else None
+        with self._lock:
+            token = next(self._tokens)
+            self._subscribers[token] = (callback, types)
+
+        def unsubscribe():
+            with self._lock:
+                self._subscribers.pop(token, None)
+        return unsubscribe
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> Event:
+        """Publie un événement et le transmet aux abonnés concernés"""
+        with self._lock:
+            event = Event(next(self._ids), event_type, data)
+            self._history.append(event)
+            subscribers = list(self._subscribers.values())
+
+        # Hors du verrou : un abonné peut publier à son tour
+        pending = getattr(self._local, 'pending', None)
+        if pending is not None:
+            pending.append((event, subscribers))
+            return event
+
+        self._local.pending = pending = deque([(event, subscribers)])
+        try:
+            while pending:
+                self._dispatch(*pending.popleft())
+        finally:
+            self._local.pending = None
+        return event
+
+    @staticmethod
+    def _dispatch(event: Event,
+                  subscribers: List[Tuple[Callable[[Event], None], Optional[frozenset]]]) -> None:
+        for callback, types in subscribers:
+            if types is not None and event.type not in types:
+                continue
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("Abonné en erreur pour l'événement %s", event.type)
+
+    def replay(self, last_id: int) -> List[Event]:
+        """Événements encore en mémoire publiés après last_id"""
+        with self._lock:
+            return [event for event in self._history if event.id > last_id]
+
+    @property
+    def last_id(self) -> int:
+        """ID du dernier événement publié (0 si aucun)"""
+        with self._lock:
+            return self._history[-1].id if self._history else 0
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
@@ -0,0 +1,171 @@
+# src/utils/metrics.py
+
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+# Bornes des histogrammes de durée (secondes)
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Bornes des histogrammes de nombre de requêtes SQL par requête HTTP
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+Labels = Tuple[str, ...]
+
+
+class Counter:
+    """Compteur cumulatif, une valeur par combinaison d'étiquettes"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: Labels = ()) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterable[Tuple[str, Labels, Sequence[Tuple[str, str]], float]]:
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield self.name, labels, (), value
+
+
+class Histogram:
+    """Histogramme à bornes fixes (compte cumulé par borne, somme, total)"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DURATION_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Étiquettes -> [compte par intervalle (+ dépassement), somme, nombre]
+        self._values: Dict[Labels, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, labels: Labels = ()) -> int:
+        state = self._values.get(labels)
+        return state[2] if state else 0
+
+    def samples(self) -> Iterable[Tuple[str, Labels, Sequence[Tuple[str, str]], float]]:
+        with self._lock:
+            items = [(labels, list(state[0]), state[1], state[2])
+                     for labels, state in self._values.items()]
+        for labels, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", labels, (('le', _format_number(bound)),), cumulative
+            yield f"{self.name}_bucket", labels, (('le', '+Inf'),), count
+            yield f"{self.name}_sum", labels, (), total
+            yield f"{self.name}_count", labels, (), count
+
+
+class Gauge:
+    """
+    Jauge calculée au moment de la collecte
+
+    La fonction retourne une valeur, ou un dictionnaire étiquettes -> valeur :
+    rien n'est mesuré sur le chemin des requêtes.
+    """
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, help_text: str,
+                 collect: Callable[[], Union[float, Dict[Labels, float]]],
+                 labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def samples(self) -> Iterable[Tuple[str, Labels, Sequence[Tuple[str, str]], float]]:
+        values = self.collect()
+        if not isinstance(values, dict):
+            values = {(): values}
+        for labels, value in values.items():
+            yield self.name, labels, (), value
+
+
+class MetricsRegistry:
+    """Ensemble de métriques rendu au format texte de Prometheus"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Union[Counter, Histogram, Gauge]] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DURATION_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def gauge(self, name: str, help_text: str, collect: Callable,
+              labelnames: Sequence[str] = ()) -> Gauge:
+        """Enregistre (ou remplace) une jauge calculée à la collecte"""
+        gauge = Gauge(name, help_text, collect, labelnames)
+        with self._lock:
+            self._metrics[name] = gauge
+        return gauge
+
+    def get(self, name: str) -> Optional[Union[Counter, Histogram, Gauge]]:
+        return self._metrics.get(name)
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrique déjà enregistrée: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Exposition au format texte Prometheus (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines: List[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.help)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample_name, labels, extra, value in metric.samples():
+                pairs = list(zip(metric.labelnames, labels)) + list(extra)
+                label_text = ','.join(f'{key}="{_escape_label(str(val))}"' for key, val in pairs)
+                lines.append(f"{sample_name}{{{label_text}}} {_format_number(value)}" if label_text
+                             else f"{sample_name} {_format_number(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+def _format_number(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_help(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def _escape_label(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,69 @@
+# src/utils/render_cache.py
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+# Nombre d'entrées conservées (données et fragments HTML confondus)
+MAX_ENTRIES = 64
+
+_MISSING = object()
+
+
+class RenderCache:
+    """
+    Cache LRU borné, partagé par les threads du serveur web
+
+    Sert à deux niveaux : les données d'une page sous une clé incluant la
+    version des données (recalculées seulement après une écriture), et le
+    HTML d'un fragment sous la clé de son contenu (rendu à nouveau
+    seulement si ses données ont changé). Le premier élément d'une clé
+    nomme le cache pour on_access (métriques de succès et d'échecs).
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES,
+                 on_access: Optional[Callable[[str, bool], None]] = None):
+        self.max_entries = max_entries
+        self.on_access = on_access
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, compute: Callable[[], Any]) -> Any:
+        """
+        Valeur sous key, calculée par compute() si absente
+
+        Le calcul se fait hors du verrou : deux threads peuvent calculer la
+        même entrée en même temps, le résultat est identique.
+        """
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                self._entries.move_to_end(key)
+        if self.on_access is not None:
+            self.on_access(key[0], value is not _MISSING)
+        if value is not _MISSING:
+            return value
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def freeze(value: Any) -> Hashable:
+    """Forme hachable de données de gabarit (dictionnaires, listes) pour une clé de cache"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
@@ -0,0 +1,336 @@
+# src/utils/statements.py
+
+import csv
+import io
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Extension de fichier -> format de relevé
+STATEMENT_FORMATS = {
+    '.ofx': 'ofx',
+    '.qfx': 'ofx',
+    '.qif': 'qif',
+    '.csv': 'csv',
+}
+
+
+@dataclass
+class StatementEntry:
+    """Opération lue dans un relevé bancaire (montant signé : négatif = débit)"""
+    date: date
+    amount: float
+    description: str
+    account: Optional[str] = None
+    reference: Optional[str] = None
+
+
+@dataclass
+class CsvProfile:
+    """
+    Description des colonnes d'un export CSV bancaire
+
+    Le montant est lu soit dans une colonne signée (amount_column), soit
+    dans deux colonnes débit/crédit (debit_column, credit_column).
+    """
+    date_column: str = 'date'
+    description_column: str = 'description'
+    amount_column: Optional[str] = 'amount'
+    debit_column: Optional[str] = None
+    credit_column: Optional[str] = None
+    account_column: Optional[str] = None
+    account: Optional[str] = None
+    date_format: str = '%Y-%m-%d'
+    delimiter: str = ','
+    decimal: str = '.'
+    encoding: str = 'utf-8'
+    skip_rows: int = 0
+    extra_description_columns: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        """Validation du profil"""
+        if not self.amount_column and not (self.debit_column or self.credit_column):
+            raise ValueError(
+                "Le profil doit définir une colonne de montant ou des colonnes débit/crédit"
+            )
+
+
+# Profils fournis ; d'autres peuvent être chargés depuis un fichier JSON
+CSV_PROFILES: Dict[str, CsvProfile] = {
+    'default': CsvProfile(),
+    'fr': CsvProfile(
+        date_column='Date',
+        description_column='Libellé',
+        amount_column=None,
+        debit_column='Débit',
+        credit_column='Crédit',
+        date_format='%d/%m/%Y',
+        delimiter=';',
+        decimal=',',
+        encoding='cp1252',
+    ),
+}
+
+
+def detect_statement_format(filepath: str) -> Optional[str]:
+    """Déduit le format du relevé de l'extension ('releve.ofx' -> 'ofx')"""
+    return STATEMENT_FORMATS.get(Path(filepath).suffix.lower())
+
+
+def load_csv_profiles(filepath: str) -> Dict[str, CsvProfile]:
+    """
+    Charge des profils CSV depuis un fichier JSON {nom: {champ: valeur}}
+
+    Returns:
+        Les profils fournis complétés des profils intégrés
+    """
+    with open(filepath, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    profiles = dict(CSV_PROFILES)
+    for name, options in data.items():
+        try:
+            profiles[name] = CsvProfile(**options)
+        except TypeError as e:
+            raise ValueError(f"Profil CSV '{name}' invalide: {e}") from e
+    return profiles
+
+
+def parse_statement(filepath: str, statement_format: Optional[str] = None,
+                    profile: Optional[CsvProfile] = None,
+                    qif_date_format: str = '%d/%m/%Y') -> List[StatementEntry]:
+    """
+    Lit toutes les opérations d'un relevé
+
+    Args:
+        filepath: Fichier OFX/QFX, QIF ou CSV
+        statement_format: 'ofx', 'qif' ou 'csv' ; déduit de l'extension si None
+        profile: Profil des colonnes (CSV uniquement, 'default' si None)
+        qif_date_format: Format des dates QIF (jour/mois par défaut)
+
+    Raises:
+        ValueError: Format inconnu ou fichier illisible
+    """
+    statement_format = statement_format or detect_statement_format(filepath)
+
+    if statement_format == 'ofx':
+        return parse_ofx(_read_text(filepath))
+    if statement_format == 'qif':
+        return parse_qif(_read_text(filepath), qif_date_format)
+    if statement_format == 'csv':
+        profile = profile or CSV_PROFILES['default']
+        with open(filepath, 'r', encoding=profile.encoding, newline='') as f:
+            return parse_csv(f.read(), profile)
+
+    raise ValueError(f"Format de relevé inconnu: {statement_format}")
+
+
+# ---------- OFX ----------
+
+# Balise ouvrante ou fermante, suivie de sa valeur éventuelle (OFX 1.x SGML
+# sans balises fermantes pour les éléments simples, ou OFX 2.x XML)
+_OFX_TOKEN = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+
+
+def parse_ofx(text: str) -> List[StatementEntry]:
+    """Lit les opérations (STMTTRN) d'un relevé OFX 1.x ou 2.x"""
+    entries: List[StatementEntry] = []
+    account: Optional[str] = None
+    current: Optional[Dict[str, str]] = None
+
+    for closing, tag, value in _OFX_TOKEN.findall(text):
+        tag = tag.upper()
+        value = value.strip()
+
+        if tag == 'STMTTRN':
+            if closing:
+                if current is not None:
+                    entries.append(_ofx_entry(current, account))
+                current = None
+            else:
+                current = {}
+        elif closing:
+            continue
+        elif tag == 'ACCTID':
+            account = value
+        elif current is not None and value:
+            current[tag] = value
+
+    return entries
+
+
+def _ofx_entry(fields: Dict[str, str], account: Optional[str]) -> StatementEntry:
+    try:
+        posted = datetime.strptime(fields['DTPOSTED'][:8], '%Y%m%d').date()
+        raw_amount = fields['TRNAMT']
+        # Certaines banques utilisent la virgule décimale dans TRNAMT
+        decimal = ',' if ',' in raw_amount and '.' not in raw_amount else '.'
+        amount = _parse_amount(raw_amount, decimal)
+    except KeyError as e:
+        raise ValueError(f"Opération OFX incomplète: {e.args[0]} manquant") from e
+
+    description = fields.get('NAME') or fields.get('MEMO') or fields.get('PAYEE') or ''
+    memo = fields.get('MEMO')
+    if memo and memo != description:
+        description = f"{description} {memo}" if description else memo
+
+    return StatementEntry(
+        date=posted,
+        amount=amount,
+        description=_clean_description(description),
+        account=account,
+        reference=fields.get('FITID')
+    )
+
+
+# ---------- QIF ----------
+
+def parse_qif(text: str, date_format: str = '%d/%m/%Y') -> List[StatementEntry]:
+    """Lit les opérations d'un fichier QIF (enregistrements terminés par '^')"""
+    entries: List[StatementEntry] = []
+    account: Optional[str] = None
+    in_account_block = False
+    fields: Dict[str, str] = {}
+
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        if line.startswith('!'):
+            header = line.lower()
+            in_account_block = header.startswith('!account')
+            fields = {}
+            continue
+
+        code, value = line[0], line[1:].strip()
+        if code == '^':
+            if in_account_block:
+                account = fields.get('N', account)
+            elif fields:
+                entries.append(_qif_entry(fields, account, date_format))
+            fields = {}
+        elif code == 'M' and 'M' in fields:
+            fields['M'] += f" {value}"
+        else:
+            fields.setdefault(code, value)
+
+    return entries
+
+
+def _qif_entry(fields: Dict[str, str], account: Optional[str], date_format: str) -> StatementEntry:
+    try:
+        posted = _parse_qif_date(fields['D'], date_format)
+        amount = _parse_amount(fields.get('T') or fields['U'])
+    except KeyError as e:
+        raise ValueError(f"Opération QIF incomplète: {e.args[0]} manquant") from e
+
+    description = fields.get('P') or fields.get('M') or ''
+    memo = fields.get('M')
+    if memo and memo != description:
+        description = f"{description} {memo}"
+
+    return StatementEntry(
+        date=posted,
+        amount=amount,
+        description=_clean_description(description),
+        account=account,
+        reference=fields.get('N')
+    )
+
+
+def _parse_qif_date(value: str, date_format: str) -> date:
+    """Date QIF : accepte l'apostrophe (1/5'24) et les années sur deux chiffres"""
+    # Séparateurs normalisés de la même façon dans la valeur et dans le format
+    value = _normalize_qif_date(value)
+    date_format = _normalize_qif_date(date_format)
+    try:
+        return datetime.strptime(value, date_format).date()
+    except ValueError:
+        return datetime.strptime(value, date_format.replace('%Y', '%y')).date()
+
+
+def _normalize_qif_date(text: str) -> str:
+    return text.replace("'", '/').replace('-', '/').replace(' ', '')
+
+
+# ---------- CSV ----------
+
+def parse_csv(text: str, profile: CsvProfile) -> List[StatementEntry]:
+    """Lit les opérations d'un export CSV bancaire selon un profil de colonnes"""
+    lines = text.splitlines()[profile.skip_rows:]
+    reader = csv.DictReader(io.StringIO('\n'.join(lines)), delimiter=profile.delimiter)
+    entries: List[StatementEntry] = []
+
+    for line_number, row in enumerate(reader, start=profile.skip_rows + 2):
+        if not any((value or '').strip() for value in row.values()):
+            continue
+        try:
+            entries.append(_csv_entry(row, profile))
+        except (KeyError, ValueError) as e:
+            raise ValueError(f"Ligne {line_number}: {e}") from e
+
+    return entries
+
+
+def _csv_entry(row: Dict[str, str], profile: CsvProfile) -> StatementEntry:
+    def column(name: str) -> str:
+        if name not in row:
+            raise ValueError(f"Colonne '{name}' absente")
+        return (row[name] or '').strip()
+
+    posted = datetime.strptime(column(profile.date_column), profile.date_format).date()
+
+    if profile.amount_column:
+        amount = _parse_amount(column(profile.amount_column), profile.decimal)
+    else:
+        debit = column(profile.debit_column) if profile.debit_column else ''
+        credit = column(profile.credit_column) if profile.credit_column else ''
+        amount = 0.0
+        if credit:
+            amount += abs(_parse_amount(credit, profile.decimal))
+        if debit:
+            amount -= abs(_parse_amount(debit, profile.decimal))
+
+    parts = [column(profile.description_column)]
+    parts += [column(name) for name in profile.extra_description_columns]
+    account = column(profile.account_column) if profile.account_column else profile.account
+
+    return StatementEntry(
+        date=posted,
+        amount=amount,
+        description=_clean_description(' '.join(part for part in parts if part)),
+        account=account or None
+    )
+
+
+# ---------- Utilitaires ----------
+
+def _read_text(filepath: str) -> str:
+    """Lit un relevé en UTF-8, ou en Windows-1252 (banques françaises) à défaut"""
+    data = Path(filepath).read_bytes()
+    try:
+        return data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return data.decode('cp1252')
+
+
+def _parse_amount(value: str, decimal: str = '.') -> float:
+    """Convertit un montant texte ('-1 234,56', '1,234.56', '+12') en float"""
+    cleaned = value.replace(' ', '').replace('\u00a0', '').replace('\u202f', '').replace('€', '')
+    if decimal == ',':
+        cleaned = cleaned.replace('.', '').replace(',', '.')
+    else:
+        cleaned = cleaned.replace(',', '')
+    try:
+        return float(cleaned)
+    except ValueError:
+        raise ValueError(f"Montant invalide: {value}")
+
+
+def _clean_description(value: str) -> str:
+    """Réduit les espaces multiples d'un libellé bancaire"""
+    return ' '.join(value.split())
@@ -0,0 +1,100 @@
+# src/utils/streams.py
+
+import bz2
+import gzip
+import io
+import lzma
+import zlib
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, TextIO
+
+# Compression -> extension de fichier
+COMPRESSIONS = {
+    'gzip': '.gz',
+    'bz2': '.bz2',
+    'xz': '.xz',
+}
+
+
+def detect_compression(filepath: str) -> Optional[str]:
+    """Déduit la compression de l'extension ('export.csv.gz' -> 'gzip')"""
+    suffix = Path(filepath).suffix.lower()
+    for name, extension in COMPRESSIONS.items():
+        if suffix == extension:
+            return name
+    return None
+
+
+def open_text_output(
+    filepath: str,
+    compress: Optional[str] = None,
+    level: Optional[int] = None,
+    buffer_size: Optional[int] = None,
+    newline: Optional[str] = None
+) -> TextIO:
+    """
+    Ouvre un fichier texte UTF-8 en écriture, compressé à la volée si besoin
+
+    Args:
+        filepath: Chemin du fichier de sortie
+        compress: 'gzip', 'bz2' ou 'xz' ; déduit de l'extension si None
+        level: Niveau de compression (gzip/bz2 : 1-9, xz : 0-9)
+        buffer_size: Taille du tampon d'écriture (fichiers non compressés)
+        newline: Paramètre newline de open() ('' pour le CSV)
+
+    Returns:
+        Flux texte à fermer par l'appelant (utilisable avec `with`)
+    """
+    compress = compress or detect_compression(filepath)
+
+    if compress is None:
+        return open(filepath, 'w', encoding='utf-8', newline=newline, buffering=buffer_size or -1)
+
+    if compress not in COMPRESSIONS:
+        raise ValueError(f"Compression inconnue: {compress}")
+
+    # Le compresseur écrit directement dans le fichier, sans fichier temporaire
+    if compress == 'gzip':
+        binary = gzip.open(filepath, 'wb', compresslevel=9 if level is None else level)
+    elif compress == 'bz2':
+        binary = bz2.open(filepath, 'wb', compresslevel=9 if level is None else level)
+    else:
+        binary = lzma.open(filepath, 'wb', preset=level)
+
+    return io.TextIOWrapper(binary, encoding='utf-8', newline=newline)
+
+
+def open_text_input(filepath: str, newline: Optional[str] = None) -> TextIO:
+    """
+    Ouvre un fichier texte UTF-8 en lecture, décompressé à la volée si besoin
+
+    La compression est déduite de l'extension ('.gz', '.bz2', '.xz').
+    """
+    compress = detect_compression(filepath)
+
+    if compress is None:
+        return open(filepath, 'r', encoding='utf-8', newline=newline)
+
+    if compress == 'gzip':
+        binary = gzip.open(filepath, 'rb')
+    elif compress == 'bz2':
+        binary = bz2.open(filepath, 'rb')
+    else:
+        binary = lzma.open(filepath, 'rb')
+
+    return io.TextIOWrapper(binary, encoding='utf-8', newline=newline)
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """
+    Compresse au format gzip un flux de morceaux d'octets, au fil de l'eau
+
+    Seul l'état du compresseur est conservé en mémoire : adapté aux
+    réponses HTTP en flux (Content-Encoding: gzip).
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,189 @@
+# src/utils/tdigest.py
+
+import math
+import struct
+from array import array
+from typing import Iterable, List, Optional, Tuple
+
+
+class TDigest:
+    """
+    Sketch de quantiles fusionnable (t-digest « merging »)
+
+    Les valeurs sont résumées par des centroïdes (moyenne, poids) dont la
+    taille est bornée par la compression. L'erreur sur le rang est de
+    l'ordre de 1/compression au centre de la distribution et bien plus
+    faible dans les queues (p1, p99), ce qui convient aux percentiles
+    de montants.
+    """
+
+    _MAGIC = b'TD1'
+    _HEADER = struct.Struct('<3sHdddI')
+
+    def __init__(self, compression: int = 100):
+        if compression < 10:
+            raise ValueError("La compression doit être au moins égale à 10")
+        self.compression = compression
+        self._means: List[float] = []
+        self._weights: List[float] = []
+        self._buffer: List[Tuple[float, float]] = []
+        self._buffer_limit = compression * 5
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __len__(self) -> int:
+        return int(self.count)
+
+    def add(self, value: float, weight: float = 1.0) -> None:
+        """Ajoute une valeur (avec un poids optionnel) au sketch"""
+        if weight <= 0:
+            raise ValueError("Le poids doit être positif")
+        self._buffer.append((value, weight))
+        self.count += weight
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if len(self._buffer) >= self._buffer_limit:
+            self._compress()
+
+    def update(self, values: Iterable[float]) -> None:
+        """Ajoute plusieurs valeurs (poids 1) au sketch"""
+        values = list(values)
+        if not values:
+            return
+        self._buffer.extend((value, 1.0) for value in values)
+        self.count += len(values)
+        self.min = min(self.min, min(values))
+        self.max = max(self.max, max(values))
+        if len(self._buffer) >= self._buffer_limit:
+            self._compress()
+
+    def merge(self, other: 'TDigest') -> 'TDigest':
+        """Fusionne un autre sketch dans celui-ci et le retourne"""
+        if other.count == 0:
+            return self
+        other._compress()
+        self._buffer.extend(zip(other._means, other._weights))
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estime le quantile q (entre 0 et 1)
+
+        Returns:
+            La valeur estimée, ou None si le sketch est vide
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("Le quantile doit être compris entre 0 et 1")
+        self._compress()
+        if self.count == 0:
+            return None
+        if len(self._means) == 1 or q == 0:
+            return self.min if q == 0 else self._means[0]
+        if q == 1:
+            return self.max
+
+        target = q * self.count
+        means, weights = self._means, self._weights
+
+        # Avant le centre du premier centroïde : interpolation depuis le min
+        if target < weights[0] / 2:
+            return self.min + (means[0] - self.min) * target / (weights[0] / 2)
+
+        cumulative = weights[0] / 2
+        for i in range(len(means) - 1):
+            step = (weights[i] + weights[i + 1]) / 2
+            if cumulative + step > target:
+                ratio = (target - cumulative) / step
+                return means[i] + (means[i + 1] - means[i]) * ratio
+            cumulative += step
+
+        # Après le centre du dernier centroïde : interpolation vers le max
+        last_half = weights[-1] / 2
+        ratio = (target - cumulative) / last_half if last_half else 1.0
+        return means[-1] + (self.max - means[-1]) * min(ratio, 1.0)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Estime le percentile p (entre 0 et 100)"""
+        return self.quantile(p / 100)
+
+    def centroid_count(self) -> int:
+        """Nombre de centroïdes après compression"""
+        self._compress()
+        return len(self._means)
+
+    def to_bytes(self) -> bytes:
+        """Sérialise le sketch dans un format binaire compact"""
+        self._compress()
+        header = self._HEADER.pack(
+            self._MAGIC, self.compression, self.count,
+            self.min if self.count else 0.0,
+            self.max if self.count else 0.0,
+            len(self._means)
+        )
+        payload = array('d', self._means)
+        payload.extend(self._weights)
+        return header + payload.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'TDigest':
+        """Reconstruit un sketch sérialisé par to_bytes()"""
+        magic, compression, count, min_, max_, size = cls._HEADER.unpack_from(data)
+        if magic != cls._MAGIC:
+            raise ValueError("Format de sketch invalide")
+        payload = array('d')
+        payload.frombytes(data[cls._HEADER.size:cls._HEADER.size + size * 16])
+
+        digest = cls(compression)
+        digest._means = payload[:size].tolist()
+        digest._weights = payload[size:].tolist()
+        digest.count = count
+        if count:
+            digest.min = min_
+            digest.max = max_
+        return digest
+
+    def _k(self, q: float) -> float:
+        """Fonction d'échelle k1 : centroïdes plus fins aux extrémités"""
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _k_inverse(self, k: float) -> float:
+        return (math.sin(k * 2 * math.pi / self.compression) + 1) / 2
+
+    def _compress(self) -> None:
+        """Fusionne le tampon dans les centroïdes"""
+        if not self._buffer:
+            return
+
+        points = sorted(list(zip(self._means, self._weights)) + self._buffer)
+        self._buffer = []
+
+        total = self.count
+        means: List[float] = []
+        weights: List[float] = []
+        mean, weight = points[0]
+        cumulative = 0.0
+        limit = total * self._k_inverse(self._k(0) + 1)
+
+        for value, w in points[1:]:
+            if cumulative + weight + w <= limit:
+                # Moyenne pondérée incrémentale
+                weight += w
+                mean += (value - mean) * w / weight
+            else:
+                means.append(mean)
+                weights.append(weight)
+                cumulative += weight
+                limit = total * self._k_inverse(self._k(cumulative / total) + 1)
+                mean, weight = value, w
+
+        means.append(mean)
+        weights.append(weight)
+        self._means = means
+        self._weights = weights
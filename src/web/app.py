@@ -1,25 +1,158 @@
 """Application Flask pour MyBudget."""
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+import contextvars
+import functools
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from markupsafe import Markup
+from flask import (
+    Flask, Response, g, make_response, render_template, request, redirect, send_file, session,
+    url_for, flash, jsonify, request_finished, request_started
+)
 from datetime import datetime, date
 from decimal import Decimal
+from pathlib import Path
 
-from src.database.db_manager import DatabaseManager
+from src.database.db_manager import DatabaseManager, ThreadLocalDatabaseManager
 from src.services.transaction_service import TransactionService
 from src.services.budget_service import BudgetService
 from src.services.statistics_service import StatisticsService
 from src.services.export_service import ExportService
+from src.services.import_service import ImportService
+from src.services.idempotency_service import IdempotencyService
+from src.services.job_service import JobService
 from src.models.transaction import Transaction
 from src.models.budget import Budget
+from src.utils.events import EventBus
+from src.utils.metrics import COUNT_BUCKETS, MetricsRegistry
+from src.utils.render_cache import RenderCache, freeze
+from src.utils.streams import gzip_chunks
 
 app = Flask(__name__)
 app.secret_key = 'mybudget-secret-key-2026'
 
-# Services
-db_manager = DatabaseManager()
-transaction_service = TransactionService(db_manager)
-budget_service = BudgetService(db_manager, transaction_service)
+# Registre des métriques exposées sur /metrics ; None tant qu'elles sont
+# désactivées (activation : MYBUDGET_METRICS=1 ou enable_metrics())
+metrics = None
+
+# Requêtes SQL de la requête HTTP en cours : [nombre, durée]
+_request_sql = contextvars.ContextVar('request_sql', default=None)
+
+
+def enable_metrics():
+    """
+    Active la collecte des métriques et retourne le registre
+    
+    Les connexions ouvertes ensuite sont instrumentées (durée et nombre de
+    requêtes SQL) ; désactivées, ni les requêtes HTTP ni les requêtes SQL
+    ne passent par le moindre code de mesure.
+    """
+    global metrics
+    if metrics is not None:
+        return metrics
+    
+    registry = MetricsRegistry()
+    registry.histogram('mybudget_http_request_duration_seconds',
+                       "Durée des requêtes HTTP jusqu'aux en-têtes de réponse", ('method', 'route'))
+    registry.counter('mybudget_http_requests_total', "Requêtes HTTP servies",
+                     ('method', 'route', 'status'))
+    registry.histogram('mybudget_http_request_sql_queries', "Requêtes SQL par requête HTTP",
+                       ('route',), COUNT_BUCKETS)
+    registry.histogram('mybudget_http_request_sql_duration_seconds',
+                       "Temps passé en SQL par requête HTTP", ('route',))
+    registry.counter('mybudget_sql_queries_total', "Requêtes SQL exécutées (web et tâches de fond)")
+    registry.counter('mybudget_sql_duration_seconds_total', "Temps total passé en SQL")
+    registry.counter('mybudget_cache_requests_total', "Accès aux caches", ('cache', 'result'))
+    registry.gauge('mybudget_sse_subscribers', "Abonnés du bus d'événements (clients SSE compris)",
+                   lambda: events.subscriber_count)
+    registry.gauge('mybudget_job_workers', "Threads workers des tâches de fond",
+                   lambda: job_service.worker_count)
+    registry.gauge('mybudget_jobs', "Tâches de fond par statut", lambda: {
+        (status,): count for status, count in job_service.count_by_status().items()
+    }, ('status',))
+    
+    metrics = registry
+    DatabaseManager.query_observer = observe_query
+    request_started.connect(start_request_metrics, app)
+    request_finished.connect(record_request_metrics, app)
+    return registry
+
+
+def disable_metrics():
+    """Désactive la collecte (les connexions instrumentées cessent de mesurer)"""
+    global metrics
+    request_started.disconnect(start_request_metrics, app)
+    request_finished.disconnect(record_request_metrics, app)
+    DatabaseManager.query_observer = None
+    metrics = None
+
+
+def observe_query(seconds, queries):
+    """Observateur des requêtes SQL : totaux du processus et de la requête HTTP en cours"""
+    registry = metrics
+    if registry is None:
+        return
+    if queries:
+        registry.get('mybudget_sql_queries_total').inc(amount=queries)
+    registry.get('mybudget_sql_duration_seconds_total').inc(amount=seconds)
+    current = _request_sql.get()
+    if current is not None:
+        current[0] += queries
+        current[1] += seconds
+
+
+def start_request_metrics(sender, **extra):
+    g.metrics_start = time.perf_counter()
+    _request_sql.set([0, 0.0])
+
+
+def record_request_metrics(sender, response, **extra):
+    """Latence, statut et SQL de la requête, par route (règle d'URL, pas le chemin)"""
+    registry = metrics
+    start = g.pop('metrics_start', None)
+    sql = _request_sql.get()
+    _request_sql.set(None)
+    if registry is None or start is None:
+        return
+    
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    registry.get('mybudget_http_request_duration_seconds').observe(
+        time.perf_counter() - start, (request.method, route)
+    )
+    registry.get('mybudget_http_requests_total').inc(
+        (request.method, route, str(response.status_code))
+    )
+    if sql is not None:
+        registry.get('mybudget_http_request_sql_queries').observe(sql[0], (route,))
+        registry.get('mybudget_http_request_sql_duration_seconds').observe(sql[1], (route,))
+
+
+def count_cache(name, hit):
+    """Compte un accès au cache name (sans effet si les métriques sont désactivées)"""
+    if metrics is not None:
+        metrics.get('mybudget_cache_requests_total').inc((name, 'hit' if hit else 'miss'))
+
+
+if os.environ.get('MYBUDGET_METRICS') == '1':
+    enable_metrics()
+
+# Services (une connexion SQLite par thread du serveur)
+db_manager = ThreadLocalDatabaseManager()
+events = EventBus()
+transaction_service = TransactionService(db_manager, events)
+budget_service = BudgetService(db_manager, transaction_service, events)
 stats_service = StatisticsService(db_manager, transaction_service)
-export_service = ExportService(transaction_service, db_manager)
+export_service = ExportService(db_manager, transaction_service)
+import_service = ImportService(db_manager, transaction_service)
+# Exports et rapports longs exécutés en arrière-plan (workers démarrés à la première tâche)
+job_service = JobService(db_manager)
+# Clés d'idempotence de /transactions/add et /budgets/add
+idempotency_service = IdempotencyService(db_manager)
+# Données des pages par version des données, fragments HTML par contenu
+render_cache = RenderCache(on_access=count_cache)
 
 
 def get_categories():
@@ -29,110 +162,280 @@ def get_categories():
     return {row['name']: row['id'] for row in results}
 
 
-def get_category_name(category_id):
-    """Récupère le nom d'une catégorie par son ID."""
-    query = "SELECT name FROM categories WHERE id = ?"
-    results = db_manager.execute_query(query, (category_id,))
-    return results[0]['name'] if results else "inconnu"
+def get_transaction_filters():
+    """
+    Traduit les filtres de /transactions (category, type, start, end) pour les services
+    
+    Raises:
+        ValueError: Catégorie, type ou date invalide
+    """
+    category_filter = request.args.get('category', 'all')
+    type_filter = request.args.get('type', 'all')
+    start = request.args.get('start')
+    end = request.args.get('end')
+    
+    category_id = None
+    if category_filter != 'all':
+        categories = get_categories()
+        category_id = categories.get(category_filter)
+        # L'API accepte aussi l'ID de la catégorie
+        if (category_id is None and category_filter.isdigit()
+                and int(category_filter) in categories.values()):
+            category_id = int(category_filter)
+        if category_id is None:
+            raise ValueError(f"Catégorie inconnue: {category_filter}")
+    
+    if type_filter not in ('all', 'revenu', 'dépense'):
+        raise ValueError(f"Type inconnu: {type_filter}")
+    
+    return {
+        'category_id': category_id,
+        'start_date': datetime.strptime(start, '%Y-%m-%d').date() if start else None,
+        'end_date': datetime.strptime(end, '%Y-%m-%d').date() if end else None,
+        'transaction_type': None if type_filter == 'all' else type_filter
+    }
+
+
+def stream_export(chunks, filename, mimetype):
+    """
+    Réponse HTTP en flux (chunked) à partir de morceaux de texte
+    
+    Les morceaux sont produits au fil de la lecture du curseur : la mémoire
+    reste constante quelle que soit la taille de l'export. Le corps est
+    compressé en gzip si le client l'accepte.
+    """
+    body = (chunk.encode('utf-8') for chunk in chunks)
+    headers = {
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'Vary': 'Accept-Encoding'
+    }
+    
+    if request.accept_encodings.quality('gzip') > 0:
+        body = gzip_chunks(body)
+        headers['Content-Encoding'] = 'gzip'
+    
+    return Response(body, mimetype=mimetype, headers=headers)
 
 
-@app.route('/')
-def index():
-    """Page d'accueil - Tableau de bord."""
-    # Calculer les totaux
-    all_transactions = transaction_service.list_transactions()
-    
-    total_revenue = sum(t.amount for t in all_transactions if t.type == "revenu")
-    total_expense = sum(t.amount for t in all_transactions if t.type == "dépense")
-    balance = total_revenue - total_expense
-    
-    # Récupérer les budgets
-    budgets = budget_service.list_budgets()
-    categories_map = get_categories()
-    categories_reverse = {v: k for k, v in categories_map.items()}
-    
-    budgets_data = []
-    for budget in budgets:
-        category_name = categories_reverse.get(budget.category_id, "inconnu")
-        status = budget_service.get_budget_status(
-            budget.category_id,
-            budget.period_start,
-            budget.period_end
-        )
-        
-        if status:
-            percentage = status['percentage']
-            if percentage >= 100:
-                status_class = "danger"
-                status_text = "Dépassé"
-            elif percentage >= 90:
-                status_class = "warning"
-                status_text = "Attention"
-            else:
-                status_class = "success"
-                status_text = "OK"
+# Champ de formulaire équivalent à l'en-tête Idempotency-Key (un formulaire
+# HTML ne peut pas envoyer d'en-tête)
+IDEMPOTENCY_FIELD = 'idempotency_key'
+
+
+@app.template_global()
+def new_idempotency_key():
+    """Clé d'idempotence d'un formulaire, nouvelle à chaque affichage"""
+    return uuid.uuid4().hex
+
+
+def idempotent(page):
+    """
+    Écriture rejouable : une requête répétée avec la même clé reçoit le résultat enregistré
+    
+    La clé vient de l'en-tête Idempotency-Key ou du champ caché des
+    formulaires ; sans clé, la route s'exécute normalement. La réponse
+    rejouée est la même redirection, avec les mêmes messages. Une écriture
+    refusée (message d'erreur) ou en échec n'est pas enregistrée : sa clé
+    est libérée. Les refus de clé d'un formulaire (sans en-tête) sont
+    signalés par un message sur la page du formulaire (endpoint page).
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            from_header = 'Idempotency-Key' in request.headers
+            key = request.headers.get('Idempotency-Key') or request.form.get(IDEMPOTENCY_FIELD)
+            if key is None:
+                return view(*args, **kwargs)
+            
+            def refuse(message, status, category='error'):
+                if from_header:
+                    return api_error(message, status)
+                flash(message, category)
+                return redirect(url_for(page))
+            
+            payload = sorted((name, value) for name, value in request.form.items(multi=True)
+                             if name != IDEMPOTENCY_FIELD)
+            try:
+                stored = idempotency_service.reserve(request.endpoint, key, payload)
+            except ValueError as e:
+                return refuse(str(e), 400)
             
-            budgets_data.append({
-                'category': category_name.capitalize(),
-                'amount': budget.amount,
+            if stored is not None:
+                if not stored['matches']:
+                    return refuse("Clé d'idempotence déjà utilisée pour une autre requête", 422)
+                if stored['status'] is None:
+                    return refuse("Requête déjà en cours de traitement", 409, 'warning')
+                for category, message in stored['response']['flashes']:
+                    flash(message, category)
+                response = redirect(stored['response']['location'], code=stored['status'])
+                response.headers['Idempotent-Replayed'] = 'true'
+                return response
+            
+            flashed = len(session.get('_flashes', []))
+            try:
+                response = view(*args, **kwargs)
+            except Exception:
+                idempotency_service.release(request.endpoint, key)
+                raise
+            flashes = [list(item) for item in session.get('_flashes', [])[flashed:]]
+            if any(category == 'error' for category, _ in flashes):
+                idempotency_service.release(request.endpoint, key)
+            else:
+                idempotency_service.complete(request.endpoint, key, response.status_code, {
+                    'location': response.location,
+                    'flashes': flashes
+                })
+            return response
+        return wrapper
+    return decorator
+
+
+# Seuils de statut d'un budget (% consommé) : classe CSS et libellé,
+# du plus haut au plus bas (repris par le script du tableau de bord)
+BUDGET_STATUS_LEVELS = (
+    (100, 'danger', "Dépassé"),
+    (90, 'warning', "Attention"),
+    (0, 'success', "OK"),
+)
+
+
+def budget_status_class(percentage):
+    """Classe CSS et libellé du statut d'un budget"""
+    for threshold, status_class, status_text in BUDGET_STATUS_LEVELS:
+        if percentage >= threshold:
+            return status_class, status_text
+    return BUDGET_STATUS_LEVELS[-1][1:]
+
+
+def get_budget_rows(version):
+    """
+    Lignes des tableaux de budgets (/ et /budgets) pour une version des données
+    
+    Calculées en une requête groupée à la première page servie après une
+    écriture, puis partagées par les deux pages jusqu'à la suivante.
+    """
+    def load():
+        rows = []
+        for status in budget_service.get_budget_statuses():
+            status_class, status_text = budget_status_class(status['percentage'])
+            rows.append({
+                'budget_id': status['budget_id'],
+                'category': status['category'].capitalize(),
+                'amount': status['budget_amount'],
+                'period_start': status['period_start'],
+                'period_end': status['period_end'],
                 'spent': status['spent'],
                 'remaining': status['remaining'],
-                'percentage': percentage,
+                'percentage': status['percentage'],
                 'status_class': status_class,
                 'status_text': status_text
             })
+        return rows
+    return render_cache.get(('budget_rows', version), load)
+
+
+def get_dashboard_totals(version):
+    """Totaux du tableau de bord (agrégats) pour une version des données"""
+    def load():
+        totals = stats_service.get_totals()
+        return {
+            'total_revenue': totals['total_revenus'],
+            'total_expense': totals['total_depenses'],
+            'balance': totals['balance']
+        }
+    return render_cache.get(('dashboard_totals', version), load)
+
+
+def render_fragment(template, **context):
+    """
+    HTML d'un fragment de page, rendu à nouveau seulement si ses données ont changé
     
-    return render_template('dashboard.html',
-                         total_revenue=total_revenue,
-                         total_expense=total_expense,
-                         balance=balance,
-                         budgets=budgets_data)
+    La clé est le contenu : une écriture qui ne change aucun budget (revenu,
+    catégorie sans budget) réutilise le tableau déjà rendu.
+    """
+    return render_cache.get(
+        ('fragment', template, freeze(context)),
+        lambda: Markup(render_template(template, **context))
+    )
+
+
+@app.after_request
+def release_db_connection(response):
+    """Ferme la connexion SQLite du thread de la requête, une fois la réponse envoyée"""
+    # Après le corps : un export en flux lit encore son curseur
+    if isinstance(db_manager, ThreadLocalDatabaseManager):
+        response.call_on_close(db_manager.release)
+    return response
+
+
+@app.route('/')
+def index():
+    """Page d'accueil - Tableau de bord (requêtes d'agrégats, GET conditionnel)."""
+    # ETag = version des données : inchangée, la page l'est aussi (304 sans calcul)
+    etag = db_manager.data_version()
+    has_flashes = bool(session.get('_flashes'))
+    cached = not has_flashes and request.if_none_match.contains(etag)
+    count_cache('dashboard_etag', cached)
+    if cached:
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    
+    summary_cards = render_fragment('fragments/summary_cards.html', **get_dashboard_totals(etag))
+    budget_table = render_fragment('fragments/dashboard_budgets.html',
+                                   budgets=get_budget_rows(etag))
+    
+    response = make_response(render_template('dashboard.html',
+                                             summary_cards=summary_cards,
+                                             budget_table=budget_table,
+                                             status_levels=BUDGET_STATUS_LEVELS))
+    if not has_flashes:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 
 @app.route('/transactions')
 def transactions():
-    """Page des transactions."""
-    # Récupérer les catégories
+    """Page des transactions (filtres, tri et pagination en SQL)."""
     categories = get_categories()
     
-    # Filtres
-    category_filter = request.args.get('category', 'all')
-    type_filter = request.args.get('type', 'all')
-    
-    # Récupérer les transactions
-    all_transactions = transaction_service.list_transactions()
+    try:
+        filters = get_transaction_filters()
+        page = transaction_service.list_transactions_page(
+            **filters,
+            page_size=request.args.get('page_size', 50, type=int),
+            cursor=request.args.get('cursor') or None,
+            order=request.args.get('order', 'desc')
+        )
+    except ValueError as e:
+        flash(f'Erreur: {str(e)}', 'error')
+        return redirect(url_for('transactions'))
     
-    # Appliquer les filtres
-    filtered_transactions = []
-    for t in all_transactions:
-        if category_filter != 'all':
-            if t.category_id != categories.get(category_filter):
-                continue
-        
-        if type_filter != 'all':
-            if t.type != type_filter:
-                continue
-        
-        filtered_transactions.append({
-            'id': t.id,
-            'date': t.date,
-            'type': t.type,
-            'category': get_category_name(t.category_id),
-            'description': t.description,
-            'amount': t.amount
-        })
-    
-    # Trier par date décroissante
-    filtered_transactions.sort(key=lambda x: x['date'], reverse=True)
+    # Paramètres conservés dans les liens (pagination, exports)
+    query_args = {
+        key: request.args[key]
+        for key in ('category', 'type', 'start', 'end', 'order', 'page_size')
+        if request.args.get(key)
+    }
     
     return render_template('transactions.html',
-                         transactions=filtered_transactions,
-                         categories=sorted(categories.keys()),
-                         category_filter=category_filter,
-                         type_filter=type_filter)
+                           transactions=page['items'],
+                           total=page['total'],
+                           next_cursor=page['next_cursor'],
+                           is_first_page=not request.args.get('cursor'),
+                           query_args=query_args,
+                           categories=sorted(categories.keys()),
+                           category_filter=request.args.get('category', 'all'),
+                           type_filter=request.args.get('type', 'all'),
+                           start_filter=request.args.get('start', ''),
+                           end_filter=request.args.get('end', ''),
+                           order=request.args.get('order', 'desc'))
 
 
 @app.route('/transactions/add', methods=['POST'])
+@idempotent('transactions')
 def add_transaction():
     """Ajoute une nouvelle transaction."""
     try:
@@ -157,8 +460,12 @@ def add_transaction():
             date=transaction_date
         )
         
+        existing_id = transaction_service.find_duplicate(transaction)
         transaction_service.add_transaction(transaction)
         flash('Transaction ajoutée avec succès!', 'success')
+        if existing_id:
+            flash(f'Une transaction identique était déjà enregistrée (ID: {existing_id})',
+                  'warning')
         
     except Exception as e:
         flash(f'Erreur: {str(e)}', 'error')
@@ -182,38 +489,17 @@ def delete_transaction(transaction_id):
 def budgets():
     """Page des budgets."""
     categories = get_categories()
-    categories_reverse = {v: k for k, v in categories.items()}
-    
-    # Récupérer les budgets
-    all_budgets = budget_service.list_budgets()
-    
-    budgets_data = []
-    for budget in all_budgets:
-        category_name = categories_reverse.get(budget.category_id, "inconnu")
-        status = budget_service.get_budget_status(
-            budget.category_id,
-            budget.period_start,
-            budget.period_end
-        )
-        
-        if status:
-            budgets_data.append({
-                'id': budget.id,
-                'category': category_name.capitalize(),
-                'amount': budget.amount,
-                'period_start': budget.period_start,
-                'period_end': budget.period_end,
-                'spent': status['spent'],
-                'remaining': status['remaining'],
-                'percentage': status['percentage']
-            })
+    # Mêmes statuts que le tableau de bord, calculés une fois par version des données
+    budget_table = render_fragment('fragments/budget_list.html',
+                                   budgets=get_budget_rows(db_manager.data_version()))
     
     return render_template('budgets.html',
-                         budgets=budgets_data,
-                         categories=sorted(categories.keys()))
+                           budget_table=budget_table,
+                           categories=sorted(categories.keys()))
 
 
 @app.route('/budgets/add', methods=['POST'])
+@idempotent('budgets')
 def add_budget():
     """Crée un nouveau budget."""
     try:
@@ -286,30 +572,408 @@ def statistics():
                              prediction=0)
 
 
+@app.route('/statistics/heatmap')
+def statistics_heatmap():
+    """Matrice de heatmap (JSON) pour les graphiques."""
+    kind = request.args.get('kind', 'weekday')
+    transaction_type = request.args.get('type', 'dépense')
+    
+    try:
+        if kind == 'category':
+            start_date = datetime.strptime(request.args.get('start', ''), '%Y-%m-%d').date()
+            end_date = datetime.strptime(request.args.get('end', ''), '%Y-%m-%d').date()
+            if (end_date - start_date).days > 366:
+                return jsonify({'error': 'Période limitée à un an'}), 400
+            data = stats_service.get_category_day_heatmap(start_date, end_date, transaction_type)
+        else:
+            year = request.args.get('year', date.today().year, type=int)
+            category_id = get_categories().get(request.args.get('category'))
+            data = stats_service.get_weekday_week_heatmap(year, category_id, transaction_type)
+    except ValueError as e:
+        return jsonify({'error': f'Paramètres invalides: {e}'}), 400
+    
+    return jsonify(data)
+
+
 @app.route('/export/csv')
 def export_csv():
-    """Exporte les transactions en CSV."""
+    """Télécharge les transactions filtrées en CSV (réponse en flux)."""
     try:
-        filename = f"transactions_{date.today().isoformat()}.csv"
-        export_service.export_transactions_to_csv(filename)
-        flash(f'Transactions exportées vers {filename}', 'success')
-    except Exception as e:
-        flash(f'Erreur lors de l\'export: {str(e)}', 'error')
+        filters = get_transaction_filters()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    return redirect(url_for('transactions'))
+    filename = f"transactions_{date.today().isoformat()}.csv"
+    return stream_export(export_service.iter_transactions_csv(**filters), filename, 'text/csv')
 
 
 @app.route('/export/json')
 def export_json():
-    """Exporte les transactions en JSON."""
+    """Télécharge les transactions filtrées en JSON (réponse en flux)."""
     try:
-        filename = f"transactions_{date.today().isoformat()}.json"
-        export_service.export_transactions_to_json(filename)
-        flash(f'Transactions exportées vers {filename}', 'success')
-    except Exception as e:
-        flash(f'Erreur lors de l\'export: {str(e)}', 'error')
+        filters = get_transaction_filters()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    return redirect(url_for('transactions'))
+    filename = f"transactions_{date.today().isoformat()}.json"
+    return stream_export(export_service.iter_transactions_json(**filters), filename,
+                         'application/json')
+
+
+# ---------- API JSON v1 ----------
+
+API_DEFAULT_LIMIT = 100
+
+# Nombre maximal de transactions par requête d'ajout en masse
+API_BULK_LIMIT = 10000
+
+
+def api_response(payload, status=200):
+    """Réponse JSON compacte (séparateurs sans espaces, UTF-8 non échappé)."""
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+    return Response(body, status=status, mimetype='application/json')
+
+
+def api_error(message, status=400):
+    """Réponse d'erreur de l'API."""
+    return api_response({'error': message}, status)
+
+
+def get_api_fields():
+    """Champs demandés par le paramètre fields=a,b,c (None si absent)."""
+    fields = request.args.get('fields')
+    return [field.strip() for field in fields.split(',') if field.strip()] if fields else None
+
+
+def project(items, fields):
+    """Restreint des dictionnaires aux champs demandés."""
+    if not fields:
+        return items
+    if items:
+        unknown = [field for field in fields if field not in items[0]]
+        if unknown:
+            raise ValueError(f"Champ inconnu: {unknown[0]}")
+    return [{field: item[field] for field in fields} for item in items]
+
+
+@app.route('/api/v1/transactions')
+def api_transactions():
+    """Transactions filtrées, pagination par curseur (limit, cursor) et fields=."""
+    try:
+        page = transaction_service.list_transactions_page(
+            **get_transaction_filters(),
+            page_size=request.args.get('limit', API_DEFAULT_LIMIT, type=int),
+            cursor=request.args.get('cursor') or None,
+            order=request.args.get('order', 'desc'),
+            fields=get_api_fields()
+        )
+    except ValueError as e:
+        return api_error(str(e))
+    
+    next_url = None
+    if page['next_cursor']:
+        next_url = url_for('api_transactions',
+                           **{**request.args.to_dict(), 'cursor': page['next_cursor']})
+    
+    return api_response({
+        'data': page['items'],
+        'total': page['total'],
+        'next_cursor': page['next_cursor'],
+        'next': next_url
+    })
+
+
+@app.route('/api/v1/transactions/bulk', methods=['POST'])
+def api_transactions_bulk():
+    """
+    Ajoute des transactions en masse (corps JSON).
+    
+    Corps : {"transactions": [...], "on_duplicate": "insert", "strict": false,
+    "dry_run": false} ou directement la liste. Chaque transaction a la forme
+    des exports (category par nom ou category_id). Les transactions valides
+    sont insérées en une seule transaction SQL ; le résultat de chaque
+    ligne (statut, ID ou erreur) est retourné dans l'ordre, y compris les
+    lignes ignorées comme doublons. Les doublons ne sont écartés que si le
+    client le demande ("skip" ou "merge") : une transaction identique
+    envoyée lors d'une synchronisation suivante est une nouvelle dépense.
+    """
+    payload = request.get_json(silent=True)
+    options = payload if isinstance(payload, dict) else {}
+    records = options.get('transactions') if isinstance(payload, dict) else payload
+    
+    if not isinstance(records, list):
+        return api_error("Corps attendu : liste de transactions ou {\"transactions\": [...]}")
+    if len(records) > API_BULK_LIMIT:
+        return api_error(f"Au plus {API_BULK_LIMIT} transactions par requête", 413)
+    
+    try:
+        result = import_service.import_records(
+            records,
+            on_duplicate=options.get('on_duplicate', 'insert'),
+            strict=bool(options.get('strict', False)),
+            dry_run=bool(options.get('dry_run', False))
+        )
+    except ValueError as e:
+        return api_error(str(e))
+    
+    if options.get('strict') and result['rejected']:
+        return api_response(result, 422)
+    return api_response(result, 201 if result['imported'] else 200)
+
+
+@app.route('/api/v1/transactions/<int:transaction_id>')
+def api_transaction(transaction_id):
+    """Une transaction par son ID."""
+    transaction = transaction_service.get_transaction_by_id(transaction_id)
+    if transaction is None:
+        return api_error(f"Transaction {transaction_id} introuvable", 404)
+    return api_response({'data': transaction.to_dict()})
+
+
+@app.route('/api/v1/budgets')
+def api_budgets():
+    """Statuts des budgets (category, start, end), en une requête groupée."""
+    try:
+        filters = get_transaction_filters()
+        statuses = budget_service.get_budget_statuses(
+            filters['category_id'], filters['start_date'], filters['end_date']
+        )
+        data = project(statuses, get_api_fields())
+    except ValueError as e:
+        return api_error(str(e))
+    return api_response({'data': data, 'total': len(data)})
+
+
+@app.route('/api/v1/categories')
+def api_categories():
+    """Liste des catégories."""
+    rows = db_manager.execute_query("SELECT id, name FROM categories ORDER BY name")
+    return api_response({'data': rows, 'total': len(rows)})
+
+
+@app.route('/api/v1/statistics/totals')
+def api_statistics_totals():
+    """Totaux globaux (revenus, dépenses, balance)."""
+    return api_response({'data': stats_service.get_totals()})
+
+
+@app.route('/api/v1/statistics/monthly')
+def api_statistics_monthly():
+    """Résumé d'un mois (year, month ; mois courant par défaut)."""
+    year = request.args.get('year', date.today().year, type=int)
+    month = request.args.get('month', date.today().month, type=int)
+    try:
+        summary = stats_service.get_monthly_summary(year, month)
+    except ValueError as e:
+        return api_error(f'Paramètres invalides: {e}')
+    return api_response({'data': summary})
+
+
+@app.route('/api/v1/statistics/percentiles')
+def api_statistics_percentiles():
+    """Percentiles approchés des montants (category, type, start, end)."""
+    try:
+        filters = get_transaction_filters()
+        percentiles = [float(p) for p in request.args.get('p', '50,90,99').split(',')]
+        data = stats_service.get_spending_percentiles(
+            category_id=filters['category_id'],
+            start_date=filters['start_date'],
+            end_date=filters['end_date'],
+            percentiles=percentiles,
+            transaction_type=filters['transaction_type'] or 'dépense'
+        )
+    except ValueError as e:
+        return api_error(str(e))
+    return api_response({'data': data})
+
+
+def job_payload(job):
+    """Tâche telle que renvoyée par l'API : liens de suivi et de téléchargement."""
+    payload = {key: value for key, value in job.items()
+               if key not in ('result_path', 'owner', 'heartbeat_at')}
+    payload['url'] = url_for('api_job', job_id=job['id'])
+    payload['download'] = (url_for('api_job_download', job_id=job['id'])
+                           if job['status'] == 'done' else None)
+    return payload
+
+
+@app.route('/api/v1/jobs', methods=['POST'])
+def api_jobs_submit():
+    """
+    Lance un export ou un rapport en arrière-plan (202, sans attendre).
+    
+    Corps : {"kind": "export_transactions" | "export_budgets" | "year_report",
+    "params": {...}}. La catégorie est acceptée par nom (category) ou par ID.
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict) or not isinstance(payload.get('params', {}), dict):
+        return api_error("Corps attendu : {\"kind\": ..., \"params\": {...}}")
+    
+    params = dict(payload.get('params') or {})
+    try:
+        if 'category' in params:
+            params['category_id'] = import_service.resolve_category(params.pop('category'))
+        job = job_service.submit(payload.get('kind'), params)
+    except ValueError as e:
+        return api_error(str(e))
+    
+    response = api_response({'data': job_payload(job)}, 202)
+    response.headers['Location'] = url_for('api_job', job_id=job['id'])
+    return response
+
+
+@app.route('/api/v1/jobs')
+def api_jobs():
+    """Dernières tâches (filtre status=queued|running|done|failed)."""
+    try:
+        jobs = job_service.list_jobs(request.args.get('status'),
+                                     request.args.get('limit', API_DEFAULT_LIMIT, type=int))
+    except ValueError as e:
+        return api_error(str(e))
+    return api_response({'data': [job_payload(job) for job in jobs]})
+
+
+@app.route('/api/v1/jobs/<int:job_id>')
+def api_job(job_id):
+    """Statut et progression d'une tâche."""
+    job = job_service.get_job(job_id)
+    if job is None:
+        return api_error(f"Tâche {job_id} introuvable", 404)
+    return api_response({'data': job_payload(job)})
+
+
+@app.route('/api/v1/jobs/<int:job_id>/download')
+def api_job_download(job_id):
+    """Fichier résultat d'une tâche terminée."""
+    job = job_service.get_job(job_id)
+    if job is None:
+        return api_error(f"Tâche {job_id} introuvable", 404)
+    if job['status'] != 'done':
+        return api_error(f"Tâche {job_id} non terminée ({job['status']})", 409)
+    path = Path(job['result_path'])
+    if not path.is_file():
+        return api_error(f"Résultat de la tâche {job_id} supprimé", 410)
+    return send_file(path.resolve(), as_attachment=True, download_name=path.name)
+
+
+@app.route('/api/v1/jobs/<int:job_id>', methods=['DELETE'])
+def api_job_delete(job_id):
+    """Supprime une tâche terminée et son fichier."""
+    try:
+        deleted = job_service.delete_job(job_id)
+    except ValueError as e:
+        return api_error(str(e), 409)
+    if not deleted:
+        return api_error(f"Tâche {job_id} introuvable", 404)
+    return Response(status=204)
+
+
+# ==================== Événements (Server-Sent Events) ====================
+
+# Événements poussés aux navigateurs
+EVENT_TYPES = ('transaction', 'transactions', 'budget', 'alert')
+
+# Commentaire envoyé sans événement pour garder la connexion ouverte (secondes)
+SSE_HEARTBEAT = 15.0
+
+# Délai de reconnexion conseillé au navigateur (millisecondes)
+SSE_RETRY_MS = 3000
+
+# Événements en attente par client ; au-delà, le client est déconnecté et
+# rattrape son retard à la reconnexion (Last-Event-ID)
+SSE_QUEUE_SIZE = 1000
+
+
+def format_sse(event):
+    """Trame SSE d'un événement du bus"""
+    data = json.dumps(event.data, ensure_ascii=False, separators=(',', ':'), default=str)
+    return f"id: {event.id}\nevent: {event.type}\ndata: {data}\n\n"
+
+
+def parse_event_stream_params(types_arg, last_event_id, bus):
+    """
+    Types d'événements demandés (?types=budget,alert) et dernier ID reçu
+    
+    Sans Last-Event-ID, le flux commence aux événements publiés après la
+    connexion.
+    
+    Raises:
+        ValueError: Type d'événement ou Last-Event-ID invalide
+    """
+    types = frozenset(EVENT_TYPES)
+    if types_arg:
+        types = frozenset(name.strip() for name in types_arg.split(',') if name.strip())
+        unknown = types - set(EVENT_TYPES)
+        if unknown:
+            raise ValueError(f"Types d'événements inconnus: {', '.join(sorted(unknown))}")
+    
+    if last_event_id is None or last_event_id == '':
+        return types, bus.last_id
+    if not last_event_id.isdigit():
+        raise ValueError(f"Last-Event-ID invalide: {last_event_id}")
+    return types, int(last_event_id)
+
+
+@app.route('/events')
+def event_stream():
+    """
+    Flux SSE des écritures : transactions, statuts de budgets, alertes
+    
+    Alimenté par le bus d'événements du processus : aucune requête SQL
+    par client. Avec le serveur WSGI, chaque client occupe un thread ;
+    le mode ASGI (src/web/asgi.py) sert ce flux sans thread par client.
+    """
+    try:
+        types, last_id = parse_event_stream_params(
+            request.args.get('types'), request.headers.get('Last-Event-ID'), events
+        )
+    except ValueError as e:
+        return api_error(str(e))
+    
+    bus = events
+    pending = queue.Queue(maxsize=SSE_QUEUE_SIZE)
+    overflow = threading.Event()
+    
+    def enqueue(event):
+        try:
+            pending.put_nowait(event)
+        except queue.Full:
+            overflow.set()
+    
+    def stream():
+        unsubscribe = bus.subscribe(enqueue, types)
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            # Publiés entre la connexion (ou la déconnexion précédente) et
+            # l'abonnement ; ceux reçus aussi par l'abonnement ne sont pas renvoyés
+            replayed = set()
+            for event in bus.replay(last_id):
+                if event.type in types:
+                    replayed.add(event.id)
+                    yield format_sse(event)
+            while not overflow.is_set():
+                try:
+                    event = pending.get(timeout=SSE_HEARTBEAT)
+                except queue.Empty:
+                    yield ": ping\n\n"
+                    continue
+                if event.id not in replayed:
+                    yield format_sse(event)
+        finally:
+            unsubscribe()
+    
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Métriques au format texte de Prometheus (404 si désactivées)"""
+    if metrics is None:
+        return api_error("Métriques désactivées (MYBUDGET_METRICS=1 pour les activer)", 404)
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 
 if __name__ == '__main__':
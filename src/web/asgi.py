@@ -0,0 +1,461 @@
+# src/web/asgi.py
+"""
+Mode de service asynchrone (ASGI) de l'application web MyBudget
+
+Lancement avec un serveur ASGI, par exemple :
+    uvicorn src.web.asgi:application
+
+Les routes Flask de src/web/app.py sont servies telles quelles. Chaque
+requête s'exécute dans un pool borné de threads, chacun avec sa propre
+connexion SQLite (ThreadLocalDatabaseManager) ; la boucle d'événements
+ne fait que recevoir et envoyer les octets, si bien qu'un client lent
+n'occupe aucun thread pendant qu'il lit la réponse. L'attente longue
+(GET /api/v1/changes) et le flux d'événements (GET /events) sont servis
+nativement, sans thread par client.
+"""
+import asyncio
+import contextvars
+import io
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from src.utils.events import Event, EventBus
+from src.web import app as web
+
+# Nombre de threads du pool, donc de connexions SQLite ouvertes
+DEFAULT_WORKERS = 8
+
+# Durée maximale d'une attente longue (secondes)
+MAX_WAIT_TIMEOUT = 30.0
+
+# Intervalle de relecture de la version des données pendant une attente
+WATCH_INTERVAL = 0.25
+
+
+class WorkerPool:
+    """
+    Pool borné de threads pour les appels bloquants (Flask, SQLite)
+
+    Une requête reste sur le même thread du début à la fin : un export en
+    flux garde son curseur sur la connexion qui l'a ouvert. Entre deux
+    morceaux de réponse, le thread sert les autres requêtes.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, initializer: Optional[Callable] = None):
+        if workers < 1:
+            raise ValueError("Le nombre de workers doit être au moins 1")
+        self._executors = [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'mybudget-web-{index}',
+                               initializer=initializer)
+            for index in range(workers)
+        ]
+        # Requêtes en cours par thread ; lu et modifié depuis la boucle uniquement
+        self._load = [0] * workers
+
+    def acquire(self) -> int:
+        """Réserve le thread le moins chargé pour une requête"""
+        index = min(range(len(self._load)), key=self._load.__getitem__)
+        self._load[index] += 1
+        return index
+
+    def release(self, index: int) -> None:
+        self._load[index] -= 1
+
+    @property
+    def size(self) -> int:
+        return len(self._executors)
+
+    @property
+    def in_flight(self) -> int:
+        """Requêtes en cours, tous threads confondus"""
+        return sum(self._load)
+
+    async def run(self, index: int, func: Callable, *args):
+        """Exécute func dans le thread réservé, sans bloquer la boucle"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executors[index], func, *args)
+
+    def shutdown(self, finalizer: Optional[Callable] = None) -> None:
+        """Arrête les threads, après avoir appelé finalizer dans chacun"""
+        for executor in self._executors:
+            if finalizer is not None:
+                executor.submit(finalizer)
+            executor.shutdown(wait=True)
+
+
+class DataVersionWatcher:
+    """
+    Version des données partagée par toutes les attentes longues
+
+    Un seul thread relit la version de la base (data_version()) à
+    intervalle régulier, et seulement tant qu'un client attend : mille
+    clients en attente coûtent une lecture par intervalle, pas mille.
+    """
+
+    def __init__(self, db_manager, interval: float = WATCH_INTERVAL):
+        self.db = db_manager
+        self.interval = interval
+        self.version: Optional[str] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='mybudget-watch')
+        self._changed: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._waiters = 0
+
+    async def current(self) -> str:
+        """Relit la version des données"""
+        loop = asyncio.get_running_loop()
+        self.version = await loop.run_in_executor(self._executor, self._read_version)
+        return self.version
+
+    def _read_version(self) -> str:
+        # Résolu dans le thread du watcher : sa propre connexion
+        return self.db.data_version()
+
+    async def wait(self, known: str, timeout: float) -> str:
+        """Attend une version différente de known, au plus timeout secondes"""
+        if self._task is None:
+            await self.current()
+        if self.version != known:
+            return self.version
+
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        self._waiters += 1
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._watch())
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            while self.version == known:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._changed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+        finally:
+            self._waiters -= 1
+        return self.version
+
+    async def _watch(self) -> None:
+        try:
+            while self._waiters:
+                await asyncio.sleep(self.interval)
+                previous = self.version
+                if await self.current() != previous:
+                    # Réveiller tous les clients, les suivants attendront un nouvel événement
+                    changed, self._changed = self._changed, asyncio.Event()
+                    changed.set()
+        finally:
+            self._task = None
+
+    @property
+    def waiters(self) -> int:
+        return self._waiters
+
+    def close(self) -> None:
+        self._executor.submit(lambda: self.db.close())
+        self._executor.shutdown(wait=True)
+
+
+class AsgiApplication:
+    """
+    Application ASGI : routes Flask dans le pool, attente longue en asynchrone
+
+    Args:
+        wsgi_app: Application WSGI servie (l'application Flask)
+        db_manager: Base partagée, une connexion par thread
+        events: Bus d'événements servi en SSE sur /events
+        workers: Nombre de threads (et de connexions SQLite) du pool
+    """
+
+    def __init__(self, wsgi_app: Callable, db_manager, events: Optional[EventBus] = None,
+                 workers: int = DEFAULT_WORKERS):
+        self.wsgi_app = wsgi_app
+        self.db = db_manager
+        self.events = events
+        # Les threads du pool gardent leur connexion d'une requête à l'autre
+        self.pool = WorkerPool(workers, initializer=getattr(db_manager, 'keep_open', None))
+        self.watcher = DataVersionWatcher(db_manager)
+        self.routes = {
+            '/api/v1/changes': self.wait_for_changes,
+        }
+        if events is not None:
+            self.routes['/events'] = self.event_stream
+        if web.metrics is not None:
+            self.register_metrics(web.metrics)
+
+    def register_metrics(self, registry) -> None:
+        """Jauges du pool et des attentes longues, lues au moment de la collecte"""
+        registry.gauge('mybudget_asgi_workers', "Threads du pool ASGI", lambda: self.pool.size)
+        registry.gauge('mybudget_asgi_requests_in_flight', "Requêtes Flask en cours dans le pool",
+                       lambda: self.pool.in_flight)
+        registry.gauge('mybudget_asgi_long_poll_waiters', "Clients en attente sur /api/v1/changes",
+                       lambda: self.watcher.waiters)
+
+    async def __call__(self, scope: Dict, receive: Callable, send: Callable) -> None:
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            handler = self.routes.get(scope['path'])
+            if handler is not None and scope['method'] == 'GET':
+                await handler(scope, receive, send)
+            else:
+                await self._call_wsgi(scope, receive, send)
+        else:
+            raise ValueError(f"Type de connexion non pris en charge: {scope['type']}")
+
+    async def wait_for_changes(self, scope: Dict, receive: Callable, send: Callable) -> None:
+        """
+        GET /api/v1/changes?version=...&timeout=...
+
+        Sans version, retourne immédiatement la version courante. Avec la
+        version déjà connue du client, répond dès que les données changent
+        ou au bout de timeout secondes (30 au plus), avec changed à false.
+        """
+        params = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        known = params.get('version', [None])[0]
+        try:
+            timeout = float(params.get('timeout', [MAX_WAIT_TIMEOUT])[0])
+        except ValueError:
+            await send_json(send, 400, {'error': "Paramètre timeout invalide"})
+            return
+        timeout = min(max(timeout, 0.0), MAX_WAIT_TIMEOUT)
+
+        if known is None:
+            version = await self.watcher.current()
+        else:
+            waiting = asyncio.ensure_future(self.watcher.wait(known, timeout))
+            disconnect = asyncio.ensure_future(wait_for_disconnect(receive))
+            done, _ = await asyncio.wait({waiting, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+            disconnect.cancel()
+            if waiting not in done:
+                # Client parti : libérer l'attente sans répondre
+                waiting.cancel()
+                return
+            version = waiting.result()
+
+        await send_json(send, 200, {
+            'version': version, 'changed': known is not None and version != known
+        })
+
+    async def event_stream(self, scope: Dict, receive: Callable, send: Callable) -> None:
+        """
+        GET /events : même flux SSE que la route Flask, sans thread par client
+
+        Les événements publiés dans les threads du pool sont remis à la
+        boucle (call_soon_threadsafe) puis envoyés à chaque client.
+        """
+        params = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        headers = dict(scope.get('headers', []))
+        last_event_id = headers.get(b'last-event-id')
+        try:
+            types, last_id = web.parse_event_stream_params(
+                params.get('types', [None])[0],
+                last_event_id.decode('latin-1') if last_event_id is not None else None,
+                self.events
+            )
+        except ValueError as e:
+            await send_json(send, 400, {'error': str(e)})
+            return
+
+        loop = asyncio.get_running_loop()
+        pending: asyncio.Queue = asyncio.Queue(maxsize=web.SSE_QUEUE_SIZE)
+        overflow = asyncio.Event()
+
+        def put(event: Event) -> None:
+            if pending.full():
+                overflow.set()
+            else:
+                pending.put_nowait(event)
+
+        def enqueue(event: Event) -> None:
+            # Appelé dans le thread qui publie
+            loop.call_soon_threadsafe(put, event)
+
+        unsubscribe = self.events.subscribe(enqueue, types)
+        disconnect = asyncio.ensure_future(wait_for_disconnect(receive))
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': [
+                    (b'content-type', b'text/event-stream; charset=utf-8'),
+                    (b'cache-control', b'no-cache'),
+                    (b'x-accel-buffering', b'no'),
+                ],
+            })
+            frames = [f"retry: {web.SSE_RETRY_MS}\n\n"]
+            replayed = set()
+            for event in self.events.replay(last_id):
+                if event.type in types:
+                    replayed.add(event.id)
+                    frames.append(web.format_sse(event))
+            await send_sse(send, ''.join(frames))
+
+            while not overflow.is_set():
+                getter = asyncio.ensure_future(pending.get())
+                done, _ = await asyncio.wait(
+                    {getter, disconnect}, timeout=web.SSE_HEARTBEAT,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if getter not in done:
+                    getter.cancel()
+                    if disconnect in done:
+                        return
+                    await send_sse(send, ": ping\n\n")
+                    continue
+                event = getter.result()
+                if event.id not in replayed:
+                    await send_sse(send, web.format_sse(event))
+            # Client trop lent : fin du flux, il rattrapera à la reconnexion
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            unsubscribe()
+            disconnect.cancel()
+
+    async def _call_wsgi(self, scope: Dict, receive: Callable, send: Callable) -> None:
+        body = await read_body(receive)
+        if body is None:
+            return
+        environ = build_environ(scope, body)
+
+        index = self.pool.acquire()
+        # Contexte propre à la requête : Flask y place son contexte de requête
+        context = contextvars.copy_context()
+        result = None
+        try:
+            status, headers, result, iterator, first = await self.pool.run(
+                index, context.run, self._start_response, environ
+            )
+            await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+            for chunk in first:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            while True:
+                chunk = await self.pool.run(index, context.run, next, iterator, None)
+                if chunk is None:
+                    break
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            if hasattr(result, 'close'):
+                await self.pool.run(index, context.run, result.close)
+            self.pool.release(index)
+
+    def _start_response(self, environ: Dict) -> Tuple[int, List, object, object, List[bytes]]:
+        """Appelle l'application WSGI jusqu'à obtenir le statut et les en-têtes"""
+        response: Dict = {}
+        first: List[bytes] = []
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info is not None and response:
+                raise exc_info[1].with_traceback(exc_info[2])
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers
+            ]
+            return first.append
+
+        result = self.wsgi_app(environ, start_response)
+        iterator = iter(result)
+        # Une application générateur n'appelle start_response qu'au premier morceau
+        while not response:
+            chunk = next(iterator, None)
+            if chunk is None:
+                raise RuntimeError("L'application WSGI n'a pas appelé start_response")
+            first.append(chunk)
+        return response['status'], response['headers'], result, iterator, first
+
+    async def _lifespan(self, receive: Callable, send: Callable) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def close(self) -> None:
+        """Ferme les connexions SQLite et arrête les threads"""
+        self.pool.shutdown(lambda: self.db.close())
+        self.watcher.close()
+
+
+def build_environ(scope: Dict, body: bytes) -> Dict:
+    """Environnement WSGI (PEP 3333) d'une requête HTTP ASGI"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': str(server[0]),
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for raw_name, raw_value in scope.get('headers', []):
+        name = raw_name.decode('latin-1').lower()
+        value = raw_value.decode('latin-1')
+        if name == 'content-type':
+            key = 'CONTENT_TYPE'
+        elif name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    # Le corps est déjà lu en entier (éventuellement reçu en chunked)
+    environ['CONTENT_LENGTH'] = str(len(body))
+    return environ
+
+
+async def read_body(receive: Callable) -> Optional[bytes]:
+    """Lit le corps de la requête ; None si le client s'est déconnecté"""
+    parts = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        parts.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(parts)
+
+
+async def wait_for_disconnect(receive: Callable) -> None:
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def send_sse(send: Callable, text: str) -> None:
+    await send({'type': 'http.response.body', 'body': text.encode('utf-8'), 'more_body': True})
+
+
+async def send_json(send: Callable, status: int, payload: Dict) -> None:
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+application = AsgiApplication(web.app, web.db_manager, web.events)
@@ -0,0 +1,214 @@
+# tests/integration/test_asgi.py
+
+import pytest
+import asyncio
+import csv
+import io
+import json
+import threading
+import time
+from datetime import date
+from src.database.db_manager import DatabaseManager, ThreadLocalDatabaseManager
+from src.models.transaction import Transaction
+from src.services.budget_service import BudgetService
+from src.services.export_service import ExportService
+from src.services.idempotency_service import IdempotencyService
+from src.services.import_service import ImportService
+from src.services.statistics_service import StatisticsService
+from src.services.transaction_service import TransactionService
+from src.utils.events import EventBus
+from src.utils.render_cache import RenderCache
+from src.web import app as web_app
+from src.web.asgi import AsgiApplication
+
+
+@pytest.fixture
+def asgi_app(tmp_path, monkeypatch):
+    """Application ASGI sur une base fichier, deux threads de service"""
+    db = ThreadLocalDatabaseManager(str(tmp_path / "budget.db"))
+    events = EventBus()
+    transactions = TransactionService(db, events)
+    monkeypatch.setattr(web_app, 'db_manager', db)
+    monkeypatch.setattr(web_app, 'events', events)
+    monkeypatch.setattr(web_app, 'transaction_service', transactions)
+    monkeypatch.setattr(web_app, 'budget_service', BudgetService(db, transactions, events))
+    monkeypatch.setattr(web_app, 'stats_service', StatisticsService(db, transactions))
+    monkeypatch.setattr(web_app, 'export_service', ExportService(db, transactions))
+    monkeypatch.setattr(web_app, 'import_service', ImportService(db, transactions))
+    monkeypatch.setattr(web_app, 'idempotency_service', IdempotencyService(db))
+    # Version des données identique d'une base de test à l'autre : cache neuf
+    monkeypatch.setattr(web_app, 'render_cache', RenderCache(on_access=web_app.count_cache))
+
+    transactions.add_transaction(Transaction(
+        amount=45.0, description="Courses", type="dépense", category_id=1, date=date(2026, 1, 5)
+    ))
+    transactions.add_transaction(Transaction(
+        amount=2000.0, description="Salaire", type="revenu", category_id=6, date=date(2026, 1, 1)
+    ))
+
+    application = AsgiApplication(web_app.app, db, events, workers=2)
+    yield application
+    application.close()
+    db.close()
+
+
+async def call(application, method, path, query=b'', body=b'', headers=()):
+    """Envoie une requête HTTP à l'application ASGI, retourne (statut, en-têtes, corps)"""
+    messages = []
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        # Le client reste connecté
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'query_string': query,
+        'root_path': '',
+        'headers': [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 5000),
+    }
+    await application(scope, receive, send)
+    start = messages[0]
+    return start['status'], dict(start['headers']), b''.join(m.get('body', b'') for m in messages[1:])
+
+
+def web_threads():
+    return [t for t in threading.enumerate() if t.name.startswith('mybudget-web')]
+
+
+class TestAsgiApplication:
+    """Tests du mode de service asynchrone"""
+
+    def test_flask_routes(self, asgi_app):
+        """Test: routes Flask servies par le pool, corps de requête transmis"""
+        async def scenario():
+            status, headers, body = await call(asgi_app, 'GET', '/api/v1/transactions')
+            assert status == 200
+            assert headers[b'content-type'] == b'application/json'
+            assert json.loads(body)['total'] == 2
+
+            record = {'date': '2026-02-01', 'amount': 3, 'description': 'Pain', 'type': 'dépense', 'category_id': 1}
+            status, _, body = await call(
+                asgi_app, 'POST', '/api/v1/transactions/bulk',
+                body=json.dumps([record]).encode('utf-8'),
+                headers=[('content-type', 'application/json')]
+            )
+            assert status == 201
+            assert json.loads(body)['imported'] == 1
+
+        asyncio.run(scenario())
+
+    def test_streamed_export(self, asgi_app):
+        """Test: l'export en flux est lu sur la connexion du thread qui l'a ouvert"""
+        status, headers, body = asyncio.run(call(asgi_app, 'GET', '/export/csv', query=b'type=d%C3%A9pense'))
+
+        assert status == 200
+        assert b'attachment' in headers[b'content-disposition']
+        rows = list(csv.DictReader(io.StringIO(body.decode('utf-8'))))
+        assert [row['description'] for row in rows] == ["Courses"]
+
+    def test_concurrent_requests_bounded_pool(self, asgi_app):
+        """Test: requêtes simultanées servies par deux threads au plus"""
+        async def scenario():
+            return await asyncio.gather(*(
+                call(asgi_app, 'GET', '/api/v1/statistics/totals') for _ in range(20)
+            ))
+
+        responses = asyncio.run(scenario())
+
+        assert all(status == 200 for status, _, _ in responses)
+        assert len(web_threads()) <= 2
+
+    def test_long_poll_wakes_on_change(self, asgi_app, tmp_path):
+        """Test: les clients en attente sont réveillés par une écriture d'une autre connexion"""
+        async def scenario():
+            _, _, body = await call(asgi_app, 'GET', '/api/v1/changes')
+            version = json.loads(body)['version'].encode('utf-8')
+            query = b'version=' + version + b'&timeout=10'
+            waiting = [asyncio.ensure_future(call(asgi_app, 'GET', '/api/v1/changes', query=query))
+                       for _ in range(50)]
+            await asyncio.sleep(0.3)
+
+            # Écriture extérieure, comme depuis la CLI
+            with DatabaseManager(str(tmp_path / "budget.db")) as writer:
+                writer.execute_update(
+                    "INSERT INTO transactions (amount, description, type, category_id, date) VALUES (?, ?, ?, ?, ?)",
+                    (4.0, "Café", "dépense", 1, "2026-01-10")
+                )
+            return await asyncio.gather(*waiting)
+
+        threads = threading.active_count()
+        start = time.perf_counter()
+        responses = asyncio.run(scenario())
+
+        assert time.perf_counter() - start < 5
+        assert all(json.loads(body)['changed'] for _, _, body in responses)
+        assert threading.active_count() <= threads + 3
+
+    def test_long_poll_timeout(self, asgi_app):
+        """Test: sans écriture, réponse au bout du délai avec changed à false"""
+        async def scenario():
+            _, _, body = await call(asgi_app, 'GET', '/api/v1/changes')
+            version = json.loads(body)['version'].encode('utf-8')
+            return await call(asgi_app, 'GET', '/api/v1/changes', query=b'version=' + version + b'&timeout=0.3')
+
+        status, _, body = asyncio.run(scenario())
+
+        assert status == 200
+        assert json.loads(body)['changed'] is False
+        assert asyncio.run(call(asgi_app, 'GET', '/api/v1/changes', query=b'timeout=x'))[0] == 400
+
+    def test_event_stream(self, asgi_app):
+        """Test: les écritures du pool sont poussées aux clients SSE, sans thread par client"""
+        async def scenario():
+            streams = []
+            for _ in range(20):
+                frames = asyncio.Queue()
+                disconnected = asyncio.Event()
+
+                async def receive(disconnected=disconnected):
+                    await disconnected.wait()
+                    return {'type': 'http.disconnect'}
+
+                async def send(message, frames=frames):
+                    await frames.put(message)
+
+                scope = {'type': 'http', 'method': 'GET', 'path': '/events',
+                         'query_string': b'types=transaction', 'headers': []}
+                task = asyncio.ensure_future(asgi_app(scope, receive, send))
+                streams.append((task, frames, disconnected))
+
+            for _, frames, _ in streams:
+                assert (await frames.get())['status'] == 200
+                assert (await frames.get())['body'].startswith(b'retry:')
+
+            status, _, _ = await call(asgi_app, 'POST', '/transactions/add', body=(
+                'amount=4&description=Caf%C3%A9&type=d%C3%A9pense&category=alimentation&date=2026-02-02'
+            ).encode('ascii'), headers=[('content-type', 'application/x-www-form-urlencoded')])
+            assert status == 302
+
+            bodies = [(await asyncio.wait_for(frames.get(), 2))['body'].decode('utf-8') for _, frames, _ in streams]
+            for task, _, disconnected in streams:
+                disconnected.set()
+            await asyncio.gather(*(task for task, _, _ in streams))
+            return bodies
+
+        threads = threading.active_count()
+        bodies = asyncio.run(scenario())
+
+        assert all('event: transaction' in body and 'Café' in body for body in bodies)
+        assert threading.active_count() <= threads + 3
+        assert web_app.events.subscriber_count == 1
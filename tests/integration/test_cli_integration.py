@@ -109,6 +109,160 @@ class TestCLIIntegration:
             lines = f.read().splitlines()
             assert len(lines) >= 2  # header + at least one row
 
+    def test_export_command_jsonl(self, runner, tmp_path):
+        """Test: export des transactions en JSON Lines via CLI"""
+        runner.invoke(cli, ['reset', '--yes'])
+        runner.invoke(cli, ['add', '10', 'Test', 'alimentation', '2026-01-10'])
+
+        output = tmp_path / "export.jsonl"
+        result = runner.invoke(cli, ['export', '--format', 'jsonl', '--output', str(output)])
+
+        assert result.exit_code == 0
+        with open(output, 'r', encoding='utf-8') as f:
+            rows = [json.loads(line) for line in f]
+            assert rows[0]['description'] == 'Test'
+
+    def test_export_command_compressed(self, runner, tmp_path):
+        """Test: export compresse via CLI"""
+        import gzip
+        runner.invoke(cli, ['reset', '--yes'])
+        runner.invoke(cli, ['add', '10', 'Test', 'alimentation', '2026-01-10'])
+
+        output = tmp_path / "export.csv.gz"
+        result = runner.invoke(cli, ['export', '--format', 'csv', '--output', str(output), '--level', '6'])
+
+        assert result.exit_code == 0
+        with gzip.open(output, 'rt', encoding='utf-8') as f:
+            assert len(f.read().splitlines()) == 2
+
+    def test_export_command_partitioned(self, runner, tmp_path):
+        """Test: export partitionne par mois via CLI"""
+        runner.invoke(cli, ['reset', '--yes'])
+        runner.invoke(cli, ['add', '10', 'Janvier', 'alimentation', '2026-01-10'])
+        runner.invoke(cli, ['add', '20', 'Fevrier', 'alimentation', '2026-02-10'])
+
+        output = tmp_path / "partitions"
+        result = runner.invoke(cli, [
+            'export', '--format', 'csv', '--output', str(output),
+            '--partition-by', 'month', '--workers', '2'
+        ])
+
+        assert result.exit_code == 0
+        with open(output / 'manifest.json', 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+            assert manifest['total_rows'] == 2
+            assert len(manifest['partitions']) == 2
+
+    def test_export_command_rejects_unsupported_options(self, runner, tmp_path):
+        """Test: options sans effet pour le format refusees (erreur d'usage)"""
+        output = str(tmp_path / "export.mbcol")
+        for options in (['--compress', 'gzip'], ['--partition-by', 'month']):
+            result = runner.invoke(cli, ['export', '--format', 'columnar', '--output', output] + options)
+            assert result.exit_code == 2
+            assert 'columnar' in result.output
+
+        result = runner.invoke(cli, ['export', '--format', 'csv', '--output', output, '--workers', '2'])
+        assert result.exit_code == 2
+        assert '--partition-by' in result.output
+
+    def test_export_changes_command(self, runner, tmp_path):
+        """Test: export incremental via CLI"""
+        runner.invoke(cli, ['reset', '--yes'])
+        runner.invoke(cli, ['export-changes', '-o', str(tmp_path / "base.json"), '--name', 'cli-test'])
+        runner.invoke(cli, ['add', '10', 'Nouveau', 'alimentation', '2026-01-10'])
+
+        output = tmp_path / "changes.json"
+        result = runner.invoke(cli, ['export-changes', '-o', str(output), '--name', 'cli-test'])
+
+        assert result.exit_code == 0
+        with open(output, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+            assert [t['description'] for t in data['transactions']] == ['Nouveau']
+
+    def test_import_command_round_trip(self, runner, tmp_path):
+        """Test: import d'un export JSON Lines via CLI, simulation puis import reel"""
+        runner.invoke(cli, ['reset', '--yes'])
+        runner.invoke(cli, ['add', '10', 'Premier', 'alimentation', '2026-01-10'])
+        runner.invoke(cli, ['add', '20', 'Second', 'loisirs', '2026-01-11'])
+        export_file = tmp_path / "export.jsonl.gz"
+        runner.invoke(cli, ['export', '--format', 'jsonl', '--output', str(export_file)])
+        runner.invoke(cli, ['reset', '--yes'])
+
+        dry = runner.invoke(cli, ['import', str(export_file), '--dry-run'])
+        assert dry.exit_code == 0
+        assert 'simulation' in dry.output
+        assert len(db.execute_query("SELECT * FROM transactions")) == 0
+
+        result = runner.invoke(cli, ['import', str(export_file)])
+        assert result.exit_code == 0
+        assert '2 transaction(s) importee(s)' in result.output
+        assert len(db.execute_query("SELECT * FROM transactions")) == 2
+
+    def test_import_command_skips_duplicates(self, runner, tmp_path):
+        """Test: reimporter le meme fichier n'ajoute rien et affiche les doublons"""
+        runner.invoke(cli, ['reset', '--yes'])
+        source = tmp_path / "import.csv"
+        source.write_text(
+            "date,amount,description,type,category\n"
+            "2026-01-10,12.5,Marche,dépense,alimentation\n",
+            encoding='utf-8'
+        )
+        runner.invoke(cli, ['import', str(source)])
+
+        result = runner.invoke(cli, ['import', str(source)])
+
+        assert result.exit_code == 0
+        assert 'Doublons: 1 ignore(s)' in result.output
+        assert len(db.execute_query("SELECT * FROM transactions")) == 1
+
+    def test_add_command_detects_duplicate(self, runner):
+        """Test: une saisie identique est ajoutee, avec un avertissement"""
+        runner.invoke(cli, ['reset', '--yes'])
+        first = runner.invoke(cli, ['add', '3.50', 'Cafe', 'alimentation', '2026-01-10'])
+        assert 'identique' not in first.output
+
+        result = runner.invoke(cli, ['add', '3.50', 'Cafe', 'alimentation', '2026-01-10'])
+        assert '✅' in result.output
+        assert 'identique' in result.output
+        assert len(db.execute_query("SELECT * FROM transactions")) == 2
+
+    def test_import_command_reports_rejected_rows(self, runner, tmp_path):
+        """Test: les lignes invalides sont signalees sans bloquer l'import"""
+        runner.invoke(cli, ['reset', '--yes'])
+        source = tmp_path / "import.csv"
+        source.write_text(
+            "date,amount,description,type,category\n"
+            "2026-01-10,12.5,Marche,dépense,alimentation\n"
+            "2026-01-11,-3,Negatif,dépense,alimentation\n",
+            encoding='utf-8'
+        )
+
+        result = runner.invoke(cli, ['import', str(source)])
+
+        assert result.exit_code == 0
+        assert '1 rejetee(s)' in result.output
+        assert 'Enregistrement 2' in result.output
+
+    def test_ingest_command(self, runner, tmp_path):
+        """Test: integration de releves CSV (profil francais) via CLI"""
+        runner.invoke(cli, ['reset', '--yes'])
+        statement = tmp_path / "releve.csv"
+        statement.write_text(
+            "Date;Libellé;Débit;Crédit\n"
+            "03/02/2026;PRLV EDF;45,10;\n"
+            "04/02/2026;VIR CAF;;120,00\n",
+            encoding='cp1252'
+        )
+
+        result = runner.invoke(cli, [
+            'ingest', str(statement), '--profile', 'fr', '--category', 'logement', '--workers', '1'
+        ])
+
+        assert result.exit_code == 0
+        assert '2 transaction(s) importee(s)' in result.output
+        rows = db.execute_query("SELECT type, amount FROM transactions ORDER BY date")
+        assert rows == [{'type': 'dépense', 'amount': 45.1}, {'type': 'revenu', 'amount': 120.0}]
+
     def test_export_budget_command_json(self, runner, tmp_path):
         """Test: export du resume budget en JSON via CLI"""
         runner.invoke(cli, ['reset', '--yes'])
@@ -128,6 +282,36 @@ class TestCLIIntegration:
             assert 'budget' in data
             assert 'transactions' in data
 
+    def test_export_budgets_command(self, runner, tmp_path):
+        """Test: export des resumes de tous les budgets via CLI"""
+        runner.invoke(cli, ['reset', '--yes'])
+        runner.invoke(cli, ['budget', 'alimentation', '100', '2026-01-01', '2026-01-31'])
+        runner.invoke(cli, ['budget', 'loisirs', '50', '2026-01-01', '2026-01-31'])
+        runner.invoke(cli, ['add', '10', 'Test', 'alimentation', '2026-01-10'])
+
+        output = tmp_path / "budgets.json"
+        result = runner.invoke(cli, ['export-budgets', '-o', str(output)])
+
+        assert result.exit_code == 0
+        assert '2 budget(s)' in result.output
+        with open(output, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+            assert len(data['budgets']) == 2
+
+    def test_report_command(self, runner, tmp_path):
+        """Test: rapport annuel via CLI"""
+        runner.invoke(cli, ['reset', '--yes'])
+        runner.invoke(cli, ['add', '10', 'Test', 'alimentation', '2026-01-10'])
+
+        output = tmp_path / "report.json"
+        result = runner.invoke(cli, ['report', '2026', '-o', str(output), '--workers', '2'])
+
+        assert result.exit_code == 0
+        with open(output, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+            assert len(data['monthly_summaries']) == 12
+            assert data['monthly_summaries'][0]['total_depenses'] == 10
+
     def test_reset_command(self, runner):
         """Test: reinitialisation des donnees via CLI"""
         # Ajouter des donnees
@@ -0,0 +1,616 @@
+# tests/integration/test_web_app.py
+
+import pytest
+import csv
+import gzip
+import io
+import json
+import threading
+from datetime import date
+from src.database.db_manager import DatabaseManager, ThreadLocalDatabaseManager
+from src.models.budget import Budget
+from src.models.transaction import Transaction
+from src.services.budget_service import BudgetService
+from src.services.export_service import ExportService
+from src.services.idempotency_service import IdempotencyService
+from src.services.import_service import ImportService
+from src.services.job_service import JobService
+from src.services.statistics_service import StatisticsService
+from src.services.transaction_service import TransactionService
+from src.utils.events import EventBus
+from src.utils.render_cache import RenderCache
+from src.web import app as web_app
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Client de test Flask branché sur une base en mémoire"""
+    db = DatabaseManager(":memory:")
+    events = EventBus()
+    transactions = TransactionService(db, events)
+    monkeypatch.setattr(web_app, 'db_manager', db)
+    monkeypatch.setattr(web_app, 'events', events)
+    monkeypatch.setattr(web_app, 'transaction_service', transactions)
+    monkeypatch.setattr(web_app, 'budget_service', BudgetService(db, transactions, events))
+    monkeypatch.setattr(web_app, 'stats_service', StatisticsService(db, transactions))
+    monkeypatch.setattr(web_app, 'export_service', ExportService(db, transactions))
+    monkeypatch.setattr(web_app, 'import_service', ImportService(db, transactions))
+    monkeypatch.setattr(web_app, 'idempotency_service', IdempotencyService(db))
+    # Version des données identique d'une base de test à l'autre : cache neuf
+    monkeypatch.setattr(web_app, 'render_cache', RenderCache(on_access=web_app.count_cache))
+
+    transactions.add_transaction(Transaction(
+        amount=45.0, description="Courses", type="dépense", category_id=1, date=date(2026, 1, 5)
+    ))
+    transactions.add_transaction(Transaction(
+        amount=12.5, description="Cinéma", type="dépense", category_id=3, date=date(2026, 1, 8)
+    ))
+    transactions.add_transaction(Transaction(
+        amount=2000.0, description="Salaire", type="revenu", category_id=8, date=date(2026, 1, 1)
+    ))
+
+    web_app.app.config['TESTING'] = True
+    with web_app.app.test_client() as client:
+        yield client
+    db.close()
+
+
+@pytest.fixture
+def threaded_client(tmp_path, monkeypatch):
+    """Client de test sur une base fichier, une connexion par thread (serveur threadé)"""
+    db = ThreadLocalDatabaseManager(str(tmp_path / "budget.db"))
+    events = EventBus()
+    transactions = TransactionService(db, events)
+    monkeypatch.setattr(web_app, 'db_manager', db)
+    monkeypatch.setattr(web_app, 'events', events)
+    monkeypatch.setattr(web_app, 'transaction_service', transactions)
+    monkeypatch.setattr(web_app, 'budget_service', BudgetService(db, transactions, events))
+    monkeypatch.setattr(web_app, 'stats_service', StatisticsService(db, transactions))
+    monkeypatch.setattr(web_app, 'idempotency_service', IdempotencyService(db))
+    # Version des données identique d'une base de test à l'autre : cache neuf
+    monkeypatch.setattr(web_app, 'render_cache', RenderCache(on_access=web_app.count_cache))
+
+    transactions.add_transaction(Transaction(
+        amount=45.0, description="Courses", type="dépense", category_id=1, date=date(2026, 1, 5)
+    ))
+    db.close()
+
+    # Sans bloc with : le contexte de requête n'est pas conservé d'un thread à l'autre
+    web_app.app.config['TESTING'] = True
+    yield web_app.app.test_client(), db
+    db.close()
+
+
+def in_thread(request):
+    """Envoie request() depuis un nouveau thread, comme le serveur threadé : réponse lue et fermée"""
+    responses = []
+
+    def serve():
+        response = request()
+        response.get_data()
+        response.close()
+        responses.append(response)
+
+    thread = threading.Thread(target=serve)
+    thread.start()
+    thread.join()
+    return responses[0]
+
+
+class TestWebExport:
+    """Tests des exports HTTP en flux"""
+
+    def test_export_csv_streams_attachment(self, client):
+        """Test: le CSV est envoyé en pièce jointe, en flux"""
+        response = client.get('/export/csv')
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == 'text/csv'
+        assert 'attachment' in response.headers['Content-Disposition']
+
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        assert [row['description'] for row in rows] == ["Cinéma", "Courses", "Salaire"]
+
+    def test_export_applies_transaction_filters(self, client):
+        """Test: mêmes filtres que /transactions (catégorie, type)"""
+        response = client.get('/export/json?type=dépense&category=alimentation')
+
+        data = json.loads(response.get_data(as_text=True))
+        assert data['count'] == 1
+        assert data['transactions'][0]['description'] == "Courses"
+
+    def test_export_gzip_when_accepted(self, client):
+        """Test: réponse compressée si le client accepte gzip"""
+        response = client.get('/export/json', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        data = json.loads(gzip.decompress(response.get_data()).decode('utf-8'))
+        assert data['count'] == 3
+
+    def test_export_unknown_filter(self, client):
+        """Test: filtre invalide refusé"""
+        response = client.get('/export/csv?category=inexistante')
+
+        assert response.status_code == 400
+        assert 'Catégorie inconnue' in response.get_json()['error']
+
+
+class TestWebTransactions:
+    """Tests de la page des transactions"""
+
+    def test_add_identical_transaction(self, client):
+        """Test: une saisie identique est ajoutée, avec un avertissement"""
+        form = {'amount': '45', 'description': 'Courses', 'type': 'dépense',
+                'category': 'alimentation', 'date': '2026-01-05'}
+
+        response = client.post('/transactions/add', data=form, follow_redirects=True)
+
+        html = response.get_data(as_text=True)
+        assert "Transaction ajoutée" in html
+        assert "identique était déjà enregistrée (ID: 1)" in html
+        assert web_app.transaction_service.count_transactions() == 4
+
+    def test_transactions_page_filters(self, client):
+        """Test: filtres appliqués en SQL, total affiché"""
+        response = client.get('/transactions?type=dépense')
+
+        html = response.get_data(as_text=True)
+        assert response.status_code == 200
+        assert "Courses" in html and "Cinéma" in html
+        assert "Salaire" not in html
+        assert "2 transaction(s)" in html
+
+    def test_transactions_page_pagination(self, client):
+        """Test: lien vers la page suivante avec un curseur"""
+        first = client.get('/transactions?page_size=2').get_data(as_text=True)
+        assert "Page suivante" in first
+        assert "Salaire" not in first
+
+        cursor = first.split('cursor=')[1].split('&')[0].split('"')[0]
+        second = client.get(f'/transactions?page_size=2&cursor={cursor}').get_data(as_text=True)
+        assert "Salaire" in second
+        assert "Page suivante" not in second
+
+    def test_transactions_page_invalid_cursor(self, client):
+        """Test: curseur invalide, retour à la première page"""
+        response = client.get('/transactions?cursor=invalide')
+
+        assert response.status_code == 302
+
+
+class TestWebIdempotency:
+    """Tests des clés d'idempotence des formulaires d'ajout"""
+
+    FORM = {'amount': '4', 'description': 'Pain', 'type': 'dépense',
+            'category': 'alimentation', 'date': '2026-01-09'}
+
+    def count(self):
+        return web_app.transaction_service.count_transactions()
+
+    def test_repeated_submit_replayed(self, client):
+        """Test: même clé, une seule écriture et la même redirection"""
+        before = self.count()
+        first = client.post('/transactions/add', data=self.FORM, headers={'Idempotency-Key': 'abc'})
+        second = client.post('/transactions/add', data=self.FORM, headers={'Idempotency-Key': 'abc'})
+
+        assert self.count() == before + 1
+        assert second.status_code == first.status_code == 302
+        assert second.headers['Location'] == first.headers['Location']
+        assert second.headers['Idempotent-Replayed'] == 'true'
+        assert "Transaction ajoutée" in client.get(second.headers['Location']).get_data(as_text=True)
+
+    def test_form_field_and_scope(self, client):
+        """Test: clé du champ caché, propre à chaque route ; sans clé, route exécutée normalement"""
+        page = client.get('/budgets').get_data(as_text=True)
+        key = page.split('name="idempotency_key" value="')[1].split('"')[0]
+        budget = {'category': 'loisirs', 'amount': '50', 'start_date': '2026-01-01',
+                  'end_date': '2026-01-31', 'idempotency_key': key}
+
+        client.post('/budgets/add', data=budget)
+        client.post('/budgets/add', data=budget)
+        client.post('/transactions/add', data=dict(self.FORM, idempotency_key=key))
+
+        assert len(web_app.budget_service.list_budgets()) == 1
+        assert self.count() == 4
+
+        client.post('/transactions/add', data=dict(self.FORM, description='Beurre'))
+        assert self.count() == 5
+
+    def test_key_conflicts(self, client):
+        """Test: clé réutilisée avec une autre requête (422), clé invalide (400)"""
+        client.post('/transactions/add', data=self.FORM, headers={'Idempotency-Key': 'k1'})
+
+        response = client.post('/transactions/add', data=dict(self.FORM, amount='5'),
+                               headers={'Idempotency-Key': 'k1'})
+        assert response.status_code == 422
+        assert client.post('/transactions/add', data=self.FORM,
+                           headers={'Idempotency-Key': 'x' * 300}).status_code == 400
+
+    def test_form_key_conflict_flashed(self, client):
+        """Test: formulaire renvoyé modifié avec la même clé, message sur la page et pas de JSON"""
+        client.post('/transactions/add', data=dict(self.FORM, idempotency_key='k3'))
+        response = client.post('/transactions/add',
+                               data=dict(self.FORM, amount='5', idempotency_key='k3'))
+
+        assert response.status_code == 302
+        assert response.headers['Location'].endswith('/transactions')
+        assert "déjà utilisée" in client.get('/transactions').get_data(as_text=True)
+        assert self.count() == 4
+
+    def test_failed_write_releases_key(self, client):
+        """Test: une erreur n'est pas enregistrée, le formulaire corrigé passe avec la même clé"""
+        invalid = dict(self.FORM, category='inconnue', idempotency_key='k4')
+        client.post('/transactions/add', data=invalid)
+        response = client.post('/transactions/add', data=invalid)
+        assert 'Idempotent-Replayed' not in response.headers
+        assert self.count() == 3
+
+        response = client.post('/transactions/add', data=dict(self.FORM, idempotency_key='k4'))
+        assert response.status_code == 302
+        assert self.count() == 4
+        assert "Transaction ajoutée" in client.get('/transactions').get_data(as_text=True)
+
+    def test_expired_key(self, client):
+        """Test: une clé expirée est purgée et peut resservir"""
+        service = web_app.idempotency_service
+        service.ttl = 0
+        client.post('/transactions/add', data=self.FORM, headers={'Idempotency-Key': 'k2'})
+        client.post('/transactions/add', data=dict(self.FORM, description='Lait'),
+                    headers={'Idempotency-Key': 'k2'})
+
+        assert self.count() == 5
+        assert service.evict_expired() == 1
+
+
+class TestWebDashboard:
+    """Tests du tableau de bord"""
+
+    def test_dashboard_budgets_and_totals(self, client):
+        """Test: totaux et statuts des budgets depuis les agrégats"""
+        web_app.budget_service.create_budget(Budget(1, 40, date(2026, 1, 1), date(2026, 1, 31)))
+
+        html = client.get('/').get_data(as_text=True)
+
+        assert "Alimentation" in html
+        assert "Dépassé" in html
+
+    def test_dashboard_not_modified(self, client, monkeypatch):
+        """Test: 304 sans recalcul tant que les données n'ont pas changé"""
+        first = client.get('/')
+        etag = first.headers['ETag']
+
+        def fail():
+            raise AssertionError("tableau de bord recalculé")
+        monkeypatch.setattr(web_app.stats_service, 'get_totals', fail)
+
+        second = client.get('/', headers={'If-None-Match': etag})
+        assert second.status_code == 304
+        assert second.headers['ETag'] == etag
+
+    def test_dashboard_etag_changes_with_data(self, client):
+        """Test: une écriture change l'ETag"""
+        etag = client.get('/').headers['ETag']
+
+        web_app.transaction_service.add_transaction(Transaction(
+            amount=9.9, description="Pain", type="dépense", category_id=1, date=date(2026, 1, 9)
+        ))
+        response = client.get('/', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_threaded_requests(self, threaded_client):
+        """Test: une connexion par thread de requête, fermée avec la réponse, même ETag"""
+        client, db = threaded_client
+        response = in_thread(lambda: client.get('/'))
+        assert response.status_code == 200
+        assert db.open_connections == 0
+        etag = response.headers['ETag']
+
+        for _ in range(2):
+            response = in_thread(lambda: client.get('/', headers={'If-None-Match': etag}))
+            assert response.status_code == 304
+            assert db.open_connections == 0
+
+        in_thread(lambda: client.post('/transactions/add', data={
+            'amount': '10', 'description': 'Pain', 'type': 'dépense',
+            'category_id': '1', 'date': '2026-01-06'
+        }))
+        response = in_thread(lambda: client.get('/', headers={'If-None-Match': etag}))
+        assert response.status_code == 200
+        assert db.open_connections == 0
+
+    def test_budget_statuses_shared_between_pages(self, client, monkeypatch):
+        """Test: statuts calculés une fois par version des données pour / et /budgets"""
+        web_app.budget_service.create_budget(Budget(1, 40, date(2026, 1, 1), date(2026, 1, 31)))
+        calls = []
+        get_statuses = web_app.budget_service.get_budget_statuses
+        monkeypatch.setattr(web_app.budget_service, 'get_budget_statuses',
+                            lambda *args: calls.append(1) or get_statuses(*args))
+
+        client.get('/')
+        html = client.get('/budgets').get_data(as_text=True)
+
+        assert len(calls) == 1
+        assert 'progress-bar danger' in html
+
+    def test_budget_fragment_reused(self, client, monkeypatch):
+        """Test: une écriture sans effet sur les budgets ne rend pas à nouveau leur tableau"""
+        web_app.budget_service.create_budget(Budget(1, 40, date(2026, 1, 1), date(2026, 1, 31)))
+        client.get('/')
+        rendered = []
+        render = web_app.render_template
+        monkeypatch.setattr(web_app, 'render_template',
+                            lambda name, **context: rendered.append(name) or render(name, **context))
+
+        web_app.transaction_service.add_transaction(Transaction(
+            amount=100.0, description="Prime", type="revenu", category_id=8, date=date(2026, 1, 9)
+        ))
+        html = client.get('/').get_data(as_text=True)
+
+        assert 'fragments/dashboard_budgets.html' not in rendered
+        assert 'fragments/summary_cards.html' in rendered
+        assert "2100.00 €" in html and "Dépassé" in html
+
+
+class TestWebApi:
+    """Tests de l'API JSON v1"""
+
+    def test_api_transactions_pagination_and_fields(self, client):
+        """Test: parcours par curseur avec projection des champs"""
+        first = client.get('/api/v1/transactions?limit=2&fields=description,amount').get_json()
+
+        assert first['total'] == 3
+        assert first['data'] == [
+            {'description': "Cinéma", 'amount': 12.5},
+            {'description': "Courses", 'amount': 45.0}
+        ]
+
+        second = client.get(first['next']).get_json()
+        assert [t['description'] for t in second['data']] == ["Salaire"]
+        assert second['next_cursor'] is None
+
+    def test_api_transactions_filters(self, client):
+        """Test: filtres en SQL, catégorie par nom ou par ID"""
+        by_name = client.get('/api/v1/transactions?category=alimentation').get_json()
+        by_id = client.get('/api/v1/transactions?category=1&type=dépense').get_json()
+
+        assert by_name['data'] == by_id['data']
+        assert by_id['data'][0]['category'] == 'alimentation'
+
+    def test_api_compact_serialization(self, client):
+        """Test: JSON compact, accents non échappés"""
+        body = client.get('/api/v1/transactions').get_data(as_text=True)
+
+        assert '", "' not in body and '": ' not in body
+        assert 'Cinéma' in body
+
+    def test_api_errors(self, client):
+        """Test: paramètres invalides (400) et ressource absente (404)"""
+        assert client.get('/api/v1/transactions?fields=inconnu').status_code == 400
+        assert client.get('/api/v1/transactions?limit=0').status_code == 400
+        assert client.get('/api/v1/budgets?category=inexistante').status_code == 400
+        missing = client.get('/api/v1/transactions/9999')
+        assert missing.status_code == 404
+        assert 'introuvable' in missing.get_json()['error']
+
+    def test_api_transaction_by_id(self, client):
+        """Test: lecture d'une transaction"""
+        first = client.get('/api/v1/transactions?limit=1&fields=id').get_json()['data'][0]
+
+        data = client.get(f"/api/v1/transactions/{first['id']}").get_json()['data']
+        assert data['description'] == "Cinéma"
+
+    def test_api_budgets_categories_statistics(self, client):
+        """Test: budgets, catégories et statistiques"""
+        web_app.budget_service.create_budget(Budget(1, 100, date(2026, 1, 1), date(2026, 1, 31)))
+
+        budgets = client.get('/api/v1/budgets?fields=category,spent').get_json()
+        assert budgets['data'] == [{'category': 'alimentation', 'spent': 45.0}]
+
+        categories = client.get('/api/v1/categories').get_json()['data']
+        assert {'id': 1, 'name': 'alimentation'} in categories
+
+        totals = client.get('/api/v1/statistics/totals').get_json()['data']
+        assert totals['balance'] == 1942.5
+
+        monthly = client.get('/api/v1/statistics/monthly?year=2026&month=1').get_json()['data']
+        assert monthly['transactions_count'] == 3
+
+        percentiles = client.get('/api/v1/statistics/percentiles?p=50').get_json()['data']
+        assert percentiles['count'] == 2
+
+    def test_api_bulk_insert(self, client):
+        """Test: ajout en masse, résultats par ligne et IDs, doublons écartés sur demande"""
+        records = [
+            {'date': '2026-02-0%d' % day, 'amount': day, 'description': f'Achat {day}',
+             'type': 'dépense', 'category': 'alimentation'}
+            for day in range(1, 6)
+        ]
+        records.append({'date': '2026-02-06', 'amount': 0, 'description': 'Nul', 'type': 'dépense', 'category_id': 1})
+
+        response = client.post('/api/v1/transactions/bulk', json={'transactions': records})
+
+        assert response.status_code == 201
+        result = response.get_json()
+        assert result['imported'] == 5
+        assert result['results'][-1]['status'] == 'rejected'
+        ids = [r['id'] for r in result['results'][:5]]
+        stored = client.get(f'/api/v1/transactions/{ids[2]}').get_json()['data']
+        assert stored['description'] == 'Achat 3'
+
+        skipped = client.post(
+            '/api/v1/transactions/bulk', json={'transactions': records[:5], 'on_duplicate': 'skip'}
+        ).get_json()
+        assert skipped['skipped'] == 5
+        assert [r['status'] for r in skipped['results']] == ['skipped'] * 5
+        assert [r['id'] for r in skipped['results']] == ids
+
+        # Par défaut, une transaction identique envoyée plus tard est une nouvelle transaction
+        again = client.post('/api/v1/transactions/bulk', json=records[:1]).get_json()
+        assert again['imported'] == 1
+        assert again['results'][0]['id'] not in ids
+
+    def test_api_bulk_strict_and_limits(self, client, monkeypatch):
+        """Test: mode strict (422, rien d'écrit), corps invalide et taille maximale"""
+        records = [
+            {'date': '2026-02-01', 'amount': 4, 'description': 'Ok', 'type': 'dépense', 'category_id': 1},
+            {'date': '2026-02-01', 'amount': 4, 'description': 'Ko', 'type': 'autre', 'category_id': 1},
+        ]
+
+        strict = client.post('/api/v1/transactions/bulk', json={'transactions': records, 'strict': True})
+        assert strict.status_code == 422
+        assert client.get('/api/v1/transactions').get_json()['total'] == 3
+
+        assert client.post('/api/v1/transactions/bulk', json={'foo': 1}).status_code == 400
+        assert client.post('/api/v1/transactions/bulk', data='pas du json').status_code == 400
+
+        monkeypatch.setattr(web_app, 'API_BULK_LIMIT', 1)
+        assert client.post('/api/v1/transactions/bulk', json=records).status_code == 413
+
+
+class TestWebEvents:
+    """Tests du flux d'événements (SSE)"""
+
+    def test_event_stream_pushes_writes(self, client):
+        """Test: une transaction ajoutée est poussée avec l'alerte de budget dépassé"""
+        web_app.budget_service.create_budget(Budget(1, 50, date(2026, 1, 1), date(2026, 1, 31)))
+        response = client.get('/events?types=transaction,alert')
+        assert response.mimetype == 'text/event-stream'
+        frames = iter(response.response)
+        assert next(frames).startswith(b'retry:')
+
+        client.post('/transactions/add', data={
+            'amount': '10', 'description': 'Pain', 'type': 'dépense',
+            'category': 'alimentation', 'date': '2026-01-10'
+        })
+
+        transaction = next(frames).decode('utf-8')
+        alert = next(frames).decode('utf-8')
+        assert 'event: transaction' in transaction and '"description":"Pain"' in transaction
+        assert 'event: alert' in alert and 'Budget alimentation dépassé de 5.00 €' in alert
+        response.close()
+        assert web_app.events.subscriber_count == 1
+
+    def test_event_stream_replay(self, client):
+        """Test: Last-Event-ID rejoue les événements manqués"""
+        response = client.get('/events?types=transaction', headers={'Last-Event-ID': '0'})
+        frames = iter(response.response)
+        next(frames)
+
+        replayed = [next(frames).decode('utf-8') for _ in range(3)]
+        assert 'Courses' in replayed[0] and 'Cinéma' in replayed[1] and 'Salaire' in replayed[2]
+        assert replayed[0].startswith('id: 1\n')
+        response.close()
+
+    def test_event_stream_invalid_params(self, client):
+        """Test: type d'événement ou Last-Event-ID invalide"""
+        assert client.get('/events?types=inconnu').status_code == 400
+        assert client.get('/events', headers={'Last-Event-ID': 'x'}).status_code == 400
+
+
+class TestWebMetrics:
+    """Tests de l'endpoint /metrics"""
+
+    @pytest.fixture(autouse=True)
+    def metrics(self):
+        """Métriques activées avant l'ouverture de la base du client (connexion instrumentée)"""
+        registry = web_app.enable_metrics()
+        yield registry
+        web_app.disable_metrics()
+
+    def test_request_metrics(self, client):
+        """Test: latence et SQL par route, accès au cache du tableau de bord"""
+        etag = client.get('/').headers['ETag']
+        assert client.get('/', headers={'If-None-Match': etag}).status_code == 304
+        client.get('/api/v1/transactions')
+        client.get('/inexistante')
+
+        response = client.get('/metrics')
+        lines = response.get_data(as_text=True).splitlines()
+
+        assert response.content_type.startswith('text/plain; version=0.0.4')
+        assert 'mybudget_http_requests_total{method="GET",route="/",status="200"} 1' in lines
+        assert 'mybudget_http_requests_total{method="GET",route="/",status="304"} 1' in lines
+        assert 'mybudget_http_requests_total{method="GET",route="unmatched",status="404"} 1' in lines
+        assert 'mybudget_http_request_duration_seconds_count{method="GET",route="/api/v1/transactions"} 1' in lines
+        assert 'mybudget_cache_requests_total{cache="dashboard_etag",result="hit"} 1' in lines
+        assert 'mybudget_cache_requests_total{cache="dashboard_etag",result="miss"} 1' in lines
+        assert 'mybudget_jobs{status="queued"} 0' in lines
+
+        sql = web_app.metrics.get('mybudget_http_request_sql_queries')
+        assert sql.count(('/api/v1/transactions',)) == 1
+        assert web_app.metrics.get('mybudget_sql_queries_total').value() > 0
+
+    def test_metrics_disabled(self, client, metrics):
+        """Test: désactivées, pas d'endpoint ni de mesure"""
+        web_app.disable_metrics()
+        client.get('/')
+
+        assert client.get('/metrics').status_code == 404
+        assert metrics.get('mybudget_http_request_duration_seconds').count(('GET', '/')) == 0
+        assert DatabaseManager.query_observer is None
+
+
+class TestWebJobs:
+    """Tests des tâches de fond (exports et rapports)"""
+
+    @pytest.fixture
+    def jobs(self, client, tmp_path, monkeypatch):
+        """File de tâches sur une base fichier (les workers ouvrent leur connexion)"""
+        db = DatabaseManager(str(tmp_path / "budget.db"))
+        TransactionService(db).add_transaction(Transaction(
+            amount=45.0, description="Courses", type="dépense", category_id=1, date=date(2026, 1, 5)
+        ))
+        service = JobService(db, results_dir=str(tmp_path / "jobs"))
+        monkeypatch.setattr(web_app, 'job_service', service)
+        yield service
+        service.stop(timeout=5)
+        db.close()
+
+    def test_job_lifecycle(self, client, jobs):
+        """Test: 202 immédiat, suivi de la progression, téléchargement puis suppression"""
+        response = client.post('/api/v1/jobs', json={
+            'kind': 'export_transactions', 'params': {'format': 'json', 'category': 'alimentation'}
+        })
+
+        assert response.status_code == 202
+        job = response.get_json()['data']
+        assert response.headers['Location'].endswith(f"/api/v1/jobs/{job['id']}")
+        assert job['params'] == {'format': 'json', 'category_id': 1}
+        assert 'result_path' not in job
+
+        jobs.wait(job['id'])
+        status = client.get(job['url']).get_json()['data']
+        assert status['status'] == 'done' and status['percentage'] == 100.0
+
+        download = client.get(status['download'])
+        assert 'attachment' in download.headers['Content-Disposition']
+        assert json.loads(download.get_data(as_text=True))['count'] == 1
+
+        listed = client.get('/api/v1/jobs?status=done').get_json()['data']
+        assert [j['id'] for j in listed] == [job['id']]
+
+        assert client.delete(job['url']).status_code == 204
+        assert client.get(job['url']).status_code == 404
+
+    def test_job_errors(self, client, jobs):
+        """Test: tâche invalide (400), introuvable (404), non terminée (409)"""
+        assert client.post('/api/v1/jobs', json={'kind': 'inconnu'}).status_code == 400
+        assert client.post('/api/v1/jobs', json={'kind': 'year_report', 'params': []}).status_code == 400
+        assert client.post('/api/v1/jobs', json={'kind': ['year_report']}).status_code == 400
+        assert client.post('/api/v1/jobs', json={
+            'kind': 'export_budgets', 'params': {'compress': {'gzip': True}}
+        }).status_code == 400
+        assert client.post('/api/v1/jobs', json={
+            'kind': 'export_budgets', 'params': {'category': 'inexistante'}
+        }).status_code == 400
+        assert client.get('/api/v1/jobs/9999').status_code == 404
+        assert client.get('/api/v1/jobs?status=perdu').status_code == 400
+
+        jobs.db.execute_update(
+            "INSERT INTO jobs (kind, params, status, created_at) VALUES ('export_budgets', '{}', 'queued', '2026-01-01')"
+        )
+        assert client.get('/api/v1/jobs/1/download').status_code == 409
+        assert client.delete('/api/v1/jobs/1').status_code == 409
@@ -0,0 +1,92 @@
+# tests/unit/test_columnar.py
+
+import pytest
+from array import array
+from src.utils.columnar import ColumnarReader, ColumnarWriter
+
+class TestColumnar:
+    """Tests du format binaire colonnaire"""
+    
+    SCHEMA = [('id', 'q'), ('amount', 'd'), ('flag', 'b'), ('label', 's')]
+    
+    def _write(self, filepath, groups):
+        with open(filepath, 'wb') as f:
+            writer = ColumnarWriter(f, self.SCHEMA)
+            for group in groups:
+                writer.write_row_group(group)
+        return writer.rows
+    
+    def test_round_trip_multiple_groups(self, tmp_path):
+        """Test: les groupes relus sont identiques aux groupes écrits"""
+        filepath = tmp_path / "data.mbcol"
+        groups = [
+            {'id': [1, 2, 3], 'amount': [1.5, -2.25, 1e6], 'flag': [0, 1, 0], 'label': ['a', 'été', '']},
+            {'id': [4], 'amount': [0.1], 'flag': [1], 'label': ['Café ☕']},
+        ]
+        
+        assert self._write(filepath, groups) == 4
+        
+        with ColumnarReader(str(filepath)) as reader:
+            assert reader.schema == self.SCHEMA
+            read = [
+                {name: list(values) for name, values in group.items()}
+                for group in reader.iter_row_groups()
+            ]
+        assert read == groups
+    
+    def test_numeric_columns_are_zero_copy_views(self, tmp_path):
+        """Test: les colonnes numériques sont des memoryview typées"""
+        filepath = tmp_path / "data.mbcol"
+        self._write(filepath, [{'id': [7, 8], 'amount': [1.0, 2.0], 'flag': [1, 1], 'label': ['x', 'y']}])
+        
+        reader = ColumnarReader(str(filepath))
+        group = next(reader.iter_row_groups())
+        assert isinstance(group['amount'], memoryview)
+        assert group['amount'].format == 'd'
+        assert group['id'].tolist() == [7, 8]
+        del group
+        reader.close()
+    
+    def test_read_columns_concatenates_groups(self, tmp_path):
+        """Test: read_columns retourne des array.array complets"""
+        filepath = tmp_path / "data.mbcol"
+        self._write(filepath, [
+            {'id': [1, 2], 'amount': [1.0, 2.0], 'flag': [0, 0], 'label': ['a', 'b']},
+            {'id': [3], 'amount': [3.0], 'flag': [1], 'label': ['c']},
+        ])
+        
+        with ColumnarReader(str(filepath)) as reader:
+            columns = reader.read_columns()
+        
+        assert columns['id'] == array('q', [1, 2, 3])
+        assert sum(columns['amount']) == 6.0
+        assert columns['label'] == ['a', 'b', 'c']
+    
+    def test_empty_file_has_schema_only(self, tmp_path):
+        """Test: un fichier sans ligne se relit sans groupe"""
+        filepath = tmp_path / "empty.mbcol"
+        self._write(filepath, [{'id': [], 'amount': [], 'flag': [], 'label': []}])
+        
+        with ColumnarReader(str(filepath)) as reader:
+            assert list(reader.iter_row_groups()) == []
+            assert reader.schema == self.SCHEMA
+    
+    def test_invalid_inputs(self, tmp_path):
+        """Test: type inconnu, colonnes de longueurs différentes, fichier invalide"""
+        filepath = tmp_path / "data.mbcol"
+        with open(filepath, 'wb') as f:
+            with pytest.raises(ValueError):
+                ColumnarWriter(f, [('x', 'z')])
+            writer = ColumnarWriter(f, self.SCHEMA)
+            with pytest.raises(ValueError):
+                writer.write_row_group({'id': [1], 'amount': [], 'flag': [1], 'label': ['a']})
+        
+        bad = tmp_path / "bad.mbcol"
+        bad.write_bytes(b'not a columnar file')
+        with pytest.raises(ValueError):
+            ColumnarReader(str(bad))
+        
+        empty = tmp_path / "zero.mbcol"
+        empty.write_bytes(b'')
+        with pytest.raises(ValueError):
+            ColumnarReader(str(empty))
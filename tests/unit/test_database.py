@@ -1,6 +1,8 @@
 import pytest
+import sqlite3
+import threading
 from datetime import date
-from src.database.db_manager import DatabaseManager
+from src.database.db_manager import DatabaseManager, ThreadLocalDatabaseManager
 
 class TestDatabaseManager:
     """Tests du gestionnaire de base de données"""
@@ -126,6 +128,270 @@ class TestDatabaseManager:
 
         db.close()
 
+    def test_rollups_maintained_by_triggers(self):
+        """Test: les agrégats suivent insertions, modifications et suppressions"""
+        db = DatabaseManager(":memory:")
+
+        t_id = db.execute_update(
+            "INSERT INTO transactions (amount, description, type, category_id, date) VALUES (?, ?, ?, ?, ?)",
+            (40.0, "Test", "dépense", 1, "2026-01-10")
+        )
+        db.execute_update(
+            "INSERT INTO transactions (amount, description, type, category_id, date) VALUES (?, ?, ?, ?, ?)",
+            (10.0, "Test 2", "dépense", 1, "2026-01-20")
+        )
+
+        month = db.execute_query(
+            "SELECT total, count FROM transaction_rollups WHERE level = 'month' AND period = '2026-01'"
+        )
+        assert month == [{'total': 50.0, 'count': 2}]
+
+        # Déplacer la première transaction en février
+        db.execute_update("UPDATE transactions SET date = '2026-02-01' WHERE id = ?", (t_id,))
+        months = db.execute_query(
+            "SELECT period, total FROM transaction_rollups WHERE level = 'month' ORDER BY period"
+        )
+        assert months == [{'period': '2026-01', 'total': 10.0}, {'period': '2026-02', 'total': 40.0}]
+
+        # Supprimer : les périodes vides disparaissent
+        db.execute_update("DELETE FROM transactions WHERE id = ?", (t_id,))
+        days = db.execute_query("SELECT period FROM transaction_rollups WHERE level = 'day'")
+        assert days == [{'period': '2026-01-20'}]
+
+        years = db.execute_query("SELECT period, total, count FROM rollup_years")
+        assert years == [{'period': '2026', 'total': 10.0, 'count': 1}]
+
+        db.close()
+
+    def test_rollups_applied_for_reserved_sequence(self):
+        """Test: une insertion avec séquence réservée met à jour les agrégats par bloc"""
+        db = DatabaseManager(":memory:")
+        db.execute_update(
+            "INSERT INTO transactions (amount, description, type, category_id, date) VALUES (?, ?, ?, ?, ?)",
+            (5.0, "Unitaire", "dépense", 1, "2026-01-10")
+        )
+
+        first_seq = db.reserve_change_sequence(2)
+        assert first_seq == 2
+        db.connection.executemany(
+            "INSERT INTO transactions (amount, description, type, category_id, date, change_seq) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(10.0, "Bloc 1", "dépense", 1, "2026-01-10", 2), (20.0, "Bloc 2", "dépense", 1, "2026-02-03", 3)]
+        )
+        db.apply_rollups(first_seq, first_seq + 1)
+
+        query = "SELECT level, period, total, count FROM transaction_rollups ORDER BY level, period"
+        applied = db.execute_query(query)
+        db.rebuild_rollups()
+        assert applied == db.execute_query(query)
+        assert db.get_change_sequence() == 3
+        db.close()
+
+    def test_rollups_backfilled_for_existing_database(self, tmp_path, monkeypatch):
+        """Test: une base existante sans agrégats est recalculée à l'ouverture"""
+        db_path = str(tmp_path / "budget.db")
+        db = DatabaseManager(db_path)
+        db.execute_update(
+            "INSERT INTO transactions (amount, description, type, category_id, date) VALUES (?, ?, ?, ?, ?)",
+            (25.0, "Test", "dépense", 1, "2026-01-10")
+        )
+        db.execute_update("DELETE FROM transaction_rollups")
+        # Base écrite avant la version de schéma : migrée à la prochaine ouverture
+        db.connection.execute("PRAGMA user_version = 0")
+        db.close()
+
+        # Le recalcul ne valide rien : la migration garde son verrou d'écriture
+        locked = []
+        create_change_tracking = DatabaseManager._create_change_tracking
+        monkeypatch.setattr(DatabaseManager, '_create_change_tracking', lambda self: (
+            locked.append(self.connection.in_transaction), create_change_tracking(self)
+        ))
+        db = DatabaseManager(db_path)
+        rows = db.execute_query("SELECT level, total FROM transaction_rollups ORDER BY level")
+        assert rows == [{'level': 'day', 'total': 25.0}, {'level': 'month', 'total': 25.0}]
+        assert locked == [True]
+        db.close()
+
+    def test_missing_sketches_marked_by_migration(self, tmp_path):
+        """Test: une base sans sketches marque ses mois à reconstruire, une seule fois"""
+        db_path = str(tmp_path / "budget.db")
+        db = DatabaseManager(db_path)
+        db.execute_update(
+            "INSERT INTO transactions (amount, description, type, category_id, date) VALUES (?, ?, ?, ?, ?)",
+            (25.0, "Test", "dépense", 1, "2026-01-10")
+        )
+        db.connection.execute("PRAGMA user_version = 0")
+        db.close()
+
+        db = DatabaseManager(db_path)
+        rows = db.execute_query("SELECT category_id, type, month FROM quantile_sketch_dirty")
+        assert rows == [{'category_id': 1, 'type': 'dépense', 'month': '2026-01'}]
+        db.close()
+
+    def test_change_tracking_migrates_existing_database(self, tmp_path):
+        """Test: une base sans suivi des modifications est migrée à l'ouverture"""
+        import sqlite3
+        db_path = str(tmp_path / "legacy.db")
+        legacy = sqlite3.connect(db_path)
+        legacy.execute("""
+            CREATE TABLE transactions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, amount REAL NOT NULL,
+                description TEXT NOT NULL, type TEXT NOT NULL, category_id INTEGER NOT NULL,
+                date TEXT NOT NULL
+            )
+        """)
+        legacy.execute(
+            "INSERT INTO transactions (amount, description, type, category_id, date) VALUES (10, 'a', 'dépense', 1, '2026-01-01')"
+        )
+        legacy.commit()
+        legacy.close()
+
+        db = DatabaseManager(db_path)
+        assert db.execute_query("SELECT change_seq FROM transactions") == [{'change_seq': 1}]
+        assert db.get_change_sequence() == 1
+
+        db.execute_update(
+            "INSERT INTO transactions (amount, description, type, category_id, date) VALUES (?, ?, ?, ?, ?)",
+            (20.0, "b", "dépense", 1, "2026-01-02")
+        )
+        db.execute_update("DELETE FROM transactions WHERE id = 1")
+        assert db.get_change_sequence() == 3
+        assert db.execute_query("SELECT transaction_id, change_seq FROM transaction_tombstones") == [
+            {'transaction_id': 1, 'change_seq': 3}
+        ]
+        db.close()
+
+    def test_content_hashes_backfilled_for_existing_rows(self, tmp_path):
+        """Test: les lignes sans empreinte en reçoivent une à l'ouverture, doublons numérotés"""
+        db_path = str(tmp_path / "budget.db")
+        db = DatabaseManager(db_path)
+        for _ in range(2):
+            db.execute_update(
+                "INSERT INTO transactions (amount, description, type, category_id, date) VALUES (?, ?, ?, ?, ?)",
+                (4.0, "Café", "dépense", 1, "2026-01-10")
+            )
+        db.connection.execute("PRAGMA user_version = 0")
+        db.close()
+
+        db = DatabaseManager(db_path)
+        hashes = [row['content_hash'] for row in db.execute_query("SELECT content_hash FROM transactions")]
+        assert len(set(hashes)) == 2 and None not in hashes
+        indexes = [row['name'] for row in db.execute_query("PRAGMA index_list(transactions)")]
+        assert 'idx_transactions_content_hash' in indexes
+        db.close()
+
+    def test_data_version(self, tmp_path):
+        """Test: même version pour toutes les connexions, changée par leurs écritures"""
+        db_path = str(tmp_path / "budget.db")
+        reader = DatabaseManager(db_path)
+        writer = DatabaseManager(db_path)
+        version = reader.data_version()
+        assert reader.data_version() == version == writer.data_version()
+
+        writer.execute_update(
+            "INSERT INTO transactions (amount, description, type, category_id, date) VALUES (?, ?, ?, ?, ?)",
+            (4.0, "Café", "dépense", 1, "2026-01-10")
+        )
+        assert reader.data_version() != version
+
+        assert reader.data_version() == writer.data_version()
+
+        version = reader.data_version()
+        reader.execute_update("DELETE FROM transactions")
+        assert reader.data_version() != version
+
+        version = reader.data_version()
+        writer.execute_update(
+            "INSERT INTO budgets (category_id, amount, period_start, period_end) VALUES (?, ?, ?, ?)",
+            (1, 100.0, "2026-01-01", "2026-01-31")
+        )
+        assert reader.data_version() != version
+        reader.close()
+        writer.close()
+
+    def test_thread_local_connections(self, tmp_path):
+        """Test: une connexion par thread, partagée dans un même thread"""
+        db = ThreadLocalDatabaseManager(str(tmp_path / "budget.db"))
+        managers = []
+        thread = threading.Thread(target=lambda: managers.append(db.get()))
+        thread.start()
+        thread.join()
+
+        assert db.get() is db.get()
+        assert managers[0] is not db.get()
+        assert db.execute_query("SELECT COUNT(*) AS n FROM categories")[0]['n'] == 6
+        db.close()
+
+        with pytest.raises(ValueError):
+            ThreadLocalDatabaseManager(":memory:")
+
+    def test_thread_local_release(self, tmp_path):
+        """Test: connexion fermée en fin de requête, sauf pour les threads d'un pool"""
+        db = ThreadLocalDatabaseManager(str(tmp_path / "budget.db"))
+        counts = []
+
+        def request(keep):
+            if keep:
+                db.keep_open()
+            db.execute_query("SELECT 1")
+            db.release()
+            counts.append(db.open_connections)
+
+        for keep in (False, True):
+            thread = threading.Thread(target=request, args=(keep,))
+            thread.start()
+            thread.join()
+
+        assert counts == [0, 1]
+
+    def test_current_schema_opened_without_writes(self, tmp_path):
+        """Test: ouvrir une base à jour n'écrit rien (version vue par les autres inchangée)"""
+        db_path = str(tmp_path / "budget.db")
+        reader = DatabaseManager(db_path)
+        version = reader.connection.execute("PRAGMA data_version").fetchone()[0]
+
+        DatabaseManager(db_path).close()
+        assert reader.connection.execute("PRAGMA data_version").fetchone()[0] == version
+        reader.close()
+
+    def test_concurrent_schema_creation(self, tmp_path):
+        """Test: connexions ouvertes en même temps sur une base existante"""
+        path = str(tmp_path / "budget.db")
+        DatabaseManager(path).close()
+        errors = []
+
+        def open_connection():
+            try:
+                DatabaseManager(path).close()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=open_connection) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+
+    def test_query_observer(self):
+        """Test: connexions instrumentées seulement avec un observateur"""
+        observed = []
+        DatabaseManager.query_observer = lambda seconds, queries: observed.append(queries)
+        try:
+            db = DatabaseManager(":memory:")
+            observed.clear()
+            db.execute_query("SELECT * FROM categories")
+            list(db.iter_query("SELECT * FROM categories"))
+        finally:
+            DatabaseManager.query_observer = None
+
+        # Deux requêtes, la lecture des lignes mesurée sans être recomptée
+        assert sum(observed) == 2
+        assert len(observed) > 2
+        assert type(DatabaseManager(":memory:").connection) is sqlite3.Connection
+        db.close()
+
     def test_context_manager(self):
         """Test: utilisation comme context manager"""
         with DatabaseManager(":memory:") as db:
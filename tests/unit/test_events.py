@@ -0,0 +1,68 @@
+# tests/unit/test_events.py
+
+from src.utils.events import EventBus
+
+
+class TestEventBus:
+    """Tests du bus d'événements"""
+
+    def test_publish_and_filter(self):
+        """Test: les abonnés reçoivent les événements de leurs types, dans l'ordre"""
+        bus = EventBus()
+        everything, alerts = [], []
+        bus.subscribe(everything.append)
+        bus.subscribe(alerts.append, ['alert'])
+
+        bus.publish('budget', {'budget_id': 1})
+        bus.publish('alert', {'budget_id': 1})
+
+        assert [e.type for e in everything] == ['budget', 'alert']
+        assert [e.type for e in alerts] == ['alert']
+        assert everything[0].id < everything[1].id == bus.last_id
+
+    def test_unsubscribe(self):
+        """Test: plus aucun événement après le désabonnement"""
+        bus = EventBus()
+        received = []
+        unsubscribe = bus.subscribe(received.append)
+        unsubscribe()
+
+        bus.publish('budget', {})
+
+        assert received == []
+        assert bus.subscriber_count == 0
+
+    def test_replay(self):
+        """Test: rejoue les événements conservés après un ID"""
+        bus = EventBus(history_size=2)
+        first = bus.publish('transaction', {'id': 1})
+        bus.publish('transaction', {'id': 2})
+        bus.publish('transaction', {'id': 3})
+
+        assert [e.data['id'] for e in bus.replay(first.id)] == [2, 3]
+        assert [e.data['id'] for e in bus.replay(0)] == [2, 3]
+
+    def test_failing_subscriber_isolated(self):
+        """Test: un abonné en erreur n'empêche pas les autres de recevoir"""
+        bus = EventBus()
+        received = []
+
+        def fail(event):
+            raise RuntimeError("abonné en erreur")
+        bus.subscribe(fail)
+        bus.subscribe(received.append)
+
+        bus.publish('alert', {})
+
+        assert len(received) == 1
+
+    def test_subscriber_can_publish(self):
+        """Test: un abonné peut publier à son tour (budgets après une transaction)"""
+        bus = EventBus()
+        received = []
+        bus.subscribe(lambda event: bus.publish('budget', {}), ['transaction'])
+        bus.subscribe(received.append)
+
+        bus.publish('transaction', {})
+
+        assert [e.type for e in received] == ['transaction', 'budget']
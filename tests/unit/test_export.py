@@ -1,12 +1,15 @@
 # tests/unit/test_export.py
 
 import pytest
+import bz2
+import gzip
 import json
 import csv
+import lzma
 from datetime import date
 from pathlib import Path
 from src.models.transaction import Transaction
-from src.services.export_service import ExportService
+from src.services.export_service import ExportService, ExportProgress
 
 class TestExportService:
     """Tests du service d'export"""
@@ -147,6 +150,62 @@ class TestExportService:
             assert data['category'] == 'alimentation'
             assert data['budget']['budget_amount'] == 300
     
+    def test_export_all_budget_summaries(self, export_service, transaction_service, tmp_path):
+        """Test: résumés de tous les budgets dans un seul fichier"""
+        from src.models.budget import Budget
+        from src.services.budget_service import BudgetService
+        
+        budget_service = BudgetService(export_service.db, transaction_service)
+        budget_service.create_budget(Budget(1, 300, date(2026, 1, 1), date(2026, 1, 31)))
+        budget_service.create_budget(Budget(1, 300, date(2026, 2, 1), date(2026, 2, 28)))
+        budget_service.create_budget(Budget(3, 50, date(2026, 1, 1), date(2026, 1, 31)))
+        transaction_service.add_transaction(Transaction(100, "Test 1", "dépense", 1, date(2026, 1, 10)))
+        transaction_service.add_transaction(Transaction(50, "Test 2", "dépense", 1, date(2026, 1, 15)))
+        transaction_service.add_transaction(Transaction(20, "Test 3", "dépense", 1, date(2026, 2, 3)))
+        
+        filepath = tmp_path / "budgets.json.gz"
+        count = export_service.export_budget_summaries_to_json(str(filepath), chunk_size=1)
+        
+        assert count == 3
+        with gzip.open(filepath, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        assert data['count'] == 3
+        
+        summaries = {(s['category'], s['period']['start']): s for s in data['budgets']}
+        january = summaries[('alimentation', '2026-01-01')]
+        assert january['budget']['spent'] == 150
+        assert [t['description'] for t in january['transactions']] == ["Test 2", "Test 1"]
+        assert summaries[('alimentation', '2026-02-01')]['transactions'][0]['description'] == "Test 3"
+        assert summaries[('loisirs', '2026-01-01')]['transactions'] == []
+        
+        # Même contenu que l'export unitaire
+        single = tmp_path / "single.json"
+        export_service.export_budget_summary_to_json(str(single), 1, date(2026, 1, 1), date(2026, 1, 31))
+        with open(single, 'r', encoding='utf-8') as f:
+            expected = json.load(f)
+        assert january['budget'] == expected['budget']
+        assert january['transactions'] == expected['transactions']
+    
+    def test_export_budget_summaries_filtered(self, export_service, transaction_service, tmp_path):
+        """Test: sélection des budgets par catégorie et période"""
+        from src.models.budget import Budget
+        from src.services.budget_service import BudgetService
+        
+        budget_service = BudgetService(export_service.db, transaction_service)
+        budget_service.create_budget(Budget(1, 300, date(2026, 1, 1), date(2026, 1, 31)))
+        budget_service.create_budget(Budget(1, 300, date(2026, 2, 1), date(2026, 2, 28)))
+        budget_service.create_budget(Budget(3, 50, date(2026, 2, 1), date(2026, 2, 28)))
+        
+        filepath = tmp_path / "budgets.json"
+        count = export_service.export_budget_summaries_to_json(
+            str(filepath), category_id=1, start_date=date(2026, 2, 10)
+        )
+        
+        assert count == 1
+        with open(filepath, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        assert data['budgets'][0]['period'] == {'start': '2026-02-01', 'end': '2026-02-28'}
+    
     def test_export_creates_directories(self, export_service, sample_transactions, tmp_path):
         """Test: l'export crée les dossiers nécessaires"""
         filepath = tmp_path / "nested" / "folder" / "export.csv"
@@ -155,3 +214,240 @@ class TestExportService:
         
         assert filepath.exists()
         assert filepath.parent.exists()
+    
+    def test_export_to_csv_streams_in_chunks(self, export_service, sample_transactions, tmp_path):
+        """Test: export CSV par blocs avec suivi de progression"""
+        filepath = tmp_path / "chunked.csv"
+        reports = []
+        progress = ExportProgress(callback=lambda p: reports.append(p.rows), every=2)
+        
+        count = export_service.export_transactions_to_csv(
+            str(filepath), chunk_size=1, buffer_size=16, progress=progress
+        )
+        
+        assert count == sample_transactions
+        assert reports == [2]
+        assert progress.rows_per_second > 0
+        with open(filepath, 'r', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+            assert [r['date'] for r in rows] == ['2026-01-12', '2026-01-10', '2026-01-05']
+            assert rows[0]['amount'] == '75.0'
+    
+    def test_iter_transactions_csv(self, export_service, sample_transactions):
+        """Test: génération du CSV par morceaux de texte"""
+        chunks = list(export_service.iter_transactions_csv(category_id=4, chunk_size=10))
+        
+        assert chunks[0].startswith('id,date,amount,description,type,category_id')
+        assert len(chunks) == 2
+        assert 'Essence' in chunks[1]
+    
+    def test_export_to_json_streams_count_trailer(self, export_service, sample_transactions, tmp_path):
+        """Test: export JSON incrémental, count écrit après le tableau"""
+        for pretty in (True, False):
+            filepath = tmp_path / f"stream_{pretty}.json"
+            
+            count = export_service.export_transactions_to_json(str(filepath), pretty=pretty, chunk_size=2)
+            
+            with open(filepath, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            assert count == sample_transactions
+            assert data['count'] == sample_transactions
+            assert [t['description'] for t in data['transactions']] == ['Essence', 'Courses 2', 'Courses 1']
+            assert list(data) == ['export_date', 'transactions', 'count']
+    
+    def test_export_to_json_empty(self, export_service, tmp_path):
+        """Test: export JSON sans transaction"""
+        filepath = tmp_path / "empty.json"
+        
+        assert export_service.export_transactions_to_json(str(filepath)) == 0
+        with open(filepath, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+            assert data['transactions'] == []
+            assert data['count'] == 0
+    
+    def test_export_to_jsonl(self, export_service, sample_transactions, tmp_path):
+        """Test: export JSON Lines, un objet par ligne"""
+        filepath = tmp_path / "transactions.jsonl"
+        
+        count = export_service.export_transactions_to_jsonl(str(filepath), category_id=1)
+        
+        assert count == 2
+        with open(filepath, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        assert len(lines) == 2
+        first = json.loads(lines[0])
+        assert first['description'] == 'Courses 2'
+        assert set(first) == {'id', 'amount', 'description', 'type', 'category_id', 'date'}
+    
+    @pytest.mark.parametrize("extension, opener", [
+        ('.gz', gzip.open),
+        ('.bz2', bz2.open),
+        ('.xz', lzma.open),
+    ])
+    def test_export_compressed_by_extension(self, export_service, sample_transactions, tmp_path, extension, opener):
+        """Test: compression choisie d'après l'extension"""
+        filepath = tmp_path / f"transactions.csv{extension}"
+        
+        count = export_service.export_transactions_to_csv(str(filepath))
+        
+        assert count == sample_transactions
+        with opener(filepath, 'rt', encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == sample_transactions
+    
+    def test_export_compressed_by_flag_and_level(self, export_service, sample_transactions, tmp_path):
+        """Test: compression forcée et niveau de compression"""
+        fast = tmp_path / "fast.json"
+        best = tmp_path / "best.json"
+        
+        export_service.export_transactions_to_json(str(fast), compress='gzip', compress_level=1)
+        export_service.export_transactions_to_jsonl(str(best), compress='xz', compress_level=9)
+        
+        with gzip.open(fast, 'rt', encoding='utf-8') as f:
+            assert json.load(f)['count'] == sample_transactions
+        with lzma.open(best, 'rt', encoding='utf-8') as f:
+            assert len(f.read().splitlines()) == sample_transactions
+    
+    def test_export_unknown_compression(self, export_service, tmp_path):
+        """Test: compression inconnue refusée"""
+        with pytest.raises(ValueError):
+            export_service.export_transactions_to_csv(str(tmp_path / "x.csv"), compress='zip')
+    
+    def test_export_partitioned_by_month(self, export_service, transaction_service, sample_transactions, tmp_path):
+        """Test: export partitionné par mois avec manifeste"""
+        transaction_service.add_transaction(Transaction(20, "Février", "dépense", 1, date(2026, 2, 3)))
+        output = tmp_path / "partitions"
+        
+        manifest = export_service.export_partitioned(str(output), export_format='csv', partition_by='month')
+        
+        assert manifest['total_rows'] == sample_transactions + 1
+        assert [p['key'] for p in manifest['partitions']] == ['2026-01', '2026-02']
+        assert [p['rows'] for p in manifest['partitions']] == [3, 1]
+        
+        with open(output / 'manifest.json', 'r', encoding='utf-8') as f:
+            assert json.load(f) == manifest
+        
+        import hashlib
+        first = manifest['partitions'][0]
+        assert hashlib.sha256((output / first['file']).read_bytes()).hexdigest() == first['sha256']
+    
+    def test_export_partitioned_by_category_with_filters(self, export_service, sample_transactions, tmp_path):
+        """Test: export partitionné par catégorie, filtré par date et compressé"""
+        manifest = export_service.export_partitioned(
+            str(tmp_path),
+            export_format='jsonl',
+            partition_by='category',
+            start_date=date(2026, 1, 6),
+            compress='gzip'
+        )
+        
+        assert [(p['key'], p['rows']) for p in manifest['partitions']] == [('category_1', 1), ('category_4', 1)]
+        assert manifest['partitions'][0]['file'] == 'transactions_category_1.jsonl.gz'
+    
+    def test_export_partitioned_parallel(self, tmp_path):
+        """Test: export partitionné sur un pool de processus"""
+        from src.database.db_manager import DatabaseManager
+        from src.services.transaction_service import TransactionService
+        
+        db = DatabaseManager(str(tmp_path / "budget.db"))
+        transaction_service = TransactionService(db)
+        for month in range(1, 7):
+            for day in range(1, 4):
+                transaction_service.add_transaction(
+                    Transaction(10 * day, f"Achat {day}", "dépense", 1, date(2026, month, day))
+                )
+        service = ExportService(db, transaction_service)
+        
+        parallel = service.export_partitioned(str(tmp_path / "parallel"), workers=3)
+        serial = service.export_partitioned(str(tmp_path / "serial"), workers=1)
+        db.close()
+        
+        assert len(parallel['partitions']) == 6
+        assert parallel['total_rows'] == 18
+        assert [p['sha256'] for p in parallel['partitions']] == [p['sha256'] for p in serial['partitions']]
+    
+    def test_export_partitioned_invalid_options(self, export_service, tmp_path):
+        """Test: options de partitionnement invalides"""
+        with pytest.raises(ValueError):
+            export_service.export_partitioned(str(tmp_path), partition_by='year')
+        with pytest.raises(ValueError):
+            export_service.export_partitioned(str(tmp_path), export_format='xml')
+    
+    def test_export_changes_since_watermark(self, export_service, transaction_service, sample_transactions, tmp_path):
+        """Test: export incrémental depuis le watermark enregistré"""
+        first = tmp_path / "changes_1.json"
+        result = export_service.export_changes_to_json(str(first), name='nightly')
+        
+        assert result['since'] == 0
+        assert result['count'] == sample_transactions
+        assert export_service.get_watermark('nightly') == result['watermark']
+        
+        # Modifier, supprimer et ajouter
+        transaction_service.update_transaction(1, Transaction(110, "Courses 1", "dépense", 1, date(2026, 1, 5)))
+        transaction_service.delete_transaction(2)
+        transaction_service.add_transaction(Transaction(5, "Café", "dépense", 1, date(2026, 1, 20)))
+        
+        second = tmp_path / "changes_2.json"
+        result = export_service.export_changes_to_json(str(second), name='nightly')
+        
+        with open(second, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        assert data['since'] == export_service.get_watermark('nightly') - 3
+        assert data['watermark'] == export_service.get_watermark('nightly')
+        assert [t['description'] for t in data['transactions']] == ['Courses 1', 'Café']
+        assert data['transactions'][0]['amount'] == 110
+        assert data['deleted'] == [2]
+        assert result['count'] == 2 and result['deleted_count'] == 1
+        
+        # Rien de nouveau : export vide
+        third = tmp_path / "changes_3.json"
+        result = export_service.export_changes_to_json(str(third), name='nightly')
+        assert result['count'] == 0 and result['deleted_count'] == 0
+    
+    def test_export_changes_explicit_since(self, export_service, sample_transactions, tmp_path):
+        """Test: watermark de départ explicite, watermarks indépendants par nom"""
+        filepath = tmp_path / "changes.json.gz"
+        
+        result = export_service.export_changes_to_json(str(filepath), since=2, name='other')
+        
+        assert result['count'] == 1
+        with gzip.open(filepath, 'rt', encoding='utf-8') as f:
+            assert json.load(f)['transactions'][0]['description'] == 'Essence'
+        assert export_service.get_watermark('default') == 0
+    
+    def test_export_columnar_round_trip(self, export_service, transaction_service, sample_transactions, tmp_path):
+        """Test: export colonnaire puis rechargement dans une autre base"""
+        from src.database.db_manager import DatabaseManager
+        from src.services.transaction_service import TransactionService
+        
+        filepath = tmp_path / "transactions.mbcol"
+        transaction_service.add_transaction(Transaction(1200, "Salaire", "revenu", 7, date(2026, 1, 31)))
+        
+        count = export_service.export_transactions_to_columnar(str(filepath), chunk_size=2)
+        assert count == sample_transactions + 1
+        
+        target_db = DatabaseManager(":memory:")
+        target_transactions = TransactionService(target_db)
+        loaded = ExportService(target_db, target_transactions).load_transactions_from_columnar(str(filepath))
+        
+        assert loaded == count
+        original = sorted((t.amount, t.description, t.type, t.category_id, t.date)
+                          for t in transaction_service.list_transactions())
+        reloaded = sorted((t.amount, t.description, t.type, t.category_id, t.date)
+                          for t in target_transactions.list_transactions())
+        assert reloaded == original
+        target_db.close()
+    
+    def test_export_columnar_as_arrays(self, export_service, sample_transactions, tmp_path):
+        """Test: l'export colonnaire se relit en tableaux pour l'analyse"""
+        from src.utils.columnar import ColumnarReader
+        
+        filepath = tmp_path / "alimentation.mbcol"
+        export_service.export_transactions_to_columnar(str(filepath), category_id=1)
+        
+        with ColumnarReader(str(filepath)) as reader:
+            columns = reader.read_columns()
+        
+        assert sum(columns['amount']) == 150
+        assert set(columns['type']) == {0}
+        assert date.fromordinal(max(columns['date'])) == date(2026, 1, 10)
@@ -0,0 +1,45 @@
+# tests/unit/test_idempotency.py
+
+import pytest
+from src.database.db_manager import DatabaseManager
+from src.services.idempotency_service import IdempotencyService
+
+
+@pytest.fixture
+def service():
+    db = DatabaseManager(":memory:")
+    yield IdempotencyService(db)
+    db.close()
+
+
+class TestIdempotencyService:
+    """Tests des clés d'idempotence"""
+
+    def test_reserve_then_replay(self, service):
+        """Test: clé nouvelle réservée, puis résultat rejoué"""
+        assert service.reserve('add_budget', 'k', [('amount', '50')]) is None
+        in_progress = service.reserve('add_budget', 'k', [('amount', '50')])
+        service.complete('add_budget', 'k', 302, {'location': '/budgets', 'flashes': []})
+        stored = service.reserve('add_budget', 'k', [('amount', '50')])
+
+        assert in_progress == {'matches': True, 'status': None, 'response': None}
+        assert stored['status'] == 302
+        assert stored['response']['location'] == '/budgets'
+        assert service.reserve('add_budget', 'k', [('amount', '60')])['matches'] is False
+
+    def test_release(self, service):
+        """Test: clé libérée après un échec, même si la réservation a été validée"""
+        service.reserve('add_transaction', 'k', [])
+        service.release('add_transaction', 'k')
+        assert service.reserve('add_transaction', 'k', []) is None
+
+        service.db.connection.commit()
+        service.release('add_transaction', 'k')
+        assert service.reserve('add_transaction', 'k', [('amount', '5')]) is None
+
+    def test_invalid_key(self, service):
+        """Test: clé vide ou trop longue"""
+        with pytest.raises(ValueError):
+            service.reserve('add_transaction', '', [])
+        with pytest.raises(ValueError):
+            service.reserve('add_transaction', 'x' * 256, [])
@@ -0,0 +1,162 @@
+# tests/unit/test_import.py
+
+import pytest
+import gzip
+import json
+from datetime import date
+from src.models.transaction import Transaction
+from src.services.export_service import ExportService
+from src.services.import_service import ImportService, detect_import_format, iter_json_records
+
+class TestImportService:
+    """Tests du service d'import"""
+    
+    @pytest.fixture
+    def export_service(self, db_manager, transaction_service):
+        """Fixture pour le service d'export"""
+        return ExportService(db_manager, transaction_service)
+    
+    @pytest.fixture
+    def import_service(self, db_manager, transaction_service):
+        """Fixture pour le service d'import"""
+        return ImportService(db_manager, transaction_service)
+    
+    @pytest.fixture
+    def sample_transactions(self, transaction_service):
+        """Crée des transactions de test"""
+        transaction_service.add_transaction(Transaction(100, "Courses", "dépense", 1, date(2026, 1, 5)))
+        transaction_service.add_transaction(Transaction(1200, "Salaire", "revenu", 6, date(2026, 1, 31)))
+        transaction_service.add_transaction(Transaction(75, "Essence, \"SP95\"", "dépense", 4, date(2026, 2, 2)))
+        return 3
+    
+    def _snapshot(self, transaction_service):
+        return sorted(
+            (t.amount, t.description, t.type, t.category_id, t.date)
+            for t in transaction_service.list_transactions()
+        )
+    
+    @pytest.mark.parametrize("filename, method", [
+        ("export.csv", "export_transactions_to_csv"),
+        ("export.json", "export_transactions_to_json"),
+        ("export.jsonl.gz", "export_transactions_to_jsonl"),
+    ])
+    def test_import_round_trip(self, db_manager, export_service, import_service, transaction_service,
+                               sample_transactions, tmp_path, filename, method):
+        """Test: un export réimporté donne les mêmes transactions"""
+        filepath = tmp_path / filename
+        getattr(export_service, method)(str(filepath))
+        before = self._snapshot(transaction_service)
+        db_manager.reset_data()
+        
+        result = import_service.import_file(str(filepath), batch_size=2)
+        
+        assert result['read'] == result['imported'] == sample_transactions
+        assert result['rejected'] == 0
+        assert result['rows_per_second'] > 0
+        assert self._snapshot(transaction_service) == before
+    
+    def test_import_compact_json_with_top_level_list(self, import_service, transaction_service, tmp_path):
+        """Test: JSON compact et liste au premier niveau"""
+        filepath = tmp_path / "list.json"
+        filepath.write_text(json.dumps([
+            {"date": "2026-03-01", "amount": 5, "description": "Pain ] [", "type": "dépense", "category": "Alimentation"},
+            {"date": "2026-03-02", "amount": 7, "description": "Bus", "type": "dépense", "category_id": 4},
+        ]), encoding='utf-8')
+        
+        result = import_service.import_file(str(filepath))
+        
+        assert result['imported'] == 2
+        assert {t.category_id for t in transaction_service.list_transactions()} == {1, 4}
+    
+    def test_iter_json_records_streams_large_document(self, tmp_path):
+        """Test: un document plus grand que le tampon de lecture est décodé en entier"""
+        filepath = tmp_path / "big.json.gz"
+        records = [{"id": i, "description": "x" * 50} for i in range(5000)]
+        with gzip.open(filepath, 'wt', encoding='utf-8') as f:
+            json.dump({"export_date": "2026-01-01", "transactions": records, "count": 5000}, f, indent=2)
+        
+        assert [r['id'] for r in iter_json_records(str(filepath))] == list(range(5000))
+    
+    def test_import_rejects_invalid_rows(self, import_service, transaction_service, tmp_path):
+        """Test: les lignes invalides sont comptées et détaillées, les autres importées"""
+        filepath = tmp_path / "import.csv"
+        filepath.write_text(
+            "date,amount,description,type,category_id\n"
+            "2026-01-10,10,Valide,dépense,1\n"
+            "2026-13-10,10,Date invalide,dépense,1\n"
+            "2026-01-10,abc,Montant invalide,dépense,1\n"
+            "2026-01-10,10,,dépense,1\n"
+            "2026-01-10,10,Type invalide,autre,1\n"
+            "2026-01-10,10,Catégorie inconnue,dépense,99\n",
+            encoding='utf-8'
+        )
+        
+        result = import_service.import_file(str(filepath))
+        
+        assert result['read'] == 6
+        assert result['imported'] == 1
+        assert result['rejected'] == 5
+        assert [e['record'] for e in result['errors']] == [2, 3, 4, 5, 6]
+        assert len(transaction_service.list_transactions()) == 1
+    
+    def test_import_strict_rolls_back(self, import_service, transaction_service, tmp_path):
+        """Test: en mode strict, une ligne invalide annule tout l'import"""
+        filepath = tmp_path / "import.jsonl"
+        filepath.write_text(
+            '{"date": "2026-01-10", "amount": 10, "description": "Valide", "type": "dépense", "category_id": 1}\n'
+            '{"date": "2026-01-10", "amount": 10, "description": "Sans type", "category_id": 1}\n',
+            encoding='utf-8'
+        )
+        
+        with pytest.raises(ValueError, match="Enregistrement 2"):
+            import_service.import_file(str(filepath), batch_size=1, strict=True)
+        
+        assert transaction_service.list_transactions() == []
+    
+    def test_import_dry_run_writes_nothing(self, export_service, import_service, transaction_service,
+                                           sample_transactions, tmp_path):
+        """Test: le mode simulation valide sans rien enregistrer"""
+        filepath = tmp_path / "export.csv"
+        export_service.export_transactions_to_csv(str(filepath))
+        
+        result = import_service.import_file(str(filepath), dry_run=True)
+        
+        assert result['dry_run'] is True
+        assert result['imported'] == sample_transactions
+        assert len(transaction_service.list_transactions()) == sample_transactions
+    
+    def test_import_records_results(self, import_service, transaction_service):
+        """Test: résultat par enregistrement, rejetés signalés à leur place"""
+        records = [
+            {'date': '2026-01-10', 'amount': 12.5, 'description': 'Marché', 'type': 'dépense', 'category': 'alimentation'},
+            {'date': '2026-01-11', 'amount': -3, 'description': 'Négatif', 'type': 'dépense', 'category_id': 1},
+            {'date': '2026-01-12', 'amount': 30, 'description': 'Vente', 'type': 'revenu', 'category_id': 6},
+            'pas un objet',
+        ]
+        
+        result = import_service.import_records(records)
+        
+        assert result['imported'] == 2
+        assert result['rejected'] == 2
+        statuses = [r['status'] for r in result['results']]
+        assert statuses == ['inserted', 'rejected', 'inserted', 'rejected']
+        assert transaction_service.get_transaction_by_id(result['results'][2]['id']).description == 'Vente'
+        
+        strict = import_service.import_records(records[:2] + [
+            {'date': '2026-02-01', 'amount': 1, 'description': 'X', 'type': 'dépense', 'category_id': 1}
+        ], strict=True)
+        assert strict['imported'] == 0
+        assert len(transaction_service.list_transactions()) == 2
+    
+    def test_resolve_category_and_format_detection(self, import_service):
+        """Test: catégorie par ID ou par nom, format déduit de l'extension"""
+        assert import_service.resolve_category(2) == 2
+        assert import_service.resolve_category(" Loisirs ") == 3
+        with pytest.raises(ValueError):
+            import_service.resolve_category("inconnue")
+        
+        assert detect_import_format("export.csv") == 'csv'
+        assert detect_import_format("export.jsonl.xz") == 'jsonl'
+        assert detect_import_format("export.txt") is None
+        with pytest.raises(ValueError):
+            import_service.import_file("export.txt")
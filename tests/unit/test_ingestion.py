@@ -0,0 +1,87 @@
+# tests/unit/test_ingestion.py
+
+import pytest
+from src.services.ingestion_service import IngestionService
+from tests.unit.test_statements import OFX_SGML, QIF
+
+class TestIngestionService:
+    """Tests de l'intégration des relevés bancaires"""
+    
+    @pytest.fixture
+    def ingestion_service(self, db_manager, transaction_service):
+        """Fixture pour le service d'intégration"""
+        return IngestionService(db_manager, transaction_service)
+    
+    @pytest.fixture
+    def statements(self, tmp_path):
+        """Un relevé par format"""
+        ofx = tmp_path / "compte.ofx"
+        ofx.write_text(OFX_SGML, encoding='utf-8')
+        qif = tmp_path / "compte.qif"
+        qif.write_text(QIF, encoding='utf-8')
+        csv_file = tmp_path / "carte.csv"
+        csv_file.write_text("date,description,amount\n2026-03-01,Pharmacie,-12.40\n2026-03-02,Avoir,0\n", encoding='utf-8')
+        return [str(ofx), str(qif), str(csv_file)]
+    
+    def test_ingest_files_normalizes_transactions(self, ingestion_service, transaction_service, statements):
+        """Test: débits en dépenses, crédits en revenus, montants nuls rejetés"""
+        result = ingestion_service.ingest_files(statements, category='santé', workers=1)
+        
+        assert result['parsed'] == 6
+        assert result['imported'] == 5
+        assert result['rejected'] == 1
+        assert [f['entries'] for f in result['files']] == [2, 2, 2]
+        
+        transactions = transaction_service.list_transactions()
+        by_description = {t.description: t for t in transactions}
+        assert by_description["Loyer Janvier"].type == 'dépense'
+        assert by_description["Loyer Janvier"].amount == 1234.56
+        assert by_description["VIR SALAIRE"].type == 'revenu'
+        assert {t.category_id for t in transactions} == {5}
+    
+    def test_ingest_files_in_process_pool(self, ingestion_service, transaction_service, statements):
+        """Test: lecture parallèle, résultat identique à la lecture séquentielle"""
+        result = ingestion_service.ingest_files(statements, workers=2)
+        
+        assert result['imported'] == 5
+        assert len(transaction_service.list_transactions()) == 5
+    
+    def test_ingest_reports_unreadable_file(self, ingestion_service, transaction_service, statements, tmp_path):
+        """Test: un fichier illisible est signalé sans bloquer les autres"""
+        broken = tmp_path / "casse.csv"
+        broken.write_text("date,description,amount\nhier,Erreur,1\n", encoding='utf-8')
+        
+        result = ingestion_service.ingest_files([statements[0], str(broken)], workers=1)
+        
+        assert result['files'][1]['error'].startswith("Ligne 2")
+        assert result['imported'] == 2
+    
+    def test_ingest_dry_run_and_invalid_options(self, ingestion_service, transaction_service, statements):
+        """Test: simulation sans écriture, profil ou catégorie inconnus refusés"""
+        result = ingestion_service.ingest_files(statements, workers=1, dry_run=True)
+        
+        assert result['imported'] == 5
+        assert transaction_service.list_transactions() == []
+        
+        with pytest.raises(ValueError):
+            ingestion_service.ingest_files(statements, profile='inconnu')
+        with pytest.raises(ValueError):
+            ingestion_service.ingest_files(statements, category='inconnue')
+    
+    def test_ingest_overlapping_statements_once(self, ingestion_service, transaction_service, tmp_path):
+        """Test: relevés qui se chevauchent et réintégration sans doublon"""
+        header = "date,description,amount\n"
+        first = tmp_path / "janvier_fevrier.csv"
+        first.write_text(header + "2026-01-10,Café,-3.5\n2026-02-01,Café,-3.5\n2026-02-01,Café,-3.5\n", encoding='utf-8')
+        second = tmp_path / "fevrier_mars.csv"
+        second.write_text(header + "2026-02-01,Café,-3.5\n2026-02-01,Café,-3.5\n2026-03-01,Loyer,-800\n", encoding='utf-8')
+        
+        result = ingestion_service.ingest_files([str(first), str(second)], workers=1)
+        
+        assert result['imported'] == 4
+        assert result['skipped'] == 2
+        
+        again = ingestion_service.ingest_files([str(second)], workers=1)
+        assert again['imported'] == 0 and again['skipped'] == 3
+        assert len(transaction_service.list_transactions()) == 4
+
@@ -0,0 +1,205 @@
+# tests/unit/test_job_service.py
+
+import pytest
+import csv
+import gzip
+import json
+import threading
+import time
+from datetime import date
+from src.database.db_manager import DatabaseManager
+from src.models.budget import Budget
+from src.models.transaction import Transaction
+from src.services.budget_service import BudgetService
+from src.services import job_service as job_service_module
+from src.services.job_service import STALE_AFTER, JobService
+from src.services.transaction_service import TransactionService
+
+
+@pytest.fixture
+def file_db(tmp_path):
+    """Base fichier (les workers ouvrent leur propre connexion)"""
+    db = DatabaseManager(str(tmp_path / "budget.db"))
+    transactions = TransactionService(db)
+    for day in range(1, 6):
+        transactions.add_transaction(Transaction(10 * day, f"Courses {day}", "dépense", 1, date(2026, 3, day)))
+    transactions.add_transaction(Transaction(2000, "Salaire", "revenu", 6, date(2026, 3, 1)))
+    BudgetService(db, transactions).create_budget(Budget(1, 100, date(2026, 3, 1), date(2026, 3, 31)))
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def job_service(file_db, tmp_path):
+    service = JobService(file_db, results_dir=str(tmp_path / "jobs"))
+    yield service
+    service.stop(timeout=5)
+
+
+class TestJobService:
+    """Tests de la file de tâches de fond"""
+
+    def test_export_job(self, job_service):
+        """Test: la soumission rend la main, le worker produit le fichier"""
+        job = job_service.submit('export_transactions', {
+            'format': 'csv', 'category_id': 1, 'start_date': '2026-03-02', 'compress': 'gzip'
+        })
+        assert job['status'] in ('queued', 'running')
+
+        job = job_service.wait(job['id'])
+
+        assert job['status'] == 'done'
+        assert job['total'] == job['progress'] == 4
+        assert job['percentage'] == 100.0
+        assert job['result_path'].endswith('.csv.gz')
+        with gzip.open(job['result_path'], 'rt', encoding='utf-8') as f:
+            assert len(list(csv.DictReader(f))) == 4
+
+    def test_budget_and_report_jobs(self, job_service):
+        """Test: résumé des budgets et rapport annuel"""
+        budgets = job_service.wait(job_service.submit('export_budgets')['id'])
+        report = job_service.wait(job_service.submit('year_report', {'year': 2026})['id'])
+
+        with open(budgets['result_path'], encoding='utf-8') as f:
+            assert json.load(f)['budgets'][0]['budget']['spent'] == 150
+        with open(report['result_path'], encoding='utf-8') as f:
+            assert json.load(f)['year'] == 2026
+
+    def test_jobs_run_in_submission_order(self, job_service):
+        """Test: tâches exécutées dans l'ordre, listées des plus récentes aux plus anciennes"""
+        ids = [job_service.submit('export_transactions', {'format': 'jsonl'})['id'] for _ in range(3)]
+        finished = [job_service.wait(job_id) for job_id in ids]
+
+        assert all(job['started_at'] <= later['started_at'] for job, later in zip(finished, finished[1:]))
+        assert [job['id'] for job in job_service.list_jobs()] == ids[::-1]
+        assert job_service.list_jobs(status='failed') == []
+
+    def test_failed_job(self, job_service, monkeypatch):
+        """Test: une erreur d'exécution est enregistrée sur la tâche"""
+        def fail(*args):
+            raise RuntimeError("disque plein")
+        monkeypatch.setattr(JobService, '_run_year_report', fail)
+
+        job = job_service.wait(job_service.submit('year_report', {'year': 2026})['id'])
+
+        assert job['status'] == 'failed'
+        assert job['error'] == "disque plein"
+
+    def test_invalid_jobs(self, job_service):
+        """Test: type, paramètres ou valeurs invalides refusés avant l'enregistrement"""
+        with pytest.raises(ValueError, match="Type de tâche inconnu"):
+            job_service.submit('inconnu')
+        with pytest.raises(ValueError, match="Paramètres inconnus"):
+            job_service.submit('year_report', {'year': 2026, 'mois': 1})
+        with pytest.raises(ValueError, match="Format d'export inconnu"):
+            job_service.submit('export_transactions', {'format': 'xml'})
+        with pytest.raises(ValueError):
+            job_service.submit('export_budgets', {'start_date': 'hier'})
+        with pytest.raises(ValueError, match="year"):
+            job_service.submit('year_report')
+        assert job_service.list_jobs() == []
+
+    def test_delete_job(self, job_service):
+        """Test: suppression d'une tâche terminée et de son fichier"""
+        job = job_service.wait(job_service.submit('export_budgets')['id'])
+
+        assert job_service.delete_job(job['id'])
+        assert job_service.get_job(job['id']) is None
+        assert not job_service.delete_job(job['id'])
+
+    def test_interrupted_jobs_requeued(self, file_db, tmp_path):
+        """Test: une tâche restée en cours à l'arrêt est reprise au démarrage"""
+        file_db.execute_update(
+            "INSERT INTO jobs (kind, params, status, created_at) VALUES ('export_budgets', '{}', 'running', '2026-03-01')"
+        )
+        service = JobService(file_db, results_dir=str(tmp_path / "jobs"))
+        service.start()
+        try:
+            assert service.wait(1)['status'] == 'done'
+        finally:
+            service.stop(timeout=5)
+        assert not [t for t in threading.enumerate() if t.name.startswith('mybudget-job')]
+
+    def test_running_jobs_of_live_process_kept(self, file_db, tmp_path):
+        """Test: seules les tâches sans signe de vie récent sont reprises"""
+        now = time.time()
+        for heartbeat in (now, now - STALE_AFTER - 1):
+            file_db.execute_update(
+                """
+                INSERT INTO jobs (kind, params, status, created_at, owner, heartbeat_at)
+                VALUES ('export_budgets', '{}', 'running', '2026-03-01', 'autre:1', ?)
+                """,
+                (heartbeat,)
+            )
+        service = JobService(file_db, results_dir=str(tmp_path / "jobs"))
+        service.start()
+        try:
+            assert service.wait(2)['status'] == 'done'
+            assert service.get_job(1)['status'] == 'running'
+        finally:
+            service.stop(timeout=5)
+
+    def test_claim_records_owner(self, job_service):
+        """Test: la tâche réservée porte le processus qui l'exécute"""
+        job_service.wait(job_service.submit('export_budgets')['id'])
+        row = job_service.db.execute_query("SELECT owner, heartbeat_at FROM jobs")[0]
+
+        assert row['owner'] == job_service.owner
+        assert row['heartbeat_at'] is not None
+
+    def test_claim_without_returning(self, job_service, monkeypatch):
+        """Test: réservation par lecture puis mise à jour avant SQLite 3.35"""
+        monkeypatch.setattr(job_service_module, 'HAS_RETURNING', False)
+        job_id = job_service.db.execute_update(
+            "INSERT INTO jobs (kind, params, status, created_at) VALUES ('year_report', '{}', 'queued', 'x')"
+        )
+
+        job = JobService._claim(job_service.db, 'autre')
+        assert job == {'id': job_id, 'kind': 'year_report', 'params': {}}
+        assert job_service.get_job(job_id)['status'] == 'running'
+        assert JobService._claim(job_service.db, 'autre') is None
+
+    def test_progress_written_with_heartbeat(self, job_service):
+        """Test: la progression en mémoire est recopiée en base au signe de vie"""
+        job_id = job_service.db.execute_update(
+            "INSERT INTO jobs (kind, params, status, created_at, owner) "
+            "VALUES ('year_report', '{}', 'running', 'x', ?)",
+            (job_service.owner,)
+        )
+        job_service._progress[job_id] = 42
+
+        job_service._record_heartbeat(job_service.db)
+
+        row = job_service.db.execute_query("SELECT progress, heartbeat_at FROM jobs WHERE id = ?", (job_id,))[0]
+        assert row['progress'] == 42
+        assert row['heartbeat_at'] is not None
+
+    def test_budget_statuses_computed_once(self, job_service, monkeypatch):
+        """Test: les statuts servent au total et à l'export"""
+        calls = []
+        get_budget_statuses = BudgetService.get_budget_statuses
+        monkeypatch.setattr(BudgetService, 'get_budget_statuses', lambda self, *args, **kwargs: (
+            calls.append(args), get_budget_statuses(self, *args, **kwargs)
+        )[1])
+
+        job = job_service.wait(job_service.submit('export_budgets')['id'])
+
+        assert job['status'] == 'done' and job['total'] == 1
+        assert len(calls) == 1
+
+    def test_unhashable_params_refused(self, job_service):
+        """Test: listes ou objets venus du JSON refusés (ValueError)"""
+        with pytest.raises(ValueError):
+            job_service.submit(['year_report'])
+        with pytest.raises(ValueError):
+            job_service.submit('export_budgets', {'compress': ['gzip']})
+        with pytest.raises(ValueError):
+            job_service.submit('export_transactions', {'format': {'csv': 1}})
+        with pytest.raises(ValueError):
+            job_service.submit('year_report', {'year': [2026]})
+
+    def test_memory_database_refused(self):
+        """Test: pas de workers sur une base en mémoire"""
+        with DatabaseManager(":memory:") as db:
+            with pytest.raises(ValueError):
+                JobService(db, results_dir="unused").start()
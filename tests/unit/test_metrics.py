@@ -0,0 +1,59 @@
+# tests/unit/test_metrics.py
+
+import pytest
+from src.utils.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry:
+    """Tests du registre de métriques au format Prometheus"""
+
+    def test_counter_render(self):
+        """Test: compteur par étiquettes, valeurs échappées"""
+        registry = MetricsRegistry()
+        counter = registry.counter('requests_total', "Requêtes", ('route',))
+        counter.inc(('/',))
+        counter.inc(('/',), 2)
+        counter.inc(('/a"b\\c',))
+
+        text = registry.render()
+
+        assert "# HELP requests_total Requêtes\n# TYPE requests_total counter\n" in text
+        assert 'requests_total{route="/"} 3\n' in text
+        assert 'requests_total{route="/a\\"b\\\\c"} 1\n' in text
+        assert counter.value(('/',)) == 3
+
+    def test_histogram_cumulative_buckets(self):
+        """Test: comptes cumulés par borne, +Inf, somme et nombre"""
+        registry = MetricsRegistry()
+        histogram = registry.histogram('latency_seconds', "Latence", buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value)
+
+        lines = registry.render().splitlines()
+
+        assert 'latency_seconds_bucket{le="0.1"} 2' in lines
+        assert 'latency_seconds_bucket{le="1"} 3' in lines
+        assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+        assert 'latency_seconds_sum 3.65' in lines
+        assert 'latency_seconds_count 4' in lines
+
+    def test_gauge_collected_on_render(self):
+        """Test: jauge calculée à chaque rendu, valeur simple ou par étiquettes"""
+        registry = MetricsRegistry()
+        state = {'queued': 1}
+        registry.gauge('jobs', "Tâches", lambda: {(k,): v for k, v in state.items()}, ('status',))
+        registry.gauge('workers', "Workers", lambda: 2)
+
+        state['queued'] = 5
+        text = registry.render()
+
+        assert 'jobs{status="queued"} 5\n' in text
+        assert 'workers 2\n' in text
+
+    def test_duplicate_metric(self):
+        """Test: un nom ne peut être enregistré deux fois"""
+        registry = MetricsRegistry()
+        registry.counter('total', "Total")
+
+        with pytest.raises(ValueError):
+            registry.histogram('total', "Total")
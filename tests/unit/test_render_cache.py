@@ -0,0 +1,40 @@
+# tests/unit/test_render_cache.py
+
+from src.utils.render_cache import RenderCache, freeze
+
+
+class TestRenderCache:
+    """Tests du cache de données et de fragments des pages web"""
+
+    def test_compute_once(self):
+        """Test: calcul au premier accès, succès ensuite"""
+        accesses = []
+        cache = RenderCache(on_access=lambda name, hit: accesses.append((name, hit)))
+        calls = []
+
+        for _ in range(3):
+            value = cache.get(('budget_rows', 'v1'), lambda: calls.append(1) or [1, 2])
+
+        assert value == [1, 2]
+        assert len(calls) == 1
+        assert accesses == [('budget_rows', False), ('budget_rows', True), ('budget_rows', True)]
+
+    def test_lru_eviction(self):
+        """Test: l'entrée la moins récemment utilisée est évincée"""
+        cache = RenderCache(max_entries=2)
+        cache.get(('a',), lambda: 1)
+        cache.get(('b',), lambda: 2)
+        cache.get(('a',), lambda: 0)
+        cache.get(('c',), lambda: 3)
+
+        assert len(cache) == 2
+        assert cache.get(('a',), lambda: 0) == 1
+        assert cache.get(('b',), lambda: 0) == 0
+
+    def test_freeze(self):
+        """Test: clé de contenu indépendante de l'ordre des clés"""
+        first = freeze({'budgets': [{'spent': 1.0, 'category': "Loisirs"}]})
+        second = freeze({'budgets': [{'category': "Loisirs", 'spent': 1.0}]})
+
+        assert first == second
+        assert hash(first) == hash(second)
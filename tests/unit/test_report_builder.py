@@ -0,0 +1,94 @@
+# tests/unit/test_report_builder.py
+
+import pytest
+from datetime import date
+from src.database.db_manager import DatabaseManager
+from src.models.budget import Budget
+from src.models.transaction import Transaction
+from src.services.budget_service import BudgetService
+from src.services.report_builder import ReportBuilder
+from src.services.transaction_service import TransactionService
+
+def _populate(db):
+    """Ajoute quelques transactions et budgets sur l'année 2026"""
+    transaction_service = TransactionService(db)
+    budget_service = BudgetService(db, transaction_service)
+    
+    for month in range(1, 13):
+        transaction_service.add_transaction(Transaction(2000, "Salaire", "revenu", 6, date(2026, month, 1)))
+        transaction_service.add_transaction(Transaction(50 + month, "Courses", "dépense", 1, date(2026, month, 10)))
+    transaction_service.add_transaction(Transaction(120, "Concert", "dépense", 3, date(2026, 3, 12)))
+    
+    budget_service.create_budget(Budget(1, 100, date(2026, 1, 1), date(2026, 1, 31)))
+    budget_service.create_budget(Budget(3, 100, date(2026, 3, 1), date(2026, 3, 31)))
+    budget_service.create_budget(Budget(3, 100, date(2025, 3, 1), date(2025, 3, 31)))
+
+class TestReportBuilder:
+    """Tests de la génération parallèle du rapport annuel"""
+    
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        """Base fichier partageable entre connexions"""
+        path = str(tmp_path / "budget.db")
+        db = DatabaseManager(path)
+        _populate(db)
+        db.close()
+        return path
+    
+    def test_year_report_structure(self, db_manager):
+        """Test: rapport annuel en série sur une base en mémoire"""
+        _populate(db_manager)
+        
+        report = ReportBuilder(db_manager, workers=4).build_year_report(2026)
+        
+        assert report['year'] == 2026
+        assert [s['period']['month'] for s in report['monthly_summaries']] == list(range(1, 13))
+        assert report['monthly_summaries'][2]['total_depenses'] == 53 + 120
+        assert len(report['category_trends']) == 6
+        trend = report['category_trends'][0]
+        assert trend['name'] == 'alimentation'
+        assert [m['total'] for m in trend['trend']] == [50 + m for m in range(1, 13)]
+        # Le budget 2025 n'est pas inclus
+        assert [b['budget_id'] for b in report['budgets']] == [1, 2]
+        assert report['budgets'][1]['is_exceeded'] is True
+    
+    @pytest.mark.parametrize("executor", ['thread', 'process'])
+    def test_parallel_report_is_deterministic(self, db_path, executor):
+        """Test: le rapport parallèle est identique au rapport série"""
+        db = DatabaseManager(db_path)
+        try:
+            serial = ReportBuilder(db, workers=1).build_year_report(2026)
+            parallel = ReportBuilder(db, workers=3, executor=executor).build_year_report(2026)
+        finally:
+            db.close()
+        
+        assert parallel == serial
+    
+    def test_worker_connections_closed(self, db_path, monkeypatch):
+        """Test: les connexions des threads workers sont fermées à l'arrêt du pool"""
+        closed = []
+        close = DatabaseManager.close
+        monkeypatch.setattr(DatabaseManager, 'close', lambda self: closed.append(self.read_only) or close(self))
+        db = DatabaseManager(db_path)
+        try:
+            ReportBuilder(db, workers=3).build_year_report(2026)
+        finally:
+            db.close()
+        
+        assert 1 <= closed.count(True) <= 3
+    
+    def test_read_only_connection(self, db_path):
+        """Test: les workers utilisent une connexion en lecture seule"""
+        import sqlite3
+        db = DatabaseManager(db_path, read_only=True)
+        
+        with pytest.raises(sqlite3.OperationalError):
+            db.execute_update("DELETE FROM transactions")
+        db.close()
+    
+    def test_invalid_settings(self, db_manager):
+        """Test: paramètres invalides refusés"""
+        with pytest.raises(ValueError):
+            ReportBuilder(db_manager, workers=0)
+        with pytest.raises(ValueError):
+            ReportBuilder(db_manager, executor='gpu')
@@ -4,6 +4,9 @@ import pytest
 from datetime import date
 from src.models.transaction import Transaction
 from src.models.budget import Budget
+from src.services.budget_service import BudgetService
+from src.services.transaction_service import TransactionService
+from src.utils.events import EventBus
 
 class TestTransactionService:
     """Tests du service de transactions"""
@@ -91,6 +94,216 @@ class TestTransactionService:
         # Vérifier qu'elle n'existe plus
         retrieved = transaction_service.get_transaction_by_id(t_id)
         assert retrieved is None
+    
+    def test_add_transactions_bulk(self, transaction_service):
+        """Test: insertion en masse par blocs, agrégats et sketches à jour"""
+        rows = [
+            (10.0 + i, f"Achat {i}", "dépense", 1, f"2026-01-{i % 28 + 1:02d}")
+            for i in range(25)
+        ]
+        
+        stats = transaction_service.add_transactions_bulk(rows, batch_size=10)
+        
+        assert stats == {'inserted': 25, 'skipped': 0, 'merged': 0}
+        assert len(transaction_service.list_transactions(category_id=1)) == 25
+        assert transaction_service.get_total_by_category(
+            1, date(2026, 1, 1), date(2026, 1, 31)
+        ) == round(sum(r[0] for r in rows), 2)
+        assert transaction_service.sketches.load_merged(1).count == 25
+        
+        # Séquence de modifications réservée pour le bloc, une valeur par ligne
+        seqs = [row['change_seq'] for row in transaction_service.db.execute_query(
+            "SELECT change_seq FROM transactions ORDER BY id"
+        )]
+        assert seqs == list(range(1, 26))
+        assert transaction_service.db.get_change_sequence() == 25
+    
+    def test_add_transactions_bulk_is_idempotent(self, transaction_service):
+        """Test: réimporter une source identique ou chevauchante n'ajoute pas de doublon"""
+        january = [
+            (3.5, "Café", "dépense", 1, "2026-01-10"),
+            (3.5, "Café", "dépense", 1, "2026-01-10"),  # deux cafés le même jour
+            (20.0, "Cinéma", "dépense", 3, "2026-01-12"),
+        ]
+        assert transaction_service.add_transactions_bulk(january)['inserted'] == 3
+        
+        overlapping = [(3.5, "  CAFE ", "dépense", 1, "2026-01-10")] + january[1:] + [
+            (1500.0, "Salaire", "revenu", 6, "2026-01-31"),
+        ]
+        stats = transaction_service.add_transactions_bulk(overlapping, batch_size=2)
+        
+        assert stats == {'inserted': 1, 'skipped': 3, 'merged': 0}
+        assert len(transaction_service.list_transactions()) == 4
+    
+    def test_add_transactions_bulk_merge_and_insert(self, transaction_service):
+        """Test: fusion d'un doublon (recatégorisation) ou insertion forcée"""
+        rows = [(42.0, "Pharmacie", "dépense", 6, "2026-02-03")]
+        transaction_service.add_transactions_bulk(rows)
+        
+        stats = transaction_service.add_transactions_bulk(
+            [(42.0, "Pharmacie", "dépense", 5, "2026-02-03")], on_duplicate='merge'
+        )
+        assert stats['merged'] == 1
+        transactions = transaction_service.list_transactions()
+        assert [t.category_id for t in transactions] == [5]
+        assert transaction_service.get_total_by_category(5, date(2026, 2, 1), date(2026, 2, 28)) == 42.0
+        assert transaction_service.sketches.load_merged(6).count == 0
+        
+        stats = transaction_service.add_transactions_bulk(rows, on_duplicate='insert')
+        assert stats['inserted'] == 1
+        assert len(transaction_service.list_transactions()) == 2
+        
+        with pytest.raises(ValueError):
+            transaction_service.add_transactions_bulk(rows, on_duplicate='replace')
+    
+    def test_add_transaction_duplicate_policies(self, transaction_service):
+        """Test: add_transaction détecte un doublon par l'index d'empreintes"""
+        t = Transaction(12.5, "Boulangerie", "dépense", 1, date(2026, 1, 10))
+        first_id = transaction_service.add_transaction(t)
+        
+        assert transaction_service.find_duplicate(t) == first_id
+        assert transaction_service.add_transaction(t, on_duplicate='skip') == first_id
+        assert transaction_service.find_duplicate(t, account="joint") is None
+        
+        merged = Transaction(12.5, "boulangerie", "dépense", 3, date(2026, 1, 10))
+        assert transaction_service.add_transaction(merged, on_duplicate='merge') == first_id
+        assert transaction_service.get_transaction_by_id(first_id).category_id == 3
+        
+        # Saisie manuelle (par défaut) : toujours ajoutée
+        second_id = transaction_service.add_transaction(t)
+        assert second_id != first_id
+        assert len(transaction_service.list_transactions()) == 2
+        
+        # Une modification recalcule l'empreinte
+        transaction_service.update_transaction(second_id, Transaction(13, "Boulangerie", "dépense", 1, date(2026, 1, 10)))
+        assert transaction_service.find_duplicate(Transaction(13, "Boulangerie", "dépense", 1, date(2026, 1, 10))) == second_id
+    
+    def test_identical_transactions_numbered_in_one_query(self, transaction_service, db_manager):
+        """Test: la n-ième transaction identique ne coûte pas n requêtes"""
+        t = Transaction(3, "Café", "dépense", 1, date(2026, 1, 10))
+        for _ in range(5):
+            transaction_service.add_transaction(t)
+
+        statements = []
+        db_manager.connection.set_trace_callback(statements.append)
+        try:
+            transaction_service.add_transaction(t)
+        finally:
+            db_manager.connection.set_trace_callback(None)
+
+        assert sum('FROM transactions' in sql for sql in statements) == 1
+        hashes = db_manager.execute_query("SELECT content_hash FROM transactions")
+        assert len({row['content_hash'] for row in hashes}) == 6
+
+    def test_add_transactions_bulk_with_results(self, transaction_service):
+        """Test: statut et ID de chaque ligne, dans l'ordre"""
+        existing = transaction_service.add_transaction(Transaction(5, "Café", "dépense", 1, date(2026, 1, 3)))
+        rows = [
+            (10.0, "Pain", 'dépense', 1, '2026-01-02'),
+            (5.0, "Café", 'dépense', 1, '2026-01-03'),
+            (10.0, "Pain", 'dépense', 1, '2026-01-02'),
+        ]
+        
+        stats = transaction_service.add_transactions_bulk(rows, batch_size=2, with_results=True)
+        
+        results = stats['results']
+        assert [r['status'] for r in results] == ['inserted', 'skipped', 'inserted']
+        assert results[1]['id'] == existing
+        assert results[0]['id'] != results[2]['id']
+        for row, result in zip(rows, results):
+            assert transaction_service.get_transaction_by_id(result['id']).description == row[1]
+        
+        again = transaction_service.add_transactions_bulk(rows, with_results=True)
+        assert [r['id'] for r in again['results']] == [r['id'] for r in results]
+        assert {r['status'] for r in again['results']} == {'skipped'}
+        
+        merged = transaction_service.add_transactions_bulk(
+            [(5.0, "Café", 'dépense', 3, '2026-01-03')], on_duplicate='merge', with_results=True
+        )
+        assert merged['results'] == [{'status': 'merged', 'id': existing}]
+    
+    def test_add_transactions_bulk_rolls_back_on_error(self, transaction_service):
+        """Test: une ligne invalide annule toute l'insertion"""
+        rows = [
+            (10.0, "Valide", "dépense", 1, "2026-01-10"),
+            (20.0, "Type invalide", "autre", 1, "2026-01-11"),
+        ]
+        
+        with pytest.raises(Exception):
+            transaction_service.add_transactions_bulk(rows, batch_size=1)
+        
+        assert transaction_service.list_transactions() == []
+
+
+    def test_list_transactions_page_walks_all_pages(self, transaction_service):
+        """Test: pagination par curseur, sans doublon ni oubli"""
+        rows = [
+            (10.0 + i, f"Achat {i}", 'dépense', 1 + i % 2, f"2026-01-{1 + i // 3:02d}")
+            for i in range(25)
+        ]
+        transaction_service.add_transactions_bulk(rows)
+        
+        seen = []
+        cursor = None
+        while True:
+            page = transaction_service.list_transactions_page(page_size=10, cursor=cursor)
+            assert page['total'] == 25
+            seen.extend(page['items'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        
+        assert len(seen) == 25
+        assert len({t['id'] for t in seen}) == 25
+        assert [(t['date'], t['id']) for t in seen] == sorted(((t['date'], t['id']) for t in seen), reverse=True)
+        assert seen[0]['category'] in ('alimentation', 'logement')
+    
+    def test_list_transactions_page_filters_and_order(self, transaction_service):
+        """Test: filtres, tri croissant et total sur les agrégats"""
+        transaction_service.add_transaction(Transaction(10, "A", "dépense", 1, date(2026, 1, 5)))
+        transaction_service.add_transaction(Transaction(20, "B", "dépense", 1, date(2026, 2, 5)))
+        transaction_service.add_transaction(Transaction(30, "C", "revenu", 1, date(2026, 2, 6)))
+        transaction_service.add_transaction(Transaction(40, "D", "dépense", 2, date(2026, 2, 7)))
+        
+        page = transaction_service.list_transactions_page(
+            category_id=1, transaction_type='dépense', order='asc', page_size=1
+        )
+        assert [t['description'] for t in page['items']] == ["A"]
+        assert page['total'] == 2
+        
+        following = transaction_service.list_transactions_page(
+            category_id=1, transaction_type='dépense', order='asc', page_size=1, cursor=page['next_cursor']
+        )
+        assert [t['description'] for t in following['items']] == ["B"]
+        assert following['next_cursor'] is None
+        
+        february = transaction_service.list_transactions_page(start_date=date(2026, 2, 1))
+        assert february['total'] == 3
+        assert len(february['items']) == 3
+    
+    def test_list_transactions_page_fields(self, transaction_service):
+        """Test: seuls les champs demandés sont retournés, curseur conservé"""
+        transaction_service.add_transaction(Transaction(10, "A", "dépense", 1, date(2026, 1, 5)))
+        transaction_service.add_transaction(Transaction(20, "B", "dépense", 1, date(2026, 1, 6)))
+        
+        page = transaction_service.list_transactions_page(page_size=1, fields=['amount'])
+        
+        assert page['items'] == [{'amount': 20}]
+        following = transaction_service.list_transactions_page(
+            page_size=1, fields=['amount', 'category'], cursor=page['next_cursor']
+        )
+        assert following['items'] == [{'amount': 10, 'category': 'alimentation'}]
+        with pytest.raises(ValueError, match="Champ inconnu"):
+            transaction_service.list_transactions_page(fields=['password'])
+    
+    def test_list_transactions_page_invalid_parameters(self, transaction_service):
+        """Test: curseur, taille de page et ordre invalides refusés"""
+        with pytest.raises(ValueError, match="Curseur"):
+            transaction_service.list_transactions_page(cursor="pas-un-curseur")
+        with pytest.raises(ValueError):
+            transaction_service.list_transactions_page(page_size=0)
+        with pytest.raises(ValueError):
+            transaction_service.list_transactions_page(order='random')
 
 
 class TestBudgetService:
@@ -160,3 +373,69 @@ class TestBudgetService:
         assert status['spent'] == 350
         assert status['remaining'] == -50
         assert status['is_exceeded'] is True
+    
+    def test_budget_statuses_grouped(self, budget_service, transaction_service):
+        """Test: statuts de tous les budgets en une requête, identiques au statut unitaire"""
+        budget_service.create_budget(Budget(1, 300, date(2026, 4, 1), date(2026, 4, 30)))
+        budget_service.create_budget(Budget(1, 300, date(2026, 5, 1), date(2026, 5, 31)))
+        budget_service.create_budget(Budget(3, 100, date(2026, 4, 1), date(2026, 4, 30)))
+        transaction_service.add_transaction(Transaction(200, "Courses", "dépense", 1, date(2026, 4, 10)))
+        transaction_service.add_transaction(Transaction(40, "Cinéma", "dépense", 3, date(2026, 4, 12)))
+        transaction_service.add_transaction(Transaction(500, "Prime", "revenu", 1, date(2026, 4, 15)))
+        
+        statuses = budget_service.get_budget_statuses()
+        
+        assert [s['period_start'] for s in statuses] == ['2026-05-01', '2026-04-01', '2026-04-01']
+        for status in statuses:
+            single = budget_service.get_budget_status(
+                status['category_id'],
+                date.fromisoformat(status['period_start']),
+                date.fromisoformat(status['period_end'])
+            )
+            assert {key: status[key] for key in single} == single
+        
+        april = budget_service.get_budget_statuses(start_date=date(2026, 4, 1), end_date=date(2026, 4, 30))
+        assert len(april) == 2
+        assert budget_service.get_budget_statuses(category_id=3)[0]['category'] == 'loisirs'
+    
+    def test_writes_publish_budget_events(self, db_manager):
+        """Test: une écriture publie la transaction, le statut des budgets touchés et l'alerte"""
+        events = EventBus()
+        transactions = TransactionService(db_manager, events)
+        budgets = BudgetService(db_manager, transactions, events)
+        budgets.create_budget(Budget(1, 100, date(2026, 4, 1), date(2026, 4, 30)))
+        budgets.create_budget(Budget(3, 100, date(2026, 4, 1), date(2026, 4, 30)))
+        received = []
+        events.subscribe(received.append)
+        
+        transactions.add_transaction(Transaction(120, "Courses", "dépense", 1, date(2026, 4, 10)))
+        
+        assert [e.type for e in received] == ['transaction', 'budget', 'alert']
+        assert received[0].data['action'] == 'added'
+        assert received[1].data['percentage'] == 120.0
+        assert received[2].data['exceeded_by'] == 20.0
+        
+        received.clear()
+        transactions.add_transaction(Transaction(500, "Prime", "revenu", 1, date(2026, 4, 15)))
+        assert [e.type for e in received] == ['transaction']
+        
+        received.clear()
+        transactions.add_transactions_bulk([
+            (10, "Pain", "dépense", 1, "2026-04-02"),
+            (15, "Cinéma", "dépense", 3, "2026-04-20"),
+        ])
+        assert [e.type for e in received] == ['transactions', 'budget', 'alert', 'budget']
+        assert received[0].data == {
+            'inserted': 2, 'merged': 0, 'category_ids': [1, 3], 'start': '2026-04-02', 'end': '2026-04-20'
+        }
+    
+    def test_affected_statuses(self, budget_service, transaction_service):
+        """Test: budgets des catégories touchées qui couvrent la période"""
+        budget_service.create_budget(Budget(1, 300, date(2026, 4, 1), date(2026, 4, 30)))
+        budget_service.create_budget(Budget(1, 300, date(2026, 5, 1), date(2026, 5, 31)))
+        budget_service.create_budget(Budget(3, 100, date(2026, 4, 1), date(2026, 4, 30)))
+        
+        day = date(2026, 4, 10)
+        assert len(budget_service.get_affected_statuses([1], day, day)) == 1
+        assert len(budget_service.get_affected_statuses([1, 3], day, day)) == 2
+        assert len(budget_service.get_affected_statuses([1], day, date(2026, 5, 2))) == 2
@@ -0,0 +1,171 @@
+# tests/unit/test_statements.py
+
+import pytest
+from datetime import date
+from src.utils.statements import (
+    CSV_PROFILES, CsvProfile, detect_statement_format, load_csv_profiles,
+    parse_csv, parse_ofx, parse_qif, parse_statement
+)
+
+OFX_SGML = """OFXHEADER:100
+DATA:OFXSGML
+VERSION:102
+CHARSET:1252
+
+<OFX>
+<BANKMSGSRSV1><STMTTRNRS><STMTRS>
+<CURDEF>EUR
+<BANKACCTFROM><BANKID>30003<ACCTID>00012345678<ACCTTYPE>CHECKING</BANKACCTFROM>
+<BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20260105120000[+1:CET]
+<TRNAMT>-42.50
+<FITID>A1
+<NAME>CARREFOUR   MARKET
+<MEMO>CB 04/01
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20260131
+<TRNAMT>2100,00
+<FITID>A2
+<NAME>VIR SALAIRE
+</STMTTRN>
+</BANKTRANLIST>
+</STMTRS></STMTTRNRS></BANKMSGSRSV1>
+</OFX>
+"""
+
+OFX_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<OFX><CREDITCARDMSGSRSV1><CCSTMTTRNRS><CCSTMTRS>
+<CCACCTFROM><ACCTID>4970XXXX</ACCTID></CCACCTFROM>
+<BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT</TRNTYPE><DTPOSTED>20260210</DTPOSTED><TRNAMT>-9.99</TRNAMT><FITID>X9</FITID><NAME>Musique</NAME></STMTTRN>
+</BANKTRANLIST>
+</CCSTMTRS></CCSTMTTRNRS></CREDITCARDMSGSRSV1></OFX>
+"""
+
+QIF = """!Account
+NCompte courant
+TBank
+^
+!Type:Bank
+D05/01/2026
+T-1,234.56
+PLoyer
+MJanvier
+^
+D6/1'26
+T15.00
+PRemboursement
+NCHK42
+^
+"""
+
+
+class TestStatements:
+    """Tests des lecteurs de relevés bancaires"""
+    
+    def test_parse_ofx_sgml(self):
+        """Test: OFX 1.x sans balises fermantes, montant à virgule"""
+        entries = parse_ofx(OFX_SGML)
+        
+        assert [(e.date, e.amount) for e in entries] == [
+            (date(2026, 1, 5), -42.5),
+            (date(2026, 1, 31), 2100.0),
+        ]
+        assert entries[0].description == "CARREFOUR MARKET CB 04/01"
+        assert entries[0].account == "00012345678"
+        assert entries[1].reference == "A2"
+    
+    def test_parse_ofx_xml(self):
+        """Test: OFX 2.x (XML) de carte bancaire"""
+        entries = parse_ofx(OFX_XML)
+        
+        assert len(entries) == 1
+        assert entries[0].amount == -9.99
+        assert entries[0].account == "4970XXXX"
+        assert entries[0].description == "Musique"
+    
+    def test_parse_qif(self):
+        """Test: QIF avec bloc de compte, milliers et date abrégée"""
+        entries = parse_qif(QIF)
+        
+        assert [(e.date, e.amount, e.description) for e in entries] == [
+            (date(2026, 1, 5), -1234.56, "Loyer Janvier"),
+            (date(2026, 1, 6), 15.0, "Remboursement"),
+        ]
+        assert {e.account for e in entries} == {"Compte courant"}
+        assert entries[1].reference == "CHK42"
+    
+    def test_parse_qif_dashed_date_format(self):
+        """Test: format de date avec tirets (ISO)"""
+        text = "!Type:Bank\nD2024-01-05\nT-3.50\nPBoulangerie\n^\nD24-01-06\nT10\nPVirement\n^\n"
+        entries = parse_qif(text, date_format='%Y-%m-%d')
+        
+        assert [e.date for e in entries] == [date(2024, 1, 5), date(2024, 1, 6)]
+    
+    def test_parse_csv_default_profile(self):
+        """Test: CSV avec colonne de montant signée"""
+        text = "date,description,amount\n2026-03-01,  Boulangerie  du coin ,-3.20\n\n2026-03-02,Virement,50\n"
+        
+        entries = parse_csv(text, CSV_PROFILES['default'])
+        
+        assert [(e.description, e.amount) for e in entries] == [
+            ("Boulangerie du coin", -3.2),
+            ("Virement", 50.0),
+        ]
+    
+    def test_parse_csv_debit_credit_profile(self):
+        """Test: profil français (point-virgule, virgule décimale, débit/crédit)"""
+        text = (
+            "Relevé du compte\n"
+            "Date;Libellé;Débit;Crédit\n"
+            "03/02/2026;PRLV EDF;1 234,50;\n"
+            "04/02/2026;VIR CAF;;120,00\n"
+        )
+        profile = CsvProfile(**{**CSV_PROFILES['fr'].__dict__, 'skip_rows': 1, 'account': 'joint'})
+        
+        entries = parse_csv(text, profile)
+        
+        assert [(e.date, e.amount) for e in entries] == [
+            (date(2026, 2, 3), -1234.5),
+            (date(2026, 2, 4), 120.0),
+        ]
+        assert entries[0].account == 'joint'
+    
+    def test_parse_csv_reports_line(self):
+        """Test: une ligne invalide indique son numéro"""
+        text = "date,description,amount\n2026-03-01,Ok,1\n2026-03-02,Ko,abc\n"
+        
+        with pytest.raises(ValueError, match="Ligne 3"):
+            parse_csv(text, CSV_PROFILES['default'])
+    
+    def test_parse_statement_detects_format_and_encoding(self, tmp_path):
+        """Test: format déduit de l'extension, relevé en Windows-1252"""
+        filepath = tmp_path / "releve.ofx"
+        filepath.write_bytes(OFX_SGML.replace("MARKET", "MARCHÉ").encode('cp1252'))
+        
+        entries = parse_statement(str(filepath))
+        
+        assert entries[0].description.startswith("CARREFOUR MARCHÉ")
+        assert detect_statement_format("a.QIF") == 'qif'
+        with pytest.raises(ValueError):
+            parse_statement(str(tmp_path / "releve.pdf"))
+    
+    def test_load_csv_profiles(self, tmp_path):
+        """Test: chargement de profils JSON, profil invalide refusé"""
+        filepath = tmp_path / "profiles.json"
+        filepath.write_text('{"banque": {"delimiter": ";", "amount_column": "Montant"}}', encoding='utf-8')
+        
+        profiles = load_csv_profiles(str(filepath))
+        
+        assert profiles['banque'].delimiter == ';'
+        assert 'fr' in profiles
+        
+        filepath.write_text('{"banque": {"colonne": "x"}}', encoding='utf-8')
+        with pytest.raises(ValueError):
+            load_csv_profiles(str(filepath))
+        with pytest.raises(ValueError):
+            CsvProfile(amount_column=None)
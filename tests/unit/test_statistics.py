@@ -134,6 +134,64 @@ class TestStatisticsService:
         assert 'by_category' in summary
         assert len(summary['by_category']) >= 2
     
+    def test_totals_from_rollups(self, statistics_service, transaction_service):
+        """Test: totaux du tableau de bord lus depuis les agrégats"""
+        transaction_service.add_transaction(Transaction(1000, "Salaire", "revenu", 6, date(2026, 1, 1)))
+        t_id = transaction_service.add_transaction(Transaction(80, "Courses", "dépense", 1, date(2026, 2, 3)))
+        transaction_service.add_transaction(Transaction(20, "Cinéma", "dépense", 3, date(2026, 2, 4)))
+        transaction_service.delete_transaction(t_id)
+        
+        totals = statistics_service.get_totals()
+        
+        assert totals == {'total_revenus': 1000, 'total_depenses': 20, 'balance': 980}
+    
+    def test_spending_by_day_of_week_values(self, statistics_service, transaction_service):
+        """Test: totaux par jour de la semaine calculés en SQL"""
+        today = date.today()
+        monday = today - timedelta(days=today.weekday())
+        transaction_service.add_transaction(Transaction(40, "Lundi", "dépense", 1, monday))
+        transaction_service.add_transaction(Transaction(5, "Lundi bis", "dépense", 2, monday))
+        transaction_service.add_transaction(Transaction(500, "Salaire", "revenu", 6, monday))
+        
+        by_weekday = statistics_service.get_spending_by_day_of_week(months=1)
+        
+        assert by_weekday['Lundi'] == 45
+        assert sum(by_weekday.values()) == 45
+    
+    def test_category_day_heatmap(self, statistics_service, transaction_service):
+        """Test: matrice jour × catégorie"""
+        transaction_service.add_transaction(Transaction(10, "Pain", "dépense", 1, date(2026, 1, 2)))
+        transaction_service.add_transaction(Transaction(15, "Fromage", "dépense", 1, date(2026, 1, 2)))
+        transaction_service.add_transaction(Transaction(30, "Bus", "dépense", 4, date(2026, 1, 3)))
+        
+        heatmap = statistics_service.get_category_day_heatmap(date(2026, 1, 1), date(2026, 1, 3))
+        
+        assert heatmap['rows'] == ['2026-01-01', '2026-01-02', '2026-01-03']
+        assert heatmap['columns'][0] == 'alimentation'
+        assert heatmap['values'][0] == [0] * 6
+        assert heatmap['values'][1][0] == 25
+        assert heatmap['values'][2][heatmap['columns'].index('transports')] == 30
+    
+    def test_weekday_week_heatmap(self, statistics_service, transaction_service):
+        """Test: matrice jour de la semaine × semaine de l'année"""
+        # Le 5 janvier 2026 est un lundi (semaine 1)
+        transaction_service.add_transaction(Transaction(12, "Café", "dépense", 1, date(2026, 1, 5)))
+        transaction_service.add_transaction(Transaction(8, "Ciné", "dépense", 3, date(2026, 1, 11)))
+        for _ in range(3):
+            transaction_service.add_transaction(Transaction(0.1, "Bonbon", "dépense", 1, date(2026, 1, 12)))
+        
+        heatmap = statistics_service.get_weekday_week_heatmap(2026)
+        
+        assert len(heatmap['values']) == 7
+        assert len(heatmap['values'][0]) == 54
+        assert heatmap['values'][0][1] == 12
+        assert heatmap['values'][6][1] == 8
+        assert heatmap['values'][0][2] == 0.3
+        assert heatmap['totals'][0] == 12.3
+        
+        filtered = statistics_service.get_weekday_week_heatmap(2026, category_id=3)
+        assert filtered['values'][0][1] == 0
+    
     def test_empty_period_statistics(self, statistics_service):
         """Test: statistiques sur une période vide"""
         # Résumé d'un mois sans transactions
@@ -143,3 +201,57 @@ class TestStatisticsService:
         assert summary['total_depenses'] == 0
         assert summary['balance'] == 0
         assert summary['transactions_count'] == 0
+    
+    def test_spending_percentiles(self, statistics_service, transaction_service):
+        """Test: percentiles estimés depuis les sketches mensuels"""
+        for i in range(1, 101):
+            t = Transaction(i, f"Achat {i}", "dépense", 1, date(2026, 1 + i % 2, 10))
+            transaction_service.add_transaction(t)
+        
+        stats = statistics_service.get_spending_percentiles(
+            category_id=1,
+            start_date=date(2026, 1, 1),
+            end_date=date(2026, 2, 28)
+        )
+        
+        assert stats['count'] == 100
+        assert stats['min'] == 1
+        assert stats['max'] == 100
+        assert stats['percentiles']['p50'] == pytest.approx(50.5, abs=2)
+        assert stats['percentiles']['p90'] == pytest.approx(90.5, abs=2)
+    
+    def test_category_percentiles_follow_updates(self, statistics_service, transaction_service):
+        """Test: les sketches suivent les modifications et suppressions"""
+        t_id = transaction_service.add_transaction(
+            Transaction(500, "Gros achat", "dépense", 1, date(2026, 3, 5))
+        )
+        transaction_service.add_transaction(Transaction(20, "Petit achat", "dépense", 1, date(2026, 3, 6)))
+        
+        transaction_service.update_transaction(
+            t_id, Transaction(30, "Gros achat", "dépense", 1, date(2026, 3, 5))
+        )
+        stats = statistics_service.get_category_percentiles(2026, 3)
+        assert stats[0]['name'] == 'alimentation'
+        assert stats[0]['max'] == 30
+        
+        transaction_service.delete_transaction(t_id)
+        stats = statistics_service.get_category_percentiles(2026, 3)
+        assert stats[0]['count'] == 1
+    
+    def test_sketches_rebuilt_on_read(self, statistics_service, transaction_service, db_manager):
+        """Test: une insertion marque son mois, la lecture reconstruit le sketch"""
+        for amount in (10, 20, 30):
+            transaction_service.add_transaction(Transaction(amount, "Achat", "dépense", 1, date(2026, 4, 2)))
+        dirty = db_manager.connection.execute("SELECT * FROM quantile_sketch_dirty").fetchall()
+        assert [tuple(row) for row in dirty] == [(1, 'dépense', '2026-04')]
+        
+        stats = statistics_service.get_category_percentiles(2026, 4)
+        assert stats[0]['count'] == 3
+        assert db_manager.connection.execute("SELECT * FROM quantile_sketch_dirty").fetchall() == []
+    
+    def test_empty_percentiles(self, statistics_service):
+        """Test: percentiles sur une période sans transaction"""
+        stats = statistics_service.get_spending_percentiles(category_id=1)
+        
+        assert stats['count'] == 0
+        assert stats['percentiles']['p50'] is None
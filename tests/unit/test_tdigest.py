@@ -0,0 +1,75 @@
+# tests/unit/test_tdigest.py
+
+import random
+import pytest
+from src.utils.tdigest import TDigest
+
+class TestTDigest:
+    """Tests du sketch de quantiles"""
+    
+    @pytest.fixture
+    def values(self):
+        """Échantillon reproductible de montants"""
+        rng = random.Random(42)
+        return [round(rng.lognormvariate(3, 1), 2) for _ in range(20000)]
+    
+    def _exact(self, values, q):
+        ordered = sorted(values)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+    
+    def _rank_error(self, values, estimate, q):
+        below = sum(1 for v in values if v <= estimate)
+        return abs(below / len(values) - q)
+    
+    def test_empty_digest(self):
+        """Test: un sketch vide ne retourne pas de quantile"""
+        digest = TDigest()
+        assert digest.quantile(0.5) is None
+        assert len(digest) == 0
+    
+    def test_quantiles_bounded_error(self, values):
+        """Test: l'erreur de rang reste bornée"""
+        digest = TDigest()
+        digest.update(values)
+        
+        for q in (0.5, 0.9, 0.99):
+            assert self._rank_error(values, digest.quantile(q), q) < 0.01
+        
+        assert digest.quantile(0) == min(values)
+        assert digest.quantile(1) == max(values)
+    
+    def test_size_is_bounded(self, values):
+        """Test: le nombre de centroïdes ne dépend pas du volume"""
+        digest = TDigest(compression=100)
+        digest.update(values)
+        assert digest.centroid_count() <= 200
+    
+    def test_merge(self, values):
+        """Test: la fusion de sketches équivaut à un sketch global"""
+        left, right = TDigest(), TDigest()
+        left.update(values[:7000])
+        right.update(values[7000:])
+        
+        merged = left.merge(right)
+        
+        assert merged.count == len(values)
+        assert self._rank_error(values, merged.quantile(0.9), 0.9) < 0.01
+    
+    def test_serialization_roundtrip(self, values):
+        """Test: sérialisation binaire compacte"""
+        digest = TDigest()
+        digest.update(values)
+        
+        data = digest.to_bytes()
+        restored = TDigest.from_bytes(data)
+        
+        assert len(data) < 5000
+        assert restored.count == digest.count
+        assert restored.quantile(0.5) == pytest.approx(digest.quantile(0.5))
+    
+    def test_invalid_quantile(self):
+        """Test: quantile hors de [0, 1] refusé"""
+        digest = TDigest()
+        digest.add(10)
+        with pytest.raises(ValueError):
+            digest.quantile(1.5)